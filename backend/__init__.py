@@ -6,11 +6,15 @@ import logging
 from flask import Flask, render_template
 
 import config
-from backend.db import db, bcrypt, init_db
+from backend.db import db, bcrypt, close_read_session, init_db, init_engines
+from backend.history_store import history_store
+from backend.report_jobs import report_jobs
 from backend.auth import auth_bp
 from backend.routes_worker import worker_bp
 from backend.routes_admin import admin_bp
 from backend.routes_ui import ui_bp
+from backend.scheduler import scheduler
+from backend.write_behind import writer
 
 
 def create_app():
@@ -22,12 +26,16 @@ def create_app():
         level=logging.INFO,
         format="%(asctime)s %(levelname)s %(name)s %(message)s",
     )
+    app.teardown_appcontext(close_read_session)
     with app.app_context():
+        init_engines(app)
         init_db()
+        report_jobs.bind(app.extensions.get("readonly_engine") or db.engine)
     app.register_blueprint(auth_bp)
     app.register_blueprint(worker_bp, url_prefix="/worker")
     app.register_blueprint(admin_bp, url_prefix="/admin")
     app.register_blueprint(ui_bp)
+    app.add_url_rule("/healthz", view_func=healthz)
 
     # Log helpful URLs immediately (Flask 3 removed before_first_request)
     logging.info("Worker UI: http://localhost:5000/")
@@ -36,13 +44,17 @@ def create_app():
     return app
 
 
-# For flask run
-app = create_app()
+def start_background(app) -> None:
+    """Start the write-behind writer and the deadline scheduler, as configured; entry points only."""
+    if config.WRITE_BEHIND_ENABLED:
+        with app.app_context():
+            writer.start(db.engine)
+    if config.SCHEDULER_ENABLED:
+        scheduler.start(app)
 
 
-@app.route("/healthz")
 def healthz():
-    return {"status": "ok"}
+    return {"status": "ok", "write_behind": writer.metrics(), "history_store": history_store.metrics()}
 
 
 
@@ -2,21 +2,32 @@
 
 from __future__ import annotations
 
-import datetime as dt
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 
 import config
+from backend.clock import clock
 from backend.db import db
+from backend.events import bus
 from backend.models import Alert
+from backend.rollups import record_alert
+from backend.versions import mark_alerts_changed
+
+_PENDING_KEY = "alert_events"
 
 
 def _within_cooldown(existing: Alert) -> bool:
-    return (dt.datetime.utcnow() - existing.timestamp).total_seconds() <= config.ALERT_COOLDOWN
+    return (clock.utcnow() - existing.timestamp).total_seconds() <= config.ALERT_COOLDOWN
 
 
-def create_or_update_alert(worker_id: str, alert_type: str, priority: str, reason: str) -> Tuple[Alert, bool]:
+def create_or_update_alert(
+    worker_id: str, alert_type: str, priority: str, reason: str, commit: bool = True
+) -> Tuple[Alert, bool]:
     """
     Create a new alert or update timestamp/count if within cooldown.
+    Pass commit=False to leave the change in the caller's transaction.
     Returns (alert, created_flag).
     """
     existing = (
@@ -25,9 +36,13 @@ def create_or_update_alert(worker_id: str, alert_type: str, priority: str, reaso
         .first()
     )
     if existing and _within_cooldown(existing):
-        existing.timestamp = dt.datetime.utcnow()
+        previous, existing.timestamp = existing.timestamp, clock.utcnow()
+        record_alert(db.session, worker_id, existing.timestamp, previous)
         existing.count = (existing.count or 1) + 1
-        db.session.commit()
+        _arm_escalation(existing)
+        if commit:
+            db.session.commit()
+        publish_alert("updated", existing, on_commit=not commit)
         return existing, False
 
     alert = Alert(
@@ -35,18 +50,96 @@ def create_or_update_alert(worker_id: str, alert_type: str, priority: str, reaso
         alert_type=alert_type,
         priority=priority,
         reason=reason,
-        timestamp=dt.datetime.utcnow(),
+        timestamp=clock.utcnow(),
     )
     db.session.add(alert)
-    db.session.commit()
+    record_alert(db.session, worker_id, alert.timestamp)
+    _arm_escalation(alert)
+    if commit:
+        db.session.commit()
+    publish_alert("created", alert, on_commit=not commit)
     return alert, True
 
 
+def acknowledge_alert(alert: Alert, admin_user) -> None:
+    from backend.scheduler import scheduler  # noqa: WPS433 (scheduler imports this module)
+
+    alert.acknowledged_by = admin_user
+    alert.acknowledged_at = clock.utcnow()
+    db.session.commit()
+    scheduler.disarm("escalation", alert.id)
+    publish_alert("acknowledged", alert)
+
+
+def resolve_alert(alert: Alert) -> None:
+    from backend.scheduler import scheduler  # noqa: WPS433 (scheduler imports this module)
+
+    alert.resolved = True
+    db.session.commit()
+    scheduler.disarm("escalation", alert.id)
+    publish_alert("resolved", alert)
+
+
+def alert_to_dict(a: Alert) -> Dict:
+    return {
+        "id": a.id,
+        "worker_id": a.worker_id,
+        "timestamp": a.timestamp.isoformat(),
+        "alert_type": a.alert_type,
+        "priority": a.priority,
+        "reason": a.reason,
+        "acknowledged_by": a.acknowledged_by,
+        "resolved": a.resolved,
+        "count": a.count,
+        "escalation_flag": a.escalation_flag,
+    }
+
+
+def publish_alert(action: str, alert: Alert, on_commit: bool = False) -> None:
+    """
+    Record an alert change (created/updated/acknowledged/resolved/escalated):
+    bump the alerts version and push it to admin streams. on_commit=True for a
+    change not committed yet: it is pushed after the commit, dropped on rollback.
+    """
+    mark_alerts_changed()
+    if not bus.active:
+        return
+    if alert.id is None:
+        db.session.flush()
+    data = {"action": action, "alert": alert_to_dict(alert)}
+    if on_commit:
+        db.session().info.setdefault(_PENDING_KEY, []).append(data)
+    else:
+        bus.publish("alert", data)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session) -> None:
+    for data in session.info.pop(_PENDING_KEY, ()):
+        bus.publish("alert", data)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _arm_escalation(alert: Alert) -> None:
+    """(Re)schedule the escalation check for an EMERGENCY alert at timestamp + threshold."""
+    if alert.priority != "EMERGENCY":
+        return
+    from backend.scheduler import scheduler  # noqa: WPS433 (scheduler imports this module)
+
+    if alert.id is None:
+        db.session.flush()
+    scheduler.arm_escalation(alert.id, alert.timestamp)
+
+
 def escalate_overdue_emergencies():
     """
     If an EMERGENCY alert is unacknowledged beyond threshold, mark escalation_flag.
     """
-    now = dt.datetime.utcnow()
+    now = clock.utcnow()
     overdue = Alert.query.filter(
         Alert.priority == "EMERGENCY",
         Alert.acknowledged_at.is_(None),
@@ -56,6 +149,7 @@ def escalate_overdue_emergencies():
     for alert in overdue:
         if (now - alert.timestamp).total_seconds() > config.ESCALATE_AFTER_SECONDS:
             alert.escalation_flag = True
+            publish_alert("escalated", alert, on_commit=True)
     db.session.commit()
 
 
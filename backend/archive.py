@@ -0,0 +1,270 @@
+"""
+Retention: per-day Arrow IPC archives of old readings and resolved alerts.
+
+run_retention() moves every whole day older than RETENTION_DAYS out of
+SQLite: the day's rows are streamed into ARCHIVE_DIR/<table>/<YYYY-MM-DD>.arrow
+and then deleted in RETENTION_BATCH_ROWS batches, each its own short
+transaction so ingest keeps flowing. Rows arriving later for an archived day
+are appended to its file on the next run. Rollups stay in SQLite.
+
+Reads memory-map the day files (Arrow IPC is read in place, no decoding), so
+reports and history windows that reach past the horizon combine the archive
+with what is still in the database.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from sqlalchemy import Boolean, DateTime, Float, Integer, delete, func, select, true
+
+import config
+from backend.decision_engine import STATUS_LABELS
+from backend.history_store import COLUMNS
+from backend.models import Alert, Reading
+
+log = logging.getLogger(__name__)
+
+TABLES = {"readings": Reading.__table__, "alerts": Alert.__table__}
+# Only resolved alerts leave the database; open ones are still being worked.
+_ARCHIVABLE = {"readings": lambda t: true(), "alerts": lambda t: t.c.resolved.is_(True)}
+_STATUS_SET = pa.array(STATUS_LABELS)
+
+
+def _arrow_type(column) -> pa.DataType:
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    return pa.string()
+
+
+def schema(kind: str) -> pa.Schema:
+    return pa.schema([(c.name, _arrow_type(c)) for c in TABLES[kind].c])
+
+
+def _coerce(value, typ: pa.DataType):
+    if value is None:
+        return None
+    try:
+        if pa.types.is_integer(typ):
+            return int(value)
+        if pa.types.is_floating(typ):
+            return float(value)
+    except (TypeError, ValueError):
+        return None
+    return value
+
+
+def _batch(rows: Sequence, sch: pa.Schema) -> pa.RecordBatch:
+    arrays = []
+    for i, field in enumerate(sch):
+        values = [row[i] for row in rows]
+        try:
+            arrays.append(pa.array(values, type=field.type))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+            # SQLite is loosely typed; odd values (e.g. "high" fatigue) become null
+            arrays.append(pa.array([_coerce(v, field.type) for v in values], type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=sch)
+
+
+# -- layout -----------------------------------------------------------------
+
+
+def _root(root=None) -> Path:
+    return Path(root or config.ARCHIVE_DIR)
+
+
+def day_path(kind: str, day: dt.date, root=None) -> Path:
+    return _root(root) / kind / f"{day}.arrow"
+
+
+def archived_days(kind: str, root=None) -> List[dt.date]:
+    folder = _root(root) / kind
+    if not folder.is_dir():
+        return []
+    return sorted(dt.date.fromisoformat(p.stem) for p in folder.glob("*.arrow"))
+
+
+def archived_until(kind: str, root=None) -> Optional[dt.datetime]:
+    """Exclusive end of the latest archived day, or None when nothing is archived."""
+    days = archived_days(kind, root)
+    return dt.datetime.combine(days[-1] + dt.timedelta(days=1), dt.time.min) if days else None
+
+
+# -- reading ----------------------------------------------------------------
+
+
+def read_day(kind: str, day: dt.date, root=None) -> pa.Table:
+    """The day's rows, memory-mapped (zero-copy)."""
+    with pa.memory_map(str(day_path(kind, day, root)), "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _between(table: pa.Table, start: dt.datetime, end: dt.datetime, worker_id: str = None) -> pa.Table:
+    ts = table["timestamp"]
+    mask = pc.and_(
+        pc.greater_equal(ts, pa.scalar(start, pa.timestamp("us"))),
+        pc.less(ts, pa.scalar(end, pa.timestamp("us"))),
+    )
+    if worker_id is not None:
+        mask = pc.and_(mask, pc.equal(table["worker_id"], worker_id))
+    return table.filter(mask)
+
+
+def _days_between(kind: str, start: dt.datetime, end: dt.datetime, root=None) -> List[dt.date]:
+    return [d for d in archived_days(kind, root) if start.date() <= d and dt.datetime.combine(d, dt.time.min) < end]
+
+
+def scan(kind: str, start: dt.datetime, end: dt.datetime, worker_id: str = None, root=None) -> Optional[pa.Table]:
+    """Archived rows with start <= timestamp < end (optionally one worker's), or None if no day overlaps."""
+    days = _days_between(kind, start, end, root)
+    if not days:
+        return None
+    return _between(pa.concat_tables([read_day(kind, d, root) for d in days]), start, end, worker_id)
+
+
+def history_columns(worker_id: str, since: dt.datetime, root=None) -> Optional[Dict[str, np.ndarray]]:
+    """
+    One worker's archived readings from `since` on, as history-store columns
+    in timestamp order; None when the window does not reach the archive.
+    """
+    until = archived_until("readings", root)
+    if until is None or since >= until:
+        return None
+    table = scan("readings", since, until, worker_id, root)
+    if table is None:
+        return None
+    table = table.sort_by([("timestamp", "ascending"), ("id", "ascending")])
+    cols = {}
+    for name, dtype in COLUMNS:
+        if name == "status":
+            values = pc.fill_null(pc.index_in(table["status"], value_set=_STATUS_SET), -1)
+        elif name in ("id", "timestamp"):
+            values = table[name]
+        elif np.dtype(dtype).kind == "f":
+            values = pc.cast(table[name], pa.float64())
+        else:
+            values = pc.fill_null(table[name], 0)
+        cols[name] = values.to_numpy().astype(dtype)
+    return cols
+
+
+def _status_flag(status, label: str):
+    return pc.cast(pc.equal(status, label), pa.int64())
+
+
+def reading_partials(start: dt.datetime, end: dt.datetime, root=None) -> List[Dict]:
+    """Per worker and day sums/counts of archived readings, in backend.reports' partial shape."""
+    table = scan("readings", start, end, root=root)
+    if table is None or not table.num_rows:
+        return []
+    table = table.append_column("day", pc.strftime(table["timestamp"], "%Y-%m-%d"))
+    for label in STATUS_LABELS:
+        table = table.append_column(label.lower(), _status_flag(table["status"], label))
+    vitals = ("heart_rate", "spo2", "temperature", "gas")
+    aggs = [("id", "count")] + [(v, fn) for v in vitals for fn in ("sum", "count")]
+    aggs += [(label.lower(), "sum") for label in STATUS_LABELS]
+    grouped = table.group_by(["worker_id", "day"]).aggregate(aggs).to_pylist()
+    suffix = {"heart_rate": "hr", "spo2": "spo2", "temperature": "temp", "gas": "gas"}
+    out = []
+    for g in grouped:
+        row = {"worker_id": g["worker_id"], "day": g["day"], "count": g["id_count"]}
+        for v in vitals:
+            row[f"sum_{suffix[v]}"] = float(g[f"{v}_sum"] or 0)
+            row[f"n_{suffix[v]}"] = g[f"{v}_count"]
+        for label in STATUS_LABELS:
+            row[label.lower()] = g[f"{label.lower()}_sum"] or 0
+        out.append(row)
+    return out
+
+
+def alert_partials(start: dt.datetime, end: dt.datetime, root=None) -> List[Dict]:
+    """Archived alert counts per worker and day."""
+    table = scan("alerts", start, end, root=root)
+    if table is None or not table.num_rows:
+        return []
+    table = table.append_column("day", pc.strftime(table["timestamp"], "%Y-%m-%d"))
+    grouped = table.group_by(["worker_id", "day"]).aggregate([("id", "count")]).to_pylist()
+    return [{"worker_id": g["worker_id"], "day": g["day"], "alerts": g["id_count"]} for g in grouped]
+
+
+def iter_rows(kind: str, start: dt.datetime, end: dt.datetime, columns: Sequence[str], root=None) -> Iterator[tuple]:
+    """Archived rows as tuples of `columns`, in timestamp order, one day file at a time."""
+    for day in _days_between(kind, start, end, root):
+        table = _between(read_day(kind, day, root), start, end)
+        table = table.sort_by([("timestamp", "ascending"), ("id", "ascending")])
+        yield from zip(*(table[name].to_pylist() for name in columns))
+
+
+# -- archiving ----------------------------------------------------------------
+
+
+def archive_day(engine, kind: str, day: dt.date, root=None, batch_rows: int = None) -> int:
+    """Move one day's archivable rows of `kind` to its file. Returns rows moved."""
+    table = TABLES[kind]
+    batch_rows = batch_rows or config.RETENTION_BATCH_ROWS
+    start = dt.datetime.combine(day, dt.time.min)
+    end = start + dt.timedelta(days=1)
+    where = (table.c.timestamp >= start, table.c.timestamp < end, _ARCHIVABLE[kind](table))
+    sch = schema(kind)
+    path = day_path(kind, day, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+
+    written: List[int] = []
+    with engine.connect() as conn:
+        stmt = select(table).where(*where).order_by(table.c.id).execution_options(yield_per=batch_rows)
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, sch) as writer:
+            if path.exists():  # late rows for an already archived day
+                for batch in read_day(kind, day, root).to_batches():
+                    writer.write_batch(batch)
+            for chunk in conn.execute(stmt).partitions():
+                writer.write_batch(_batch(chunk, sch))
+                written.extend(row.id for row in chunk)
+    if not written:
+        tmp.unlink()
+        return 0
+    with open(tmp, "rb") as fh:
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+    # Rows are on disk; delete exactly the ids written (not the predicate again: an
+    # alert resolved since the SELECT is not in the file) in short transactions.
+    for lo in range(0, len(written), batch_rows):
+        with engine.begin() as conn:
+            conn.execute(delete(table).where(table.c.id.in_(written[lo:lo + batch_rows])))
+    return len(written)
+
+
+def run_retention(engine, now: dt.datetime = None, root=None, days: int = None) -> Dict[str, int]:
+    """Archive every whole day older than `days` (RETENTION_DAYS). Returns rows moved per table."""
+    now = now or dt.datetime.utcnow()
+    cutoff = dt.datetime.combine(now.date() - dt.timedelta(days=days or config.RETENTION_DAYS), dt.time.min)
+    moved = {}
+    for kind, table in TABLES.items():
+        moved[kind] = 0
+        with engine.connect() as conn:
+            oldest = conn.execute(
+                select(func.min(table.c.timestamp)).where(table.c.timestamp < cutoff, _ARCHIVABLE[kind](table))
+            ).scalar()
+        if oldest is None:
+            continue
+        day = oldest.date()
+        while day < cutoff.date():
+            moved[kind] += archive_day(engine, kind, day, root)
+            day += dt.timedelta(days=1)
+        if moved[kind]:
+            log.info("archived %d %s older than %s", moved[kind], kind, cutoff.date())
+    return moved
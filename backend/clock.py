@@ -0,0 +1,66 @@
+"""
+Injectable clock.
+
+Ingest timestamps, alert cooldowns, escalation, unconscious detection and the
+rate limiter read the time through `clock` instead of the wall clock, so a
+replay can drive them from a VirtualClock (see backend.replay). The source is
+process-wide: only swap it in headless runs, never under a live server.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import time
+from contextlib import contextmanager
+
+
+class SystemClock:
+    def utcnow(self) -> dt.datetime:
+        return dt.datetime.utcnow()
+
+    def time(self) -> float:
+        return time.time()
+
+
+class VirtualClock:
+    """Naive-UTC time that only moves when set() or advance() is called."""
+
+    def __init__(self, start: dt.datetime):
+        self._now = start
+
+    def utcnow(self) -> dt.datetime:
+        return self._now
+
+    def time(self) -> float:
+        return self._now.replace(tzinfo=dt.timezone.utc).timestamp()
+
+    def set(self, when: dt.datetime) -> None:
+        if when < self._now:
+            raise ValueError(f"virtual clock cannot go back from {self._now} to {when}")
+        self._now = when
+
+    def advance(self, seconds: float) -> None:
+        self.set(self._now + dt.timedelta(seconds=seconds))
+
+
+class Clock:
+    def __init__(self):
+        self.source = SystemClock()
+
+    def utcnow(self) -> dt.datetime:
+        return self.source.utcnow()
+
+    def time(self) -> float:
+        return self.source.time()
+
+    @contextmanager
+    def use(self, source):
+        """Read the time from `source` inside the block."""
+        previous, self.source = self.source, source
+        try:
+            yield source
+        finally:
+            self.source = previous
+
+
+clock = Clock()
@@ -5,8 +5,11 @@ from __future__ import annotations
 import datetime as dt
 from pathlib import Path
 
+from flask import current_app, g
 from flask_bcrypt import Bcrypt
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
 
 import config
 
@@ -14,10 +17,90 @@ db = SQLAlchemy()
 bcrypt = Bcrypt()
 
 
+def _pragma_listener(pragmas: dict):
+    def on_connect(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return on_connect
+
+
+def configure_sqlite(engine, readonly: bool = False) -> None:
+    """Apply config.SQLITE_PRAGMAS to every new connection of a SQLite engine."""
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = dict(config.SQLITE_PRAGMAS or {})
+    if readonly:
+        # journal mode is a property of the file, set by the writer
+        pragmas.pop("journal_mode", None)
+        pragmas["query_only"] = 1
+    if pragmas:
+        event.listen(engine, "connect", _pragma_listener(pragmas))
+
+
+def readonly_uri(url) -> str:
+    """Read-only URI of the SQLite file behind `url`; None for memory or non-SQLite databases."""
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return None
+    return f"sqlite:///file:{Path(url.database).resolve()}?mode=ro&uri=true"
+
+
+def init_engines(app) -> None:
+    """Tune the main engine and create the read-only engine. Call before first use."""
+    configure_sqlite(db.engine)
+    uri = config.SQLITE_READONLY_URI
+    if uri is True:
+        uri = readonly_uri(db.engine.url)
+    if uri:
+        readonly = create_engine(uri)
+        configure_sqlite(readonly, readonly=True)
+        app.extensions["readonly_engine"] = readonly
+
+
+def read_session():
+    """
+    Session for read-only queries, bound to the read-only engine when configured
+    and closed at app-context teardown. Falls back to db.session.
+    """
+    if "read_session" not in g:
+        engine = current_app.extensions.get("readonly_engine")
+        g.read_session = Session(engine) if engine is not None else db.session
+    return g.read_session
+
+
+def close_read_session(_exc=None) -> None:
+    session = g.pop("read_session", None)
+    if session is not None and session is not db.session:
+        session.close()
+
+
+def migrate_indexes():
+    """
+    Create any model index missing from an existing database. create_all() only
+    adds indexes together with new tables, so older safety.db files need this;
+    checkfirst makes it safe to run on every start.
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
+
 def init_db():
     """Create tables and seed an admin + demo worker if DB not present."""
     db.create_all()
-    from backend.models import User, Worker  # noqa: WPS433
+    migrate_indexes()
+    from backend.models import HourRollup, Reading, User, Worker, WorkerState  # noqa: WPS433
+    from backend.rollups import rebuild_rollups  # noqa: WPS433
+    from backend.worker_state import rebuild_states  # noqa: WPS433
+
+    # Backfill worker_state and the rollups for databases created before them
+    has_readings = Reading.query.first() is not None
+    if has_readings and WorkerState.query.first() is None:
+        rebuild_states(db.session)
+    if has_readings and HourRollup.query.first() is None:
+        rebuild_rollups(db.session)
 
     # Seed admin
     if not User.query.filter_by(username="admin").first():
@@ -42,4 +125,9 @@ def init_db():
 
     db.session.commit()
 
+    if config.HISTORY_STORE_ENABLED:
+        from backend.history_store import history_store  # noqa: WPS433
+
+        history_store.rebuild(db.session)
+
 
@@ -5,20 +5,147 @@ Designed to be swappable with ML later without changing API.
 
 from __future__ import annotations
 
+import itertools
+from bisect import bisect_left
 from dataclasses import dataclass
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
 
 import config
 
+PARAMETERS = ("heart_rate", "spo2", "temperature", "gas", "fatigue")
+STATUS_LABELS = ("SAFE", "WARNING", "EMERGENCY")
+FUSION_REASONS = (
+    "Base fusion",
+    "Gas + Low O2",
+    "Critical fatigue + High HR",
+    "Heat Stress",
+    "Parameter >= 95",
+)
+FATIGUE_LEVELS = {"low": 0, "medium": 1, "high": 2}
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class DecisionDetail:
-    parameter_risks: Dict[str, int]
-    reasons: Dict[str, str]
+    """
+    Immutable decision. Only the clamped inputs and the five risks are stored;
+    the parameter_risks/reasons dicts are built when accessed or serialised.
+    """
+
+    inputs: Tuple  # clamped (heart_rate, spo2, temperature, gas, fatigue, zone)
+    risks: Tuple[int, int, int, int, int]  # in PARAMETERS order
     fusion_reason: str
     final_risk_score: int
     status: str
 
+    @property
+    def parameter_risks(self) -> Dict[str, int]:
+        return dict(zip(PARAMETERS, self.risks))
+
+    @property
+    def reasons(self) -> Dict[str, str]:
+        hr, spo2, temp, gas, fatigue, zone = self.inputs
+        hr_risk, spo2_risk, temp_risk, gas_risk, fatigue_risk = self.risks
+        return {
+            "heart_rate": f"HR {hr} -> risk {hr_risk}",
+            "spo2": f"SpO2 {spo2}% -> risk {spo2_risk}",
+            "temperature": f"Temp {temp}C -> risk {temp_risk}",
+            "gas": f"Gas {gas}ppm zone {zone} -> risk {gas_risk}",
+            "fatigue": f"Fatigue {fatigue} -> risk {fatigue_risk}",
+        }
+
+    def to_dict(self) -> Dict:
+        return {"parameter_risks": self.parameter_risks, "reasons": self.reasons, "fusion_reason": self.fusion_reason}
+
+
+@dataclass
+class BatchDecision:
+    """Columnar result of DecisionEngine.evaluate_batch; row i matches evaluate() on reading i."""
+
+    heart_rate: np.ndarray
+    spo2: np.ndarray
+    temperature: np.ndarray
+    gas: np.ndarray
+    fatigue: np.ndarray
+    zone: np.ndarray
+    risks: np.ndarray  # shape (n, 5), columns in PARAMETERS order
+    final_risk_score: np.ndarray
+    status_code: np.ndarray  # index into STATUS_LABELS
+    fusion_code: np.ndarray  # index into FUSION_REASONS
+
+    def __len__(self) -> int:
+        return len(self.final_risk_score)
+
+    @property
+    def status(self) -> List[str]:
+        return [STATUS_LABELS[c] for c in self.status_code.tolist()]
+
+    @property
+    def fusion_reason(self) -> List[str]:
+        return [FUSION_REASONS[c] for c in self.fusion_code.tolist()]
+
+    def detail(self, i: int) -> DecisionDetail:
+        """Build the scalar DecisionDetail for row i."""
+        hr, spo2, gas, fatigue = (int(self.heart_rate[i]), int(self.spo2[i]), int(self.gas[i]), int(self.fatigue[i]))
+        temp = float(self.temperature[i])
+        if not 28 < temp < 45:
+            # The scalar clamp returns the int bound itself, which shows up in the reason text.
+            temp = int(temp)
+        return DecisionDetail(
+            inputs=(hr, spo2, temp, gas, fatigue, self.zone[i]),
+            risks=tuple(self.risks[i].tolist()),
+            fusion_reason=FUSION_REASONS[self.fusion_code[i]],
+            final_risk_score=int(self.final_risk_score[i]),
+            status=STATUS_LABELS[self.status_code[i]],
+        )
+
+    def details(self) -> List[DecisionDetail]:
+        return [self.detail(i) for i in range(len(self))]
+
+
+def _fatigue_value(value) -> int:
+    """Fatigue level as an int; the labels low/medium/high map to 0/1/2."""
+    level = FATIGUE_LEVELS.get(str(value).lower())
+    return level if level is not None else int(value)
+
+
+def _column(values) -> np.ndarray:
+    """values as an array; a column that is not purely numeric keeps its Python objects."""
+    arr = np.asarray(values)
+    if arr.dtype.kind not in "iubf":
+        # np.asarray([80.5, "80"]) would turn every element into a string first
+        arr = np.asarray(values, dtype=object)
+    return arr
+
+
+def _as_int(values) -> np.ndarray:
+    """Vector equivalent of int(): truncate toward zero, reject NaN/inf like int() does."""
+    arr = _column(values)
+    if arr.dtype.kind in "iub":
+        return arr.astype(np.int64)
+    if arr.dtype.kind == "O":
+        # strings and mixed objects go through int() itself, so "80.5" fails here too
+        return np.array([int(v) for v in arr.tolist()], dtype=np.int64)
+    if not np.isfinite(arr).all():
+        raise ValueError("cannot convert non-finite values to integer")
+    return np.trunc(arr).astype(np.int64)
+
+
+def _as_float(values) -> np.ndarray:
+    arr = _column(values)
+    if arr.dtype.kind == "O":
+        return np.array([float(v) for v in arr.tolist()], dtype=np.float64)
+    return arr.astype(np.float64)
+
+
+def _as_fatigue(values) -> np.ndarray:
+    arr = _column(values)
+    if arr.dtype.kind == "O":
+        return np.array([_fatigue_value(v) for v in arr.tolist()], dtype=np.int64)
+    return _as_int(arr)
+
 
 class DecisionEngine:
     def __init__(self):
@@ -31,37 +158,34 @@ class DecisionEngine:
     def _zone_factor(self, zone: str) -> float:
         return self.zone_sensitivity.get(zone.upper(), 1.0)
 
-    def evaluate(self, reading: Dict) -> DecisionDetail:
+    def _normalise(self, reading: Dict) -> Tuple:
+        """Clamp inputs to their integer/float ranges; the result fully determines the decision."""
         zone = reading.get("zone", "NORMAL") or "NORMAL"
-        factor = self._zone_factor(zone)
-
         hr = self._clamp(int(reading["heart_rate"]), 30, 220)
         spo2 = self._clamp(int(reading["spo2"]), 50, 100)
         temp = self._clamp(float(reading["temperature"]), 28, 45)
         gas = self._clamp(int(reading["gas"]), 0, 5000)
-        fatigue_in = reading["fatigue"]
-        fatigue = {"low": 0, "medium": 1, "high": 2}.get(str(fatigue_in).lower(), int(fatigue_in))
+        fatigue = _fatigue_value(reading["fatigue"])
+        return hr, spo2, temp, gas, fatigue, zone
 
-        reasons = {}
-
-        # HR risk
+    @staticmethod
+    def _hr_risk(hr: int) -> int:
         if hr < 40:
-            hr_risk = 80
-        elif hr < 50:
-            hr_risk = 60
-        elif hr <= 100:
-            hr_risk = 10
-        elif hr <= 120:
-            hr_risk = 40
-        elif hr <= 140:
-            hr_risk = 60
-        elif hr <= 180:
-            hr_risk = 85
-        else:
-            hr_risk = 95
-        reasons["heart_rate"] = f"HR {hr} -> risk {hr_risk}"
+            return 80
+        if hr < 50:
+            return 60
+        if hr <= 100:
+            return 10
+        if hr <= 120:
+            return 40
+        if hr <= 140:
+            return 60
+        if hr <= 180:
+            return 85
+        return 95
 
-        # SpO2 risk
+    @staticmethod
+    def _spo2_risk(spo2: int, factor: float) -> int:
         if spo2 >= 95:
             spo2_risk = 5
         elif spo2 >= 92:
@@ -72,22 +196,22 @@ class DecisionEngine:
             spo2_risk = 70
         else:
             spo2_risk = 95
-        spo2_risk = min(95, int(spo2_risk / factor))
-        reasons["spo2"] = f"SpO2 {spo2}% -> risk {spo2_risk}"
+        return min(95, int(spo2_risk / factor))
 
-        # Temperature risk
+    @staticmethod
+    def _temp_risk(temp: float) -> int:
         if temp < 35:
-            temp_risk = 30
-        elif temp <= 38:
-            temp_risk = 10
-        elif temp <= 39.5:
-            temp_risk = 45
-        elif temp <= 41:
-            temp_risk = 80
-        else:
-            temp_risk = 95
-        reasons["temperature"] = f"Temp {temp}C -> risk {temp_risk}"
+            return 30
+        if temp <= 38:
+            return 10
+        if temp <= 39.5:
+            return 45
+        if temp <= 41:
+            return 80
+        return 95
 
+    @staticmethod
+    def _gas_risk(gas: int, factor: float) -> int:
         # Gas risk with zone sensitivity
         if gas <= 50:
             gas_risk = 5
@@ -99,22 +223,16 @@ class DecisionEngine:
             gas_risk = 85
         else:
             gas_risk = 95
-        gas_risk = min(95, int(gas_risk / factor if factor else gas_risk))
-        reasons["gas"] = f"Gas {gas}ppm zone {zone} -> risk {gas_risk}"
+        return min(95, int(gas_risk / factor if factor else gas_risk))
 
-        # Fatigue risk
+    @staticmethod
+    def _fatigue_risk(fatigue: int) -> int:
         fatigue_map = {0: 5, 1: 35, 2: 70}
-        fatigue_risk = fatigue_map.get(fatigue, 70)
-        reasons["fatigue"] = f"Fatigue {fatigue} -> risk {fatigue_risk}"
-
-        parameter_risks = {
-            "heart_rate": hr_risk,
-            "spo2": spo2_risk,
-            "temperature": temp_risk,
-            "gas": gas_risk,
-            "fatigue": fatigue_risk,
-        }
+        return fatigue_map.get(fatigue, 70)
 
+    def _fuse(self, hr_risk: int, spo2_risk: int, temp_risk: int, gas_risk: int, fatigue_risk: int) -> Tuple[int, str, str]:
+        """Weighted fusion plus safety overrides. Returns (final_risk, fusion_reason, status)."""
+        risks = (hr_risk, spo2_risk, temp_risk, gas_risk, fatigue_risk)
         health_component = round((hr_risk * 0.4 + spo2_risk * 0.4 + temp_risk * 0.2))
         final_risk = round(health_component * 0.35 + gas_risk * 0.35 + fatigue_risk * 0.30)
         final_risk = self._clamp(final_risk, 0, 100)
@@ -124,7 +242,7 @@ class DecisionEngine:
         def elevate(value, minimum):
             return max(value, minimum)
 
-        high_params = sum(1 for r in parameter_risks.values() if r >= 70)
+        high_params = sum(1 for r in risks if r >= 70)
 
         if gas_risk >= 85 and spo2_risk >= 45:
             final_risk = elevate(final_risk, 92)
@@ -138,7 +256,7 @@ class DecisionEngine:
         if high_params >= 2:
             final_risk = elevate(final_risk, 88)
             fusion_reason = fusion_reason or "Multiple high risks"
-        if any(r >= 95 for r in parameter_risks.values()):
+        if any(r >= 95 for r in risks):
             final_risk = 98
             fusion_reason = "Parameter >= 95"
 
@@ -148,13 +266,155 @@ class DecisionEngine:
             status = "WARNING"
         else:
             status = "EMERGENCY"
+        return final_risk, fusion_reason, status
 
-        return DecisionDetail(
-            parameter_risks=parameter_risks,
-            reasons=reasons,
-            fusion_reason=fusion_reason,
-            final_risk_score=final_risk,
-            status=status,
+    def _evaluate_normalised(self, hr, spo2, temp, gas, fatigue, zone) -> DecisionDetail:
+        factor = self._zone_factor(zone)
+        risks = (
+            self._hr_risk(hr),
+            self._spo2_risk(spo2, factor),
+            self._temp_risk(temp),
+            self._gas_risk(gas, factor),
+            self._fatigue_risk(fatigue),
         )
+        final_risk, fusion_reason, status = self._fuse(*risks)
+        return DecisionDetail((hr, spo2, temp, gas, fatigue, zone), risks, fusion_reason, final_risk, status)
+
+    def evaluate(self, reading: Dict) -> DecisionDetail:
+        return self._evaluate_normalised(*self._normalise(reading))
+
+    def evaluate_batch(self, heart_rate, spo2, temperature, gas, fatigue, zone="NORMAL") -> BatchDecision:
+        """
+        Vectorised evaluate() over columnar inputs. zone may be a single value or
+        one per reading. Every risk, score, fusion reason and status matches the
+        scalar path exactly (same float operations in the same order).
+        """
+        hr = np.clip(_as_int(heart_rate), 30, 220)
+        n = hr.shape[0]
+        spo2_v = np.clip(_as_int(spo2), 50, 100)
+        gas_v = np.clip(_as_int(gas), 0, 5000)
+        fatigue_v = _as_fatigue(fatigue)
+        # Mirror max(28, min(45, t)) exactly, including NaN falling through to 45.
+        temp = _as_float(temperature)
+        temp = np.where(temp < 45, temp, 45.0)
+        temp = np.where(temp > 28, temp, 28.0)
 
+        zones = np.empty(n, dtype=object)
+        zones[:] = zone if np.ndim(zone) == 0 else list(zone)
+        zones[:] = [z or "NORMAL" for z in zones.tolist()]
+        uniq, inverse = np.unique(zones.astype(str), return_inverse=True)
+        factor = np.array([self._zone_factor(z) for z in uniq], dtype=np.float64)[inverse]
+
+        hr_risk = np.select(
+            [hr < 40, hr < 50, hr <= 100, hr <= 120, hr <= 140, hr <= 180], [80, 60, 10, 40, 60, 85], 95
+        )
+        spo2_base = np.select([spo2_v >= 95, spo2_v >= 92, spo2_v >= 90, spo2_v >= 85], [5, 20, 45, 70], 95)
+        with np.errstate(divide="ignore"):
+            spo2_risk = np.minimum(95, np.trunc(spo2_base / factor)).astype(np.int64)
+        temp_risk = np.select([temp < 35, temp <= 38, temp <= 39.5, temp <= 41], [30, 10, 45, 80], 95)
+        gas_base = np.select([gas_v <= 50, gas_v <= 200, gas_v <= 400, gas_v <= 1000], [5, 25, 60, 85], 95)
+        safe_factor = np.where(factor != 0, factor, 1.0)
+        gas_risk = np.minimum(95, np.trunc(gas_base / safe_factor)).astype(np.int64)
+        fatigue_risk = np.select([fatigue_v == 0, fatigue_v == 1], [5, 35], 70)
+
+        risks = np.stack([hr_risk, spo2_risk, temp_risk, gas_risk, fatigue_risk], axis=1).astype(np.int64)
+
+        health = np.rint(hr_risk * 0.4 + spo2_risk * 0.4 + temp_risk * 0.2)
+        final = np.rint(health * 0.35 + gas_risk * 0.35 + fatigue_risk * 0.30)
+        final = np.clip(final, 0, 100).astype(np.int64)
+        fusion = np.zeros(n, dtype=np.int8)
+
+        high_params = (risks >= 70).sum(axis=1)
+        rules = [
+            ((gas_risk >= 85) & (spo2_risk >= 45), 92, 1),
+            ((fatigue_risk >= 70) & (hr_risk >= 60), 90, 2),
+            ((temp_risk >= 80) & (hr_risk >= 60), 90, 3),
+            # "Multiple high risks" never replaces the reason: the scalar path's reason is always truthy.
+            (high_params >= 2, 88, None),
+        ]
+        for mask, minimum, reason in rules:
+            final = np.where(mask, np.maximum(final, minimum), final)
+            if reason is not None:
+                fusion[mask] = reason
+        critical = (risks >= 95).any(axis=1)
+        final[critical] = 98
+        fusion[critical] = 4
+
+        status = np.select([final <= 40, final <= 70], [0, 1], 2).astype(np.int8)
+
+        return BatchDecision(
+            heart_rate=hr,
+            spo2=spo2_v,
+            temperature=temp,
+            gas=gas_v,
+            fatigue=fatigue_v,
+            zone=zones,
+            risks=risks,
+            final_risk_score=final,
+            status_code=status,
+            fusion_code=fusion,
+        )
+
+
+class CompiledDecisionEngine(DecisionEngine):
+    """
+    Table-driven DecisionEngine. Per-parameter risks are looked up in arrays built
+    once per zone factor (temperature uses a bisect table) and the fusion step in a
+    table keyed on the five risks, so no cascade or zone division runs per call.
+    evaluate() is memoised on the clamped input tuple and returns shared (immutable)
+    DecisionDetail objects; decisions are identical to DecisionEngine.
+    """
+
+    _TEMP_BOUNDS = (38, 39.5, 41)
+    _TEMP_RISKS = (10, 45, 80, 95)
+    _FATIGUE_RISKS = {0: 5, 1: 35, 2: 70}
+
+    def __init__(self, cache_size: int = None):
+        super().__init__()
+        self._hr_table = tuple(self._hr_risk(hr) for hr in range(30, 221))
+        self._factor_tables: Dict[float, Tuple[Tuple[int, ...], Tuple[int, ...]]] = {}
+        self._zone_tables: Dict[str, Tuple[Tuple[int, ...], Tuple[int, ...]]] = {}
+        for zone in ("NORMAL", *self.zone_sensitivity):
+            self._tables_for_zone(zone)
+        self._fusion_table: Dict[Tuple[int, ...], Tuple[int, str, str]] = {}
+        spo2_risks = {r for spo2_table, _ in self._factor_tables.values() for r in spo2_table}
+        gas_risks = {r for _, gas_table in self._factor_tables.values() for r in gas_table}
+        for risks in itertools.product(
+            set(self._hr_table), spo2_risks, {30, *self._TEMP_RISKS}, gas_risks, set(self._FATIGUE_RISKS.values())
+        ):
+            self._fusion_table[risks] = self._fuse(*risks)
+        self._evaluate_cached = lru_cache(maxsize=cache_size or config.DECISION_CACHE_SIZE)(self._evaluate_normalised)
+
+    def _tables_for_zone(self, zone: str):
+        tables = self._zone_tables.get(zone)
+        if tables is None:
+            factor = self._zone_factor(zone)
+            tables = self._factor_tables.get(factor)
+            if tables is None:
+                spo2_table = tuple(self._spo2_risk(spo2, factor) for spo2 in range(50, 101))
+                gas_table = tuple(self._gas_risk(gas, factor) for gas in range(0, 5001))
+                tables = self._factor_tables[factor] = (spo2_table, gas_table)
+            self._zone_tables[zone] = tables
+        return tables
+
+    def _evaluate_normalised(self, hr, spo2, temp, gas, fatigue, zone) -> DecisionDetail:
+        spo2_table, gas_table = self._tables_for_zone(zone)
+        temp_risk = 30 if temp < 35 else self._TEMP_RISKS[bisect_left(self._TEMP_BOUNDS, temp)]
+        risks = (
+            self._hr_table[hr - 30],
+            spo2_table[spo2 - 50],
+            temp_risk,
+            gas_table[gas],
+            self._FATIGUE_RISKS.get(fatigue, 70),
+        )
+        fused = self._fusion_table.get(risks)
+        if fused is None:
+            fused = self._fusion_table[risks] = self._fuse(*risks)
+        final_risk, fusion_reason, status = fused
+        return DecisionDetail((hr, spo2, temp, gas, fatigue, zone), risks, fusion_reason, final_risk, status)
+
+    def evaluate(self, reading: Dict) -> DecisionDetail:
+        return self._evaluate_cached(*self._normalise(reading))
 
+    def cache_info(self):
+        return self._evaluate_cached.cache_info()
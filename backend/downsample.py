@@ -0,0 +1,89 @@
+"""
+Downsampling of long history windows for charting.
+
+Both methods return the indices of the points to keep, so every series can be
+reduced on its own timeline. LTTB (Largest-Triangle-Three-Buckets) keeps the
+visual shape of smooth vitals; min/max buckets keep each bucket's extremes and
+are used for gas and risk so a short spike is never dropped.
+"""
+
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+
+METHODS = ("lttb", "minmax")
+# Series that always keep per-bucket extremes, whatever the requested method.
+SPIKE_SERIES = ("gas", "risk_score", "fatigue")
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """Indices of the n points LTTB keeps; first and last are always kept."""
+    size = len(x)
+    if n >= size or size <= 2:
+        return np.arange(size)
+    if n < 3:
+        return np.array([0, size - 1])
+    # n - 2 buckets over the points between first and last
+    edges = np.linspace(1, size - 1, n - 1).astype(np.int64)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[1:-1], edges[:-1] - 1) / counts
+    avg_y = np.add.reduceat(y[1:-1], edges[:-1] - 1) / counts
+    # each bucket looks ahead to the next bucket's centroid, the last one to the final point
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    keep = np.empty(n, dtype=np.int64)
+    keep[0], keep[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - next_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[i] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def minmax(y: np.ndarray, n: int) -> np.ndarray:
+    """Indices of each bucket's min and max (plus first and last), at most ~n points, in order."""
+    size = len(y)
+    if n >= size or size <= 2:
+        return np.arange(size)
+    buckets = max(1, (n - 2) // 2)
+    width = -(-size // buckets)
+    padded = np.empty(buckets * width)
+    padded[:size] = y
+    padded[size:] = np.nan
+    grid = padded.reshape(buckets, width)
+    base = np.arange(buckets) * width
+    lows = base + np.argmin(np.where(np.isnan(grid), np.inf, grid), axis=1)
+    highs = base + np.argmax(np.where(np.isnan(grid), -np.inf, grid), axis=1)
+    lows, highs = lows[lows < size], highs[highs < size]
+    return np.unique(np.concatenate(([0, size - 1], lows, highs)))
+
+
+def downsample(timestamps_ms: np.ndarray, columns: Dict[str, np.ndarray], max_points: int, method: str = "lttb"):
+    """
+    Reduce each column to about max_points. Returns {name: {"t": [...], "v": [...]}}
+    with epoch-millisecond times; missing values are dropped per series.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {', '.join(METHODS)}")
+    x = timestamps_ms.astype(np.float64)
+    series = {}
+    for name, values in columns.items():
+        y = values.astype(np.float64)
+        present = np.flatnonzero(~np.isnan(y))
+        xs, ys = x[present], y[present]
+        if method == "minmax" or name in SPIKE_SERIES:
+            keep = minmax(ys, max_points)
+        else:
+            keep = lttb(xs - (xs[0] if len(xs) else 0.0), ys, max_points)
+        kept = ys[keep]
+        if not np.mod(kept, 1).any():
+            kept = kept.astype(np.int64)
+        series[name] = {"t": timestamps_ms[present][keep].tolist(), "v": kept.tolist()}
+    return series
@@ -0,0 +1,100 @@
+"""In-process pub/sub feeding the admin Server-Sent Events stream."""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+import queue
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import config
+
+
+class Subscription:
+    def __init__(self, worker_id: Optional[str] = None, maxsize: int = None):
+        self.worker_id = worker_id
+        self.queue: "queue.Queue" = queue.Queue(maxsize=maxsize or config.SSE_QUEUE_SIZE)
+        # Set when the subscriber fell behind and was dropped; the client reconnects and resyncs.
+        self.overflowed = False
+
+
+class EventBus:
+    """
+    Fan-out of (event, data) pairs to every open stream. Publishing never blocks:
+    a subscriber whose queue is full is dropped instead of slowing down ingest.
+    Events are per process, so each server process streams its own ingest only.
+    """
+
+    def __init__(self):
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, worker_id: Optional[str] = None) -> Subscription:
+        sub = Subscription(worker_id)
+        with self._lock:
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    @property
+    def active(self) -> bool:
+        return bool(self._subscribers)
+
+    def publish(self, event: str, data: Dict, worker_id: Optional[str] = None) -> None:
+        """worker_id restricts delivery to streams subscribed to that worker."""
+        if not self._subscribers:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            if worker_id is not None and sub.worker_id != worker_id:
+                continue
+            try:
+                sub.queue.put_nowait((event, data))
+            except queue.Full:
+                sub.overflowed = True
+                self.unsubscribe(sub)
+
+
+bus = EventBus()
+
+
+def format_sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _reading_payload(row: Dict) -> Dict:
+    return {
+        "worker_id": row["worker_id"],
+        "timestamp": row["timestamp"].isoformat(),
+        "heart_rate": row["heart_rate"],
+        "spo2": row["spo2"],
+        "temperature": row["temperature"],
+        "gas": row["gas"],
+        "fatigue": row["fatigue"],
+        "risk_score": row["risk_score"],
+        "status": row["status"],
+    }
+
+
+def publish_readings(rows: Iterable[Dict], last_seen: Optional[dt.datetime] = None) -> None:
+    """Publish new readings to streams watching the worker plus one worker-state delta per worker."""
+    if not bus.active:
+        return
+    latest: Dict[str, Dict] = {}
+    for row in rows:
+        payload = _reading_payload(row)
+        bus.publish("reading", payload, worker_id=row["worker_id"])
+        current = latest.get(row["worker_id"])
+        if current is None or row["timestamp"] >= current["timestamp"]:
+            latest[row["worker_id"]] = row
+    for worker_id, row in latest.items():
+        state = _reading_payload(row)
+        state["last_reading_ts"] = state.pop("timestamp")
+        state["last_seen"] = last_seen.isoformat() if last_seen else state["last_reading_ts"]
+        bus.publish("worker", state)
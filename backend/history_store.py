@@ -0,0 +1,302 @@
+"""
+In-memory recent history per worker, so dashboard history reads and worker
+polls skip SQLite and ORM objects.
+
+Each worker gets fixed-capacity NumPy columns in a buffer of twice that size:
+appends go to the end and, once it fills, the newest `capacity` rows are
+copied back to the front. The live rows are therefore always one contiguous
+slice and window reads are plain (zero-copy) slices of it. Rows are kept in
+timestamp order; the oldest row is evicted when a worker exceeds capacity.
+
+The store is per process and only authoritative for what it has seen: a
+worker's `floor_ts`/`floor_id` mark the rows it no longer (or never) held, and
+reads reaching past them return None so callers fall back to the database.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+
+import config
+from backend.decision_engine import STATUS_LABELS
+from backend.models import Reading
+
+_STATUS_CODES = {label: code for code, label in enumerate(STATUS_LABELS)}
+_FATIGUE_LEVELS = {"low": 0, "medium": 1, "high": 2}
+_INT_COLUMNS = ("heart_rate", "spo2", "gas", "fatigue")
+
+COLUMNS = (
+    ("id", np.int64),
+    ("timestamp", "datetime64[us]"),
+    ("heart_rate", np.float64),
+    ("spo2", np.float64),
+    ("temperature", np.float64),
+    ("gas", np.float64),
+    ("fatigue", np.float64),
+    ("risk_score", np.int16),
+    ("status", np.int8),
+)
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _fatigue(value) -> float:
+    if isinstance(value, str) and value.lower() in _FATIGUE_LEVELS:
+        return float(_FATIGUE_LEVELS[value.lower()])
+    return _number(value)
+
+
+def _values(row: Dict) -> tuple:
+    return (
+        row["id"],
+        np.datetime64(row["timestamp"], "us"),
+        _number(row["heart_rate"]),
+        _number(row["spo2"]),
+        _number(row["temperature"]),
+        _number(row["gas"]),
+        _fatigue(row["fatigue"]),
+        row["risk_score"],
+        _STATUS_CODES.get(row["status"], -1),
+    )
+
+
+class WorkerHistory:
+    """Ring buffer of one worker's most recent readings."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.cols = {name: np.zeros(2 * capacity, dtype=dtype) for name, dtype in COLUMNS}
+        self.start = 0
+        self.end = 0
+        # Every reading newer than floor_ts and every id above floor_id is held.
+        self.floor_ts = np.datetime64("NaT", "us")
+        self.floor_id = 0
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    @property
+    def nbytes(self) -> int:
+        return sum(col.nbytes for col in self.cols.values())
+
+    def _compact(self) -> None:
+        n = len(self)
+        for col in self.cols.values():
+            col[:n] = col[self.start : self.end]
+        self.start, self.end = 0, n
+
+    def _evict_oldest(self) -> None:
+        ts = self.cols["timestamp"][self.start]
+        if np.isnat(self.floor_ts) or ts > self.floor_ts:
+            self.floor_ts = ts
+        self.floor_id = max(self.floor_id, int(self.cols["id"][self.start]))
+        self.start += 1
+
+    def append(self, values: tuple) -> None:
+        ts = values[1]
+        if len(self) and ts < self.cols["timestamp"][self.end - 1]:
+            self._insert_sorted(values)
+            return
+        if len(self) == self.capacity:
+            self._evict_oldest()
+        if self.end == len(self.cols["id"]):
+            self._compact()
+        for (name, _), value in zip(COLUMNS, values):
+            self.cols[name][self.end] = value
+        self.end += 1
+
+    def _insert_sorted(self, values: tuple) -> None:
+        """Late reading (e.g. a gateway backlog): insert in timestamp order."""
+        ts, rid = values[1], values[0]
+        full = len(self) == self.capacity
+        if full and ts < self.cols["timestamp"][self.start]:
+            # Older than everything held: it becomes the evicted row.
+            if np.isnat(self.floor_ts) or ts > self.floor_ts:
+                self.floor_ts = ts
+            self.floor_id = max(self.floor_id, int(rid))
+            return
+        if full:
+            self._evict_oldest()
+        if self.end == len(self.cols["id"]):
+            self._compact()
+        ts_col = self.cols["timestamp"]
+        pos = self.start + int(np.searchsorted(ts_col[self.start : self.end], ts, side="right"))
+        for (name, _), value in zip(COLUMNS, values):
+            col = self.cols[name]
+            col[pos + 1 : self.end + 1] = col[pos : self.end].copy()
+            col[pos] = value
+        self.end += 1
+
+    def view(self, lo: int = 0, hi: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Zero-copy column slices of rows [lo, hi) of the live window."""
+        hi = len(self) if hi is None else hi
+        return {name: col[self.start + lo : self.start + hi] for name, col in self.cols.items()}
+
+    def covers_time(self, since: np.datetime64, inclusive: bool = True) -> bool:
+        """Whether every reading at (inclusive) or after `since` is held."""
+        if np.isnat(self.floor_ts):
+            return True
+        return since > self.floor_ts if inclusive else since >= self.floor_ts
+
+    def index_since(self, since: np.datetime64, inclusive: bool = True) -> int:
+        side = "left" if inclusive else "right"
+        return int(np.searchsorted(self.cols["timestamp"][self.start : self.end], since, side=side))
+
+
+def to_payload(view: Dict[str, np.ndarray], with_id: bool = False) -> List[Dict]:
+    """JSON-ready dicts in the shape of the Reading-based responses."""
+    lists = {name: col.tolist() for name, col in view.items()}
+    for name in _INT_COLUMNS:
+        lists[name] = [None if v != v else int(v) if v.is_integer() else v for v in lists[name]]
+    lists["temperature"] = [None if v != v else v for v in lists["temperature"]]
+    lists["timestamp"] = [ts.isoformat() for ts in lists["timestamp"]]
+    lists["status"] = [STATUS_LABELS[c] if c >= 0 else None for c in lists["status"]]
+    names = ["timestamp", "heart_rate", "spo2", "temperature", "gas", "fatigue", "risk_score", "status"]
+    if with_id:
+        names.insert(0, "id")
+    return [dict(zip(names, values)) for values in zip(*(lists[n] for n in names))]
+
+
+def columns_from_rows(rows: Iterable[Dict]) -> Dict[str, np.ndarray]:
+    """Column arrays (store dtypes) from Reading row mappings, e.g. a database window."""
+    values = [_values(row) for row in rows]
+    return {
+        name: np.array([v[i] for v in values], dtype=dtype) for i, (name, dtype) in enumerate(COLUMNS)
+    }
+
+
+class HistoryStore:
+    def __init__(self, capacity: int = None, window_seconds: int = None):
+        self.capacity = capacity or config.HISTORY_STORE_CAPACITY
+        self.window_seconds = window_seconds or config.HISTORY_STORE_WINDOW_SECONDS
+        self._workers: Dict[str, WorkerHistory] = {}
+        self._lock = threading.Lock()
+        # Nothing is served until the first rebuild().
+        self.ready = False
+        # Rows at or below these existed before the last rebuild and may not be held.
+        self._rebuild_floor_id = 0
+        self._rebuild_floor_ts = np.datetime64("NaT", "us")
+
+    def _new_history(self, capacity: int) -> WorkerHistory:
+        hist = WorkerHistory(capacity)
+        hist.floor_id = self._rebuild_floor_id
+        hist.floor_ts = self._rebuild_floor_ts
+        return hist
+
+    def _history(self, worker_id: str) -> WorkerHistory:
+        hist = self._workers.get(worker_id)
+        if hist is None:
+            hist = self._workers[worker_id] = self._new_history(self.capacity)
+        return hist
+
+    def _lookup(self, worker_id: str) -> Optional[WorkerHistory]:
+        """History for reads; unknown workers get an empty, unregistered one."""
+        if not self.ready:
+            return None
+        hist = self._workers.get(worker_id)
+        return hist if hist is not None else self._new_history(1)
+
+    def rebuild(self, session) -> int:
+        """Reload the last window_seconds of readings with one bulk query. Returns rows loaded."""
+        cutoff = dt.datetime.utcnow() - dt.timedelta(seconds=self.window_seconds)
+        max_id = session.execute(select(func.max(Reading.id))).scalar() or 0
+        result = session.execute(
+            select(
+                Reading.worker_id, *(getattr(Reading, name) for name, _ in COLUMNS)
+            ).where(Reading.timestamp >= cutoff).order_by(Reading.worker_id, Reading.timestamp)
+        )
+        with self._lock:
+            self._workers = {}
+            # Readings older than the cutoff were not loaded; newer ones all were.
+            self._rebuild_floor_id = max_id
+            self._rebuild_floor_ts = np.datetime64(cutoff, "us") - np.timedelta64(1, "us")
+            count = 0
+            for row in result:
+                worker_id, *values = row
+                self._history(worker_id).append(_values(dict(zip([n for n, _ in COLUMNS], values))))
+                count += 1
+            self.ready = True
+        return count
+
+    def append(self, rows: Iterable[Dict]) -> None:
+        """Add persisted readings (row dicts carrying their database id)."""
+        with self._lock:
+            for row in rows:
+                self._history(row["worker_id"]).append(_values(row))
+
+    def window(self, worker_id: str, since: dt.datetime) -> Optional[List[Dict]]:
+        """Readings with timestamp >= since, oldest first; None if not fully held."""
+        since64 = np.datetime64(since, "us")
+        with self._lock:
+            hist = self._lookup(worker_id)
+            if hist is None or not hist.covers_time(since64):
+                return None
+            return to_payload(hist.view(hist.index_since(since64)))
+
+    def window_columns(self, worker_id: str, since: dt.datetime) -> Optional[Dict[str, np.ndarray]]:
+        """Column copies of the readings with timestamp >= since; None if not fully held."""
+        since64 = np.datetime64(since, "us")
+        with self._lock:
+            hist = self._lookup(worker_id)
+            if hist is None or not hist.covers_time(since64):
+                return None
+            return {name: col.copy() for name, col in hist.view(hist.index_since(since64)).items()}
+
+    def after_time(self, worker_id: str, since: dt.datetime, limit: int) -> Optional[List[Dict]]:
+        """Readings with timestamp > since, oldest first, with ids; None if not fully held."""
+        since64 = np.datetime64(since, "us")
+        with self._lock:
+            hist = self._lookup(worker_id)
+            if hist is None or not hist.covers_time(since64, inclusive=False):
+                return None
+            lo = hist.index_since(since64, inclusive=False)
+            return to_payload(hist.view(lo, min(len(hist), lo + limit)), with_id=True)
+
+    def after_id(self, worker_id: str, since_id: int, limit: int) -> Optional[List[Dict]]:
+        """Readings with id > since_id in id order, with ids; None if not fully held."""
+        with self._lock:
+            hist = self._lookup(worker_id)
+            if hist is None or since_id < hist.floor_id:
+                return None
+            view = hist.view()
+            idx = np.flatnonzero(view["id"] > since_id)
+            if idx.size > 1 and (np.diff(view["id"][idx]) < 0).any():
+                idx = idx[np.argsort(view["id"][idx], kind="stable")]
+            idx = idx[:limit]
+            return to_payload({name: col[idx] for name, col in view.items()}, with_id=True)
+
+    def latest(self, worker_id: str) -> Optional[List[Dict]]:
+        """The reading with the highest id as a one-element list ([] if none); None if not held."""
+        with self._lock:
+            hist = self._lookup(worker_id)
+            if hist is None:
+                return None
+            if not len(hist):
+                return None if hist.floor_id else []
+            view = hist.view()
+            i = int(np.argmax(view["id"]))
+            if int(view["id"][i]) < hist.floor_id:
+                return None
+            return to_payload(hist.view(i, i + 1), with_id=True)
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": len(self._workers),
+                "rows": sum(len(h) for h in self._workers.values()),
+                "capacity_per_worker": self.capacity,
+                "bytes": sum(h.nbytes for h in self._workers.values()),
+            }
+
+
+history_store = HistoryStore()
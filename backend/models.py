@@ -39,6 +39,70 @@ class Reading(db.Model):
     risk_score = db.Column(db.Integer)
     status = db.Column(db.String)
 
+    __table_args__ = (
+        # Per-worker latest/history lookups and the daily report's time range scan.
+        db.Index("ix_readings_worker_id_timestamp", "worker_id", "timestamp"),
+        db.Index("ix_readings_timestamp", "timestamp"),
+        db.Index("ix_readings_worker_id_id", "worker_id", "id"),
+    )
+
+
+class WorkerState(db.Model):
+    """Latest reading per worker, upserted on ingest so fleet views avoid N+1 scans."""
+
+    __tablename__ = "worker_state"
+    worker_id = db.Column(db.String, primary_key=True)
+    timestamp = db.Column(db.DateTime)  # of the latest reading
+    heart_rate = db.Column(db.Integer)
+    spo2 = db.Column(db.Integer)
+    temperature = db.Column(db.Float)
+    gas = db.Column(db.Integer)
+    fatigue = db.Column(db.Integer)
+    risk_score = db.Column(db.Integer)
+    status = db.Column(db.String)
+
+
+class RollupColumns:
+    """
+    Aggregates of one worker's readings over a time bucket (start time in
+    `bucket`), maintained on ingest by backend.rollups.
+    """
+
+    worker_id = db.Column(db.String, primary_key=True)
+    bucket = db.Column(db.DateTime, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    sum_hr = db.Column(db.Float, nullable=False, default=0)
+    min_hr = db.Column(db.Float)
+    max_hr = db.Column(db.Float)
+    sum_spo2 = db.Column(db.Float, nullable=False, default=0)
+    min_spo2 = db.Column(db.Float)
+    max_spo2 = db.Column(db.Float)
+    sum_temp = db.Column(db.Float, nullable=False, default=0)
+    min_temp = db.Column(db.Float)
+    max_temp = db.Column(db.Float)
+    sum_gas = db.Column(db.Float, nullable=False, default=0)
+    min_gas = db.Column(db.Float)
+    max_gas = db.Column(db.Float)
+    sum_risk = db.Column(db.Float, nullable=False, default=0)
+    max_risk = db.Column(db.Float)
+    safe_count = db.Column(db.Integer, nullable=False, default=0)
+    warning_count = db.Column(db.Integer, nullable=False, default=0)
+    emergency_count = db.Column(db.Integer, nullable=False, default=0)
+    alert_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class MinuteRollup(RollupColumns, db.Model):
+    __tablename__ = "rollup_minute"
+
+
+class HourRollup(RollupColumns, db.Model):
+    __tablename__ = "rollup_hour"
+
+
+# Fleet-wide range scans (reports, KPIs) over all workers' buckets.
+db.Index("ix_rollup_minute_bucket", MinuteRollup.bucket)
+db.Index("ix_rollup_hour_bucket", HourRollup.bucket)
+
 
 class Alert(db.Model):
     __tablename__ = "alerts"
@@ -55,6 +119,29 @@ class Alert(db.Model):
     escalation_flag = db.Column(db.Boolean, default=False)
 
 
+# Alert indexes reference the mapped columns so partial-index predicates render
+# exactly like the query filters that should use them.
+db.Index(
+    "ix_alerts_worker_id_alert_type_resolved",
+    Alert.worker_id,
+    Alert.alert_type,
+    Alert.resolved,
+    Alert.timestamp,
+)
+db.Index("ix_alerts_timestamp", Alert.timestamp)
+db.Index("ix_alerts_unresolved", Alert.timestamp, sqlite_where=Alert.resolved.is_(False))
+db.Index(
+    "ix_alerts_open_emergency",
+    Alert.timestamp,
+    sqlite_where=db.and_(
+        Alert.priority == "EMERGENCY",
+        Alert.acknowledged_at.is_(None),
+        Alert.escalation_flag.is_(False),
+        Alert.resolved.is_(False),
+    ),
+)
+
+
 class Message(db.Model):
     __tablename__ = "messages"
     id = db.Column(db.Integer, primary_key=True)
@@ -66,3 +153,6 @@ class Message(db.Model):
     command = db.Column(db.String, nullable=True)  # optional command e.g., STOP WORK
 
 
+db.Index("ix_messages_undelivered", Message.to_worker_id, sqlite_where=Message.delivered.is_(False))
+
+
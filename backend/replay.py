@@ -0,0 +1,201 @@
+"""
+Headless scenario replay on a virtual clock.
+
+Readings from the demo scenario CSVs or the archive go, in timestamp order
+across workers, through the live ingest path (_process_reading: rate limit,
+decision engine, create_or_update_alert and its cooldown) while a VirtualClock
+stands in for the wall clock. Between readings the clock stops at every
+scheduler deadline on the way, so unconscious detection and escalation fire
+at the same virtual instants the live server would fire them. Nothing sleeps:
+a day of fleet data takes as long as the database needs to store it.
+
+Run it against a scratch database on an app whose background threads were
+not started (see start_background); scripts/replay.py sets that up.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import heapq
+import itertools
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from backend import archive
+from backend.alerts import alert_to_dict
+from backend.clock import VirtualClock, clock
+from backend.db import db
+from backend.models import Alert, Worker
+from backend.rate_limit import window_counts
+from backend.routes_worker import REQUIRED_FIELDS, _process_reading
+from backend.scheduler import scheduler
+from backend.write_behind import writer
+
+# Scenario timestamps are offsets in seconds; they start here unless told otherwise.
+REPLAY_EPOCH = dt.datetime(2024, 1, 1)
+
+ReplayReading = Tuple[dt.datetime, str, Dict]
+
+
+def scenario_readings(
+    paths: Sequence, workers: int = None, start: dt.datetime = REPLAY_EPOCH, until: dt.datetime = None
+) -> Iterator[ReplayReading]:
+    """
+    (timestamp, worker_id, payload) from scenario CSVs, merged in time order.
+    Worker R-000i plays paths[i % len(paths)] (one worker per file by default);
+    with `until` each worker loops its scenario back to back up to that time.
+    """
+    frames = [pd.read_csv(p) for p in paths]
+    workers = workers or len(frames)
+
+    def stream(i: int) -> Iterator[ReplayReading]:
+        df = frames[i % len(frames)]
+        offsets = df["timestamp"].astype(float).tolist()
+        step = offsets[1] - offsets[0] if len(offsets) > 1 else 1.0
+        period = offsets[-1] + step
+        payloads = df[REQUIRED_FIELDS].to_dict("records")
+        worker_id = f"R-{i:04d}"
+        for loop in itertools.count():
+            for offset, payload in zip(offsets, payloads):
+                ts = start + dt.timedelta(seconds=loop * period + offset)
+                if until is not None and ts >= until:
+                    return
+                yield ts, worker_id, payload
+            if until is None:
+                return
+
+    return heapq.merge(*(stream(i) for i in range(workers)), key=lambda r: r[0])
+
+
+def archived_readings(start: dt.datetime, end: dt.datetime, root=None) -> Iterator[ReplayReading]:
+    """Archived readings with start <= timestamp < end, in time order."""
+    columns = ("timestamp", "worker_id", *REQUIRED_FIELDS)
+    for row in archive.iter_rows("readings", start, end, columns, root):
+        yield row[0], row[1], dict(zip(REQUIRED_FIELDS, row[2:]))
+
+
+@dataclass
+class ReplayResult:
+    readings: int = 0
+    rejected: Counter = field(default_factory=Counter)  # HTTP status -> readings refused (e.g. 429)
+    statuses: Counter = field(default_factory=Counter)
+    deadlines: int = 0  # scheduler deadlines fired (inactivity and escalation checks)
+    start: Optional[dt.datetime] = None
+    end: Optional[dt.datetime] = None
+    wall_seconds: float = 0.0
+    alerts: List[Dict] = field(default_factory=list)
+
+    def alert_counts(self) -> Dict[str, int]:
+        """Alerts per "TYPE/PRIORITY", plus repeats folded in by cooldown and escalations."""
+        counts = Counter(f"{a['alert_type']}/{a['priority']}" for a in self.alerts)
+        counts["repeats"] = sum((a["count"] or 1) - 1 for a in self.alerts)
+        counts["escalated"] = sum(1 for a in self.alerts if a["escalation_flag"])
+        return dict(counts)
+
+    def speedup(self) -> float:
+        span = (self.end - self.start).total_seconds() if self.start else 0.0
+        return span / self.wall_seconds if self.wall_seconds else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "readings": self.readings,
+            "rejected": {str(k): v for k, v in self.rejected.items()},
+            "statuses": dict(self.statuses),
+            "deadlines": self.deadlines,
+            "start": self.start.isoformat() if self.start else None,
+            "end": self.end.isoformat() if self.end else None,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "speedup": round(self.speedup(), 1),
+            "alert_counts": self.alert_counts(),
+            "alerts": self.alerts,
+        }
+
+
+class ReplayEngine:
+    """Drives the ingest path and the deadline scheduler of `app` from a virtual clock."""
+
+    def __init__(self, app, zone: str = "NORMAL"):
+        self.app = app
+        self.zone = zone
+        self._workers: Dict[str, Worker] = {}
+
+    def _worker(self, worker_id: str) -> Worker:
+        worker = self._workers.get(worker_id)
+        if worker is None:
+            worker = Worker.query.filter_by(worker_id=worker_id).first()
+            if worker is None:
+                worker = Worker(worker_id=worker_id, name=worker_id, zone=self.zone, last_seen=clock.utcnow())
+                db.session.add(worker)
+                db.session.commit()
+            self._workers[worker_id] = worker
+        return worker
+
+    def _advance(self, virtual: VirtualClock, when: dt.datetime, result: ReplayResult) -> None:
+        """Move the clock to `when`, stopping at each deadline due on the way."""
+        while True:
+            due = scheduler.next_deadline()
+            if due is None or due > when:
+                break
+            virtual.set(max(due, virtual.utcnow()))
+            result.deadlines += scheduler.run_due(virtual.utcnow())
+        virtual.set(when)
+
+    def run(self, readings: Iterable[ReplayReading], until: dt.datetime = None,
+            tail_seconds: float = 0.0) -> ReplayResult:
+        """
+        Replay time-ordered (timestamp, worker_id, payload) readings, then keep
+        the clock running to `until` or `tail_seconds` past the last reading,
+        whichever is later, so trailing deadlines fire. Returns the counts and
+        the alerts raised for the replayed workers.
+        """
+        if scheduler.running or writer.running:
+            raise RuntimeError("replay needs the deadline scheduler and write-behind writer stopped")
+        readings = iter(readings)
+        first = next(readings, None)
+        result = ReplayResult()
+        if first is None:
+            return result
+        result.start = first[0]
+        virtual = VirtualClock(first[0])
+        started = time.perf_counter()
+        with self.app.app_context(), clock.use(virtual):
+            scheduler.bind(self.app)
+            # Deadlines fire in their own session; only this loop writes the rows it
+            # holds (workers, AI alerts), so reloading them after every commit is waste.
+            db.session().expire_on_commit = False
+            window_counts.clear()  # entries are wall-clock times
+            first_alert = db.session.query(db.func.max(Alert.id)).scalar() or 0
+            for ts, worker_id, payload in itertools.chain([first], readings):
+                self._advance(virtual, ts, result)
+                reply = _process_reading(payload, self._worker(worker_id))
+                if isinstance(reply, tuple):
+                    result.rejected[reply[1]] += 1
+                    continue
+                result.readings += 1
+                result.statuses[reply.get_json()["status"]] += 1
+            end = virtual.utcnow() + dt.timedelta(seconds=tail_seconds)
+            if until is not None:
+                end = max(end, until)
+            self._advance(virtual, end, result)
+            result.end = virtual.utcnow()
+            db.session.expire_all()  # pick up escalations made by the scheduler's session
+            alerts = Alert.query.filter(
+                Alert.id > first_alert, Alert.worker_id.in_(list(self._workers))
+            ).order_by(Alert.id)
+            result.alerts = [alert_to_dict(a) for a in alerts]
+            window_counts.clear()
+        result.wall_seconds = time.perf_counter() - started
+        return result
+
+
+def replay_scenarios(app, paths: Sequence, workers: int = None, start: dt.datetime = REPLAY_EPOCH,
+                     hours: float = None, tail_seconds: float = 0.0) -> ReplayResult:
+    """Replay scenario files (looped for `hours` if given), then `tail_seconds` of silence."""
+    until = start + dt.timedelta(hours=hours) if hours else None
+    readings = scenario_readings([Path(p) for p in paths], workers, start, until)
+    return ReplayEngine(app).run(readings, tail_seconds=tail_seconds)
@@ -0,0 +1,239 @@
+"""
+Asynchronous report jobs.
+
+A job covers a date range: each day's summary is computed in a worker
+process, the coordinator merges them in order and writes the summary and
+alerts CSVs (backend.reports), so no request thread waits on report work.
+
+Ranges that ended before today (in UTC, like every stored timestamp) are
+cached: the manifest maps the range to a fingerprint of its inputs (rollup
+counts plus alert counts/flags, so late readings or an alert resolved
+afterwards invalidate it) and the SHA-256 of the files written. A repeat
+request with the same fingerprint and intact files completes immediately
+without recomputing anything.
+"""
+
+from __future__ import annotations
+
+import atexit
+import concurrent.futures as cf
+import datetime as dt
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, create_engine, func, select
+from sqlalchemy.orm import Session
+
+import config
+from backend.clock import clock
+from backend.models import Alert, HourRollup
+from backend.reports import day_bounds, report_paths, summarize, write_alerts_csv, write_summary_csv
+
+log = logging.getLogger(__name__)
+
+MANIFEST_NAME = "report_cache.json"
+
+_process_engines: Dict = {}
+
+
+def _day_summary(url: str, day: dt.date, source: str, archive_dir: str) -> List[Dict]:
+    """
+    Runs in a pool process: one day's summary rows on the process's own engine.
+    The process starts from a fresh interpreter, so the archive location comes
+    from the parent rather than the child's default config.
+    """
+    config.ARCHIVE_DIR = archive_dir
+    engine = _process_engines.get(url)
+    if engine is None:
+        engine = _process_engines[url] = create_engine(url)
+    with Session(engine) as session:
+        return summarize(session, day, day, source)
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ReportJob:
+    def __init__(self, first: dt.date, last: dt.date, source: str):
+        self.id = uuid.uuid4().hex
+        self.first, self.last, self.source = first, last, source
+        self.status = "queued"  # queued | running | done | no_data | failed
+        self.cached = False
+        self.summary: Optional[Path] = None
+        self.alerts: Optional[Path] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "start": str(self.first),
+            "end": str(self.last),
+            "source": self.source,
+            "status": self.status,
+            "cached": self.cached,
+            "summary": str(self.summary) if self.summary else None,
+            "alerts": str(self.alerts) if self.alerts else None,
+            "error": self.error,
+        }
+
+
+class ReportJobs:
+    def __init__(self, max_workers: int = None, keep: int = None):
+        self.max_workers = max_workers or config.REPORT_WORKERS
+        self.keep = keep or config.REPORT_JOBS_KEEP
+        self._jobs: "OrderedDict[str, ReportJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._manifest_lock = threading.Lock()
+        self._engine = None
+        self._url: Optional[str] = None
+        self._pool: Optional[cf.Executor] = None
+        self._coordinator: Optional[cf.ThreadPoolExecutor] = None
+
+    def bind(self, engine) -> None:
+        """Engine for fingerprints and alerts CSVs; pool processes open their own from its URL."""
+        self._engine = engine
+        self._url = engine.url.render_as_string(hide_password=False)
+
+    def _executors(self):
+        if self._pool is None:
+            # Never fork: this process runs threads (scheduler, SSE, writer, the
+            # coordinator) whose locks a forked child could inherit held.
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._pool = cf.ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context(method))
+            self._coordinator = cf.ThreadPoolExecutor(2, thread_name_prefix="report-job")
+            atexit.register(self.shutdown)
+        return self._pool, self._coordinator
+
+    def shutdown(self) -> None:
+        if self._coordinator is not None:
+            self._coordinator.shutdown(wait=False, cancel_futures=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._coordinator = None
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        return self._jobs.get(job_id)
+
+    def submit(self, first: dt.date, last: dt.date, source: str = None) -> ReportJob:
+        job = ReportJob(first, last, source or config.REPORT_SOURCE)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.keep:
+                self._jobs.popitem(last=False)
+        if self._cache_hit(job):
+            return job
+        pool, coordinator = self._executors()
+        days = [first + dt.timedelta(days=i) for i in range((last - first).days + 1)]
+        archive_dir = str(Path(config.ARCHIVE_DIR).resolve())
+        futures = [pool.submit(_day_summary, self._url, day, job.source, archive_dir) for day in days]
+        coordinator.submit(self._finish, job, futures)
+        return job
+
+    # -- coordination -------------------------------------------------------
+
+    def _finish(self, job: ReportJob, futures) -> None:
+        job.status = "running"
+        try:
+            rows = [row for future in futures for row in future.result()]
+            if not rows:
+                job.status = "no_data"
+                return
+            reports_dir = Path(config.REPORTS_DIR)
+            reports_dir.mkdir(exist_ok=True)
+            summary_path, alerts_path = report_paths(job.first, job.last, reports_dir)
+            fingerprint = self._fingerprint(job) if self._closed(job) else None
+            write_summary_csv(rows, summary_path)
+            with Session(self._engine) as session:
+                write_alerts_csv(session, job.first, job.last, alerts_path)
+            job.summary, job.alerts = summary_path, alerts_path
+            if fingerprint is not None:
+                self._remember(job, fingerprint)
+            job.status = "done"
+        except Exception as exc:  # surfaced through the job status
+            log.exception("report job %s failed", job.id)
+            job.status, job.error = "failed", str(exc)
+
+    # -- cache --------------------------------------------------------------
+
+    @staticmethod
+    def _closed(job: ReportJob) -> bool:
+        return job.last < clock.utcnow().date()
+
+    @staticmethod
+    def _key(job: ReportJob) -> str:
+        return f"{job.first}_{job.last}_{job.source}"
+
+    def _fingerprint(self, job: ReportJob) -> str:
+        """Hash of the inputs a closed range's report depends on (two small aggregate queries)."""
+        start, end = day_bounds(job.first, job.last)
+        h, a = HourRollup.__table__, Alert.__table__
+        with Session(self._engine) as session:
+            rollups = session.execute(
+                select(func.count(), func.sum(h.c.count), func.sum(h.c.sum_risk), func.sum(h.c.alert_count)).where(
+                    h.c.bucket >= start, h.c.bucket < end
+                )
+            ).one()
+            alerts = session.execute(
+                select(
+                    func.count(),
+                    func.max(a.c.id),
+                    func.sum(case((a.c.resolved.is_(True), 1), else_=0)),
+                    func.count(a.c.acknowledged_by),
+                ).where(a.c.timestamp >= start, a.c.timestamp < end)
+            ).one()
+        return hashlib.sha256(repr((tuple(rollups), tuple(alerts))).encode()).hexdigest()
+
+    def _manifest_path(self) -> Path:
+        return Path(config.REPORTS_DIR) / MANIFEST_NAME
+
+    def _load_manifest(self) -> Dict:
+        try:
+            return json.loads(self._manifest_path().read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _remember(self, job: ReportJob, fingerprint: str) -> None:
+        with self._manifest_lock:
+            manifest = self._load_manifest()
+            manifest[self._key(job)] = {
+                "fingerprint": fingerprint,
+                "summary": str(job.summary),
+                "alerts": str(job.alerts),
+                "sha256": {"summary": _sha256(job.summary), "alerts": _sha256(job.alerts)},
+            }
+            tmp = self._manifest_path().with_suffix(".tmp")
+            tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+            os.replace(tmp, self._manifest_path())
+
+    def _cache_hit(self, job: ReportJob) -> bool:
+        if not self._closed(job):
+            return False
+        entry = self._load_manifest().get(self._key(job))
+        if not entry or entry["fingerprint"] != self._fingerprint(job):
+            return False
+        summary, alerts = Path(entry["summary"]), Path(entry["alerts"])
+        try:
+            intact = _sha256(summary) == entry["sha256"]["summary"] and _sha256(alerts) == entry["sha256"]["alerts"]
+        except OSError:
+            return False
+        if not intact:
+            return False
+        job.summary, job.alerts = summary, alerts
+        job.status, job.cached = "done", True
+        return True
+
+
+report_jobs = ReportJobs()
@@ -0,0 +1,218 @@
+"""
+Daily and date-range CSV reports.
+
+Per-worker, per-day figures come from one aggregate query (GROUP BY worker_id,
+day) over either the hourly rollups or the raw readings; the latter adds
+per-day alert counts and any days moved to the archive. The alerts listing is
+streamed from the database to disk in chunks, so memory stays flat however
+large the range is.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import heapq
+import os
+import tempfile
+from contextlib import contextmanager
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, select
+
+import config
+from backend import archive
+from backend.models import Alert, HourRollup, Reading
+
+SUMMARY_FIELDS = [
+    "worker_id",
+    "date",
+    "total_readings",
+    "total_alerts",
+    "avg_hr",
+    "avg_spo2",
+    "avg_temp",
+    "avg_gas",
+    "%safe",
+    "%warning",
+    "%emergency",
+]
+ALERT_FIELDS = ["timestamp", "worker_id", "alert_type", "priority", "reason", "acknowledged_by", "resolved"]
+SOURCES = ("rollups", "readings")
+
+
+def day_bounds(first: dt.date, last: dt.date) -> Tuple[dt.datetime, dt.datetime]:
+    """[start, end) covering the whole days first..last."""
+    return dt.datetime.combine(first, dt.time.min), dt.datetime.combine(last + dt.timedelta(days=1), dt.time.min)
+
+
+def _status_count(status_col, status: str):
+    return func.sum(case((status_col == status, 1), else_=0))
+
+
+# Summaries are built from additive per worker/day partials (count, sums and
+# non-null counts per vital, status counts, alerts), so database and archive
+# figures for the same day can be merged exactly.
+_VITALS = (("hr", "heart_rate"), ("spo2", "spo2"), ("temp", "temperature"), ("gas", "gas"))
+_STATUSES = ("safe", "warning", "emergency")
+
+
+def _reading_partials(executor, start: dt.datetime, end: dt.datetime):
+    r = Reading.__table__
+    day = func.date(r.c.timestamp)
+    columns = [r.c.worker_id, day.label("day"), func.count().label("count")]
+    for suffix, field in _VITALS:
+        columns += [func.total(r.c[field]).label(f"sum_{suffix}"), func.count(r.c[field]).label(f"n_{suffix}")]
+    columns += [_status_count(r.c.status, status.upper()).label(status) for status in _STATUSES]
+    stmt = select(*columns).where(r.c.timestamp >= start, r.c.timestamp < end).group_by(r.c.worker_id, day)
+    return executor.execute(stmt).mappings().all()
+
+
+def _alert_partials(executor, start: dt.datetime, end: dt.datetime):
+    a = Alert.__table__
+    day = func.date(a.c.timestamp)
+    stmt = (
+        select(a.c.worker_id, day.label("day"), func.count().label("alerts"))
+        .where(a.c.timestamp >= start, a.c.timestamp < end)
+        .group_by(a.c.worker_id, day)
+    )
+    return executor.execute(stmt).mappings().all()
+
+
+def _rollup_partials(executor, start: dt.datetime, end: dt.datetime):
+    h = HourRollup.__table__
+    day = func.date(h.c.bucket)
+    count = func.sum(h.c.count)
+    columns = [h.c.worker_id, day.label("day"), count.label("count")]
+    for suffix, _ in _VITALS:
+        columns += [func.sum(h.c[f"sum_{suffix}"]).label(f"sum_{suffix}"), count.label(f"n_{suffix}")]
+    columns += [func.sum(h.c[f"{status}_count"]).label(status) for status in _STATUSES]
+    columns.append(func.sum(h.c.alert_count).label("alerts"))
+    stmt = select(*columns).where(h.c.bucket >= start, h.c.bucket < end).group_by(h.c.worker_id, day)
+    return executor.execute(stmt).mappings().all()
+
+
+def _merge(*sources) -> List[Dict]:
+    """Sum partials sharing (day, worker_id); ordered by day, then worker."""
+    merged: Dict[Tuple[str, str], Dict] = {}
+    for partials in sources:
+        for part in partials:
+            key = (part["day"], part["worker_id"])
+            acc = merged.setdefault(key, {"worker_id": key[1], "day": key[0]})
+            for name, value in part.items():
+                if name not in ("worker_id", "day"):
+                    acc[name] = acc.get(name, 0) + (value or 0)
+    return [merged[key] for key in sorted(merged)]
+
+
+def _avg(total, n) -> Optional[float]:
+    return round(total / n, 2) if n else None
+
+
+def summarize(executor, first: dt.date, last: dt.date, source: str = None) -> List[Dict]:
+    """
+    One summary row per worker and day in first..last. The readings source
+    also reads days moved to the archive (backend.archive).
+    """
+    source = source or config.REPORT_SOURCE
+    if source not in SOURCES:
+        raise ValueError(f"source must be one of {', '.join(SOURCES)}")
+    start, end = day_bounds(first, last)
+    if source == "rollups":
+        partials = _merge(_rollup_partials(executor, start, end))
+    else:
+        partials = _merge(
+            _reading_partials(executor, start, end),
+            _alert_partials(executor, start, end),
+            archive.reading_partials(start, end),
+            archive.alert_partials(start, end),
+        )
+    rows = []
+    for t in partials:
+        total = t.get("count", 0)
+        if not total:  # alerts on a day without readings
+            continue
+        row = {"worker_id": t["worker_id"], "date": t["day"], "total_readings": total, "total_alerts": t.get("alerts", 0)}
+        for suffix, _ in _VITALS:
+            row[f"avg_{suffix}"] = _avg(t[f"sum_{suffix}"], t[f"n_{suffix}"])
+        for status in _STATUSES:
+            row[f"%{status}"] = round(t[status] / total * 100, 2)
+        rows.append(row)
+    return rows
+
+
+@contextmanager
+def _replacing(path: Path):
+    """
+    Text file that replaces `path` once the block completes. The temp file is
+    unique, so concurrent jobs for the same range never write into each other.
+    """
+    fh = tempfile.NamedTemporaryFile("w", newline="", dir=path.parent, prefix=f".{path.name}.", delete=False)
+    try:
+        with fh:
+            yield fh
+        os.replace(fh.name, path)
+    except BaseException:
+        os.unlink(fh.name)
+        raise
+
+
+def write_alerts_csv(executor, first: dt.date, last: dt.date, path: Path, chunk_rows: int = None) -> int:
+    """
+    Stream the alerts of first..last to `path`, chunk_rows at a time, archived
+    (resolved) alerts interleaved by timestamp. Returns rows written.
+    """
+    chunk_rows = chunk_rows or config.REPORT_CHUNK_ROWS
+    start, end = day_bounds(first, last)
+    a = Alert.__table__
+    stmt = (
+        select(*(a.c[name] for name in ALERT_FIELDS))
+        .where(a.c.timestamp >= start, a.c.timestamp < end)
+        .order_by(a.c.timestamp)
+        .execution_options(yield_per=chunk_rows)
+    )
+    written = 0
+    with _replacing(path) as fh:
+        out = csv.writer(fh)
+        out.writerow(ALERT_FIELDS)
+        chunks = executor.execute(stmt).partitions()
+        until = archive.archived_until("alerts")
+        if until is not None and start < until:
+            rows = (row for chunk in chunks for row in chunk)
+            merged = heapq.merge(archive.iter_rows("alerts", start, end, ALERT_FIELDS), rows, key=itemgetter(0))
+            chunks = iter(lambda: list(islice(merged, chunk_rows)), [])
+        for chunk in chunks:
+            out.writerows(chunk)
+            written += len(chunk)
+    return written
+
+
+def write_summary_csv(rows: List[Dict], path: Path) -> None:
+    with _replacing(path) as fh:
+        out = csv.DictWriter(fh, fieldnames=SUMMARY_FIELDS)
+        out.writeheader()
+        out.writerows(rows)
+
+
+def report_paths(first: dt.date, last: dt.date, reports_dir: Path) -> Tuple[Path, Path]:
+    if first == last:
+        return reports_dir / f"daily_report_{first}.csv", reports_dir / f"alerts_{first}.csv"
+    return reports_dir / f"report_{first}_{last}.csv", reports_dir / f"alerts_{first}_{last}.csv"
+
+
+def write_report(
+    executor, first: dt.date, last: dt.date, reports_dir: Path = None, source: str = None
+) -> Optional[Tuple[Path, Path]]:
+    """Write the summary and alerts CSVs for first..last; None when there are no readings."""
+    rows = summarize(executor, first, last, source)
+    if not rows:
+        return None
+    reports_dir = Path(reports_dir or config.REPORTS_DIR)
+    reports_dir.mkdir(exist_ok=True)
+    summary_path, alerts_path = report_paths(first, last, reports_dir)
+    write_summary_csv(rows, summary_path)
+    write_alerts_csv(executor, first, last, alerts_path)
+    return summary_path, alerts_path
@@ -0,0 +1,186 @@
+"""
+Per-worker minute and hour rollups of readings and alerts.
+
+Ingest folds each block of readings into the two tables with one upsert per
+granularity (count, sums, min/max per vital, status counts), and each alert
+counts in the buckets of its latest timestamp, so reports and trend views read
+a few hundred buckets instead of every reading. rebuild_rollups() recomputes a
+time range from the source tables (backfill or repair).
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, func, literal, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from backend.models import Alert, HourRollup, MinuteRollup, Reading
+
+# rollup column suffix -> Reading attribute
+VITALS = (("hr", "heart_rate"), ("spo2", "spo2"), ("temp", "temperature"), ("gas", "gas"))
+STATUS_COLUMNS = {"SAFE": "safe_count", "WARNING": "warning_count", "EMERGENCY": "emergency_count"}
+# bucket start in SQLAlchemy's SQLite DateTime storage format, so keys match bound values
+_SQL_FORMATS = {MinuteRollup: "%Y-%m-%d %H:%M:00.000000", HourRollup: "%Y-%m-%d %H:00:00.000000"}
+
+
+def minute_bucket(ts: dt.datetime) -> dt.datetime:
+    return ts.replace(second=0, microsecond=0)
+
+
+def hour_bucket(ts: dt.datetime) -> dt.datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+GRANULARITIES = ((MinuteRollup, minute_bucket), (HourRollup, hour_bucket))
+
+
+def _number(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _empty(worker_id: str, bucket: dt.datetime) -> Dict:
+    agg = {"worker_id": worker_id, "bucket": bucket, "count": 0, "sum_risk": 0.0, "max_risk": None, "alert_count": 0}
+    for suffix, _ in VITALS:
+        agg.update({f"sum_{suffix}": 0.0, f"min_{suffix}": None, f"max_{suffix}": None})
+    agg.update({col: 0 for col in STATUS_COLUMNS.values()})
+    return agg
+
+
+def _aggregate(rows: Iterable[Dict], floor) -> Dict[Tuple[str, dt.datetime], Dict]:
+    buckets: Dict[Tuple[str, dt.datetime], Dict] = {}
+    for row in rows:
+        key = (row["worker_id"], floor(row["timestamp"]))
+        agg = buckets.get(key)
+        if agg is None:
+            agg = buckets[key] = _empty(*key)
+        agg["count"] += 1
+        for suffix, field in VITALS:
+            value = _number(row[field])
+            if value is None:
+                continue
+            agg[f"sum_{suffix}"] += value
+            low, high = agg[f"min_{suffix}"], agg[f"max_{suffix}"]
+            agg[f"min_{suffix}"] = value if low is None else min(low, value)
+            agg[f"max_{suffix}"] = value if high is None else max(high, value)
+        risk = _number(row["risk_score"]) or 0.0
+        agg["sum_risk"] += risk
+        agg["max_risk"] = risk if agg["max_risk"] is None else max(agg["max_risk"], risk)
+        status_col = STATUS_COLUMNS.get(row["status"])
+        if status_col:
+            agg[status_col] += 1
+    return buckets
+
+
+@lru_cache(maxsize=None)
+def _merge_stmt(model):
+    """Upsert that adds counts/sums and widens min/max of an existing bucket (built once per table)."""
+    table = model.__table__
+    stmt = sqlite_insert(table)
+    new = stmt.excluded
+    set_ = {}
+    for col in table.c:
+        name = col.name
+        if name in ("worker_id", "bucket"):
+            continue
+        if name.startswith("min_"):
+            set_[name] = func.min(func.coalesce(col, new[name]), func.coalesce(new[name], col))
+        elif name.startswith("max_"):
+            set_[name] = func.max(func.coalesce(col, new[name]), func.coalesce(new[name], col))
+        else:
+            set_[name] = col + new[name]
+    return stmt.on_conflict_do_update(index_elements=[table.c.worker_id, table.c.bucket], set_=set_)
+
+
+def apply_readings(executor, rows: Iterable[Dict]) -> None:
+    """Fold readings into both rollup tables. executor is a Session or Connection (caller's transaction)."""
+    rows = list(rows)
+    if not rows:
+        return
+    for model, floor in GRANULARITIES:
+        executor.execute(_merge_stmt(model), list(_aggregate(rows, floor).values()))
+
+
+def record_alert(executor, worker_id: str, timestamp: dt.datetime, previous: Optional[dt.datetime] = None) -> None:
+    """
+    Count an alert in the minute and hour buckets of its timestamp, the rule
+    rebuild_rollups() and the readings report use. When a repeat moves it
+    forward, pass its `previous` timestamp so the count leaves the old buckets.
+    """
+    for model, floor in GRANULARITIES:
+        bucket = floor(timestamp)
+        if previous is not None:
+            old = floor(previous)
+            if old == bucket:
+                continue
+            table = model.__table__
+            at_old = and_(table.c.worker_id == worker_id, table.c.bucket == old)
+            executor.execute(
+                update(table).where(at_old, table.c.alert_count > 0).values(alert_count=table.c.alert_count - 1)
+            )
+            # an alert-only bucket left empty would not survive a rebuild either
+            executor.execute(delete(table).where(at_old, table.c.count == 0, table.c.alert_count == 0))
+        agg = _empty(worker_id, bucket)
+        agg["alert_count"] = 1
+        executor.execute(_merge_stmt(model), [agg])
+
+
+def rebuild_rollups(executor, start: Optional[dt.datetime] = None, end: Optional[dt.datetime] = None) -> None:
+    """
+    Recompute both tables for [start, end) (whole hours; default everything)
+    with one INSERT ... SELECT per table plus one for alert counts.
+    """
+    start = hour_bucket(start) if start else None
+    if end and end != hour_bucket(end):
+        end = hour_bucket(end) + dt.timedelta(hours=1)
+    readings, alerts = Reading.__table__, Alert.__table__
+
+    def in_range(column):
+        conds = [literal(True)]
+        if start:
+            conds.append(column >= start)
+        if end:
+            conds.append(column < end)
+        return and_(*conds)
+
+    for model, _ in GRANULARITIES:
+        table = model.__table__
+        executor.execute(delete(table).where(in_range(table.c.bucket)))
+        bucket = func.strftime(_SQL_FORMATS[model], readings.c.timestamp)
+        columns = [readings.c.worker_id, bucket, func.count()]
+        names = ["worker_id", "bucket", "count"]
+        for suffix, field in VITALS:
+            value = readings.c[field]
+            columns += [func.total(value), func.min(value), func.max(value)]
+            names += [f"sum_{suffix}", f"min_{suffix}", f"max_{suffix}"]
+        columns += [func.total(readings.c.risk_score), func.max(readings.c.risk_score)]
+        names += ["sum_risk", "max_risk"]
+        for status, col in STATUS_COLUMNS.items():
+            columns.append(func.total(case((readings.c.status == status, 1), else_=0)))
+            names.append(col)
+        columns.append(literal(0))
+        names.append("alert_count")
+        source = select(*columns).where(in_range(readings.c.timestamp)).group_by(readings.c.worker_id, bucket)
+        executor.execute(sqlite_insert(table).from_select(names, source))
+
+        alert_bucket = func.strftime(_SQL_FORMATS[model], alerts.c.timestamp)
+        # buckets with alerts but no readings still need the NOT NULL counters
+        filler_names = [name for name in names if name not in ("worker_id", "bucket", "alert_count")]
+        fillers = [literal(None) if name.startswith(("min_", "max_")) else literal(0) for name in filler_names]
+        alert_source = (
+            select(alerts.c.worker_id, alert_bucket, func.count(), *fillers)
+            .where(in_range(alerts.c.timestamp))
+            .group_by(alerts.c.worker_id, alert_bucket)
+        )
+        stmt = sqlite_insert(table).from_select(["worker_id", "bucket", "alert_count", *filler_names], alert_source)
+        executor.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.worker_id, table.c.bucket],
+                set_={"alert_count": stmt.excluded.alert_count},
+            )
+        )
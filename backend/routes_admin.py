@@ -3,19 +3,33 @@
 from __future__ import annotations
 
 import datetime as dt
-from pathlib import Path
+import queue
+import time
 
-import pandas as pd
-from flask import Blueprint, jsonify, request, session
+import numpy as np
+from flask import Blueprint, Response, jsonify, request, send_file, session
+from sqlalchemy import func, select
 
 import config
-from backend.alerts import create_or_update_alert, escalate_overdue_emergencies
+from backend import archive
+from backend.alerts import acknowledge_alert, alert_to_dict, create_or_update_alert
+from backend.alerts import resolve_alert as mark_alert_resolved
 from backend.auth import ensure_admin
-from backend.db import db
-from backend.models import Alert, Message, Reading, Worker
+from backend.clock import clock
+from backend.db import db, read_session
+from backend.downsample import METHODS, downsample
+from backend.events import bus, format_sse
+from backend.history_store import columns_from_rows, history_store, to_payload
+from backend.report_jobs import report_jobs
+from backend.reports import SOURCES, write_report
+from backend.models import Alert, HourRollup, Message, MinuteRollup, Reading, Worker, WorkerState
+from backend.versions import versions
 
 admin_bp = Blueprint("admin", __name__)
 
+# Charted series of the downsampled history
+SERIES = ("heart_rate", "spo2", "temperature", "gas", "fatigue", "risk_score")
+
 
 def _require_admin():
     if not ensure_admin():
@@ -23,55 +37,60 @@ def _require_admin():
     return None
 
 
-def _check_unconscious():
-    now = dt.datetime.utcnow()
-    workers = Worker.query.all()
-    for w in workers:
-        delta = (now - (w.last_seen or now)).total_seconds()
-        if delta > config.INACTIVITY_TIMEOUT:
-            last_reading = (
-                Reading.query.filter_by(worker_id=w.worker_id)
-                .order_by(Reading.timestamp.desc())
-                .first()
-            )
-            if last_reading is None or last_reading.status in {"SAFE", "WARNING"}:
-                create_or_update_alert(
-                    w.worker_id, "UNCONSCIOUS", "EMERGENCY", "No recent activity — possible unconsciousness"
-                )
+def _not_modified(etag: str):
+    """304 for a matching If-None-Match, answered from the version counters alone."""
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+        resp.set_etag(etag)
+        return resp
+    return None
+
+
+def _with_etag(resp, etag: str):
+    resp.set_etag(etag)
+    # let browsers keep the body but revalidate on every request
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
 
 
 @admin_bp.route("/workers", methods=["GET"])
 def workers():
+    """
+    Fleet view. The ETag follows ingest (readings/state); last_seen refreshed
+    by worker polls alone does not change it.
+    """
     err = _require_admin()
     if err:
         return err
-    _check_unconscious()
-    escalate_overdue_emergencies()
-    workers = Worker.query.all()
+    etag = versions.etag("workers", versions.fleet())
+    cached = _not_modified(etag)
+    if cached:
+        return cached
+    rows = (
+        read_session()
+        .query(Worker, WorkerState)
+        .outerjoin(WorkerState, WorkerState.worker_id == Worker.worker_id)
+        .all()
+    )
     payload = []
-    for w in workers:
-        last_reading = (
-            Reading.query.filter_by(worker_id=w.worker_id)
-            .order_by(Reading.timestamp.desc())
-            .first()
-        )
+    for w, state in rows:
         payload.append(
             {
                 "worker_id": w.worker_id,
                 "name": w.name,
                 "zone": w.zone,
                 "last_seen": w.last_seen.isoformat() if w.last_seen else None,
-                "status": last_reading.status if last_reading else "UNKNOWN",
-                "risk_score": last_reading.risk_score if last_reading else None,
-                "heart_rate": last_reading.heart_rate if last_reading else None,
-                "spo2": last_reading.spo2 if last_reading else None,
-                "temperature": last_reading.temperature if last_reading else None,
-                "gas": last_reading.gas if last_reading else None,
-                "fatigue": last_reading.fatigue if last_reading else None,
-                "last_reading_ts": last_reading.timestamp.isoformat() if last_reading else None,
+                "status": state.status if state else "UNKNOWN",
+                "risk_score": state.risk_score if state else None,
+                "heart_rate": state.heart_rate if state else None,
+                "spo2": state.spo2 if state else None,
+                "temperature": state.temperature if state else None,
+                "gas": state.gas if state else None,
+                "fatigue": state.fatigue if state else None,
+                "last_reading_ts": state.timestamp.isoformat() if state else None,
             }
         )
-    return jsonify(payload)
+    return _with_etag(jsonify(payload), etag)
 
 
 @admin_bp.route("/latest/<worker_id>", methods=["GET"])
@@ -79,14 +98,14 @@ def latest(worker_id):
     err = _require_admin()
     if err:
         return err
-    reading = (
-        Reading.query.filter_by(worker_id=worker_id)
-        .order_by(Reading.timestamp.desc())
-        .first()
-    )
+    etag = versions.etag("latest", worker_id, versions.worker(worker_id))
+    cached = _not_modified(etag)
+    if cached:
+        return cached
+    reading = read_session().get(WorkerState, worker_id)
     if not reading:
         return jsonify({"error": "no data"}), 404
-    return jsonify(
+    resp = jsonify(
         {
             "timestamp": reading.timestamp.isoformat(),
             "heart_rate": reading.heart_rate,
@@ -98,6 +117,7 @@ def latest(worker_id):
             "status": reading.status,
         }
     )
+    return _with_etag(resp, etag)
 
 
 @admin_bp.route("/alerts", methods=["GET"])
@@ -105,40 +125,53 @@ def alerts():
     err = _require_admin()
     if err:
         return err
-    active = Alert.query.filter_by(resolved=False).order_by(Alert.timestamp.desc()).all()
-    return jsonify(
-        [
-            {
-                "id": a.id,
-                "worker_id": a.worker_id,
-                "timestamp": a.timestamp.isoformat(),
-                "alert_type": a.alert_type,
-                "priority": a.priority,
-                "reason": a.reason,
-                "acknowledged_by": a.acknowledged_by,
-                "resolved": a.resolved,
-                "count": a.count,
-                "escalation_flag": a.escalation_flag,
-            }
-            for a in active
-        ]
-    )
+    etag = versions.etag("alerts", versions.alerts())
+    cached = _not_modified(etag)
+    if cached:
+        return cached
+    active = read_session().query(Alert).filter(Alert.resolved.is_(False)).order_by(Alert.timestamp.desc()).all()
+    return _with_etag(jsonify([alert_to_dict(a) for a in active]), etag)
 
 
 @admin_bp.route("/worker/<worker_id>/history", methods=["GET"])
 def worker_history(worker_id):
+    """
+    Readings of the last `minutes` (default 6). With `max_points` the reply is
+    downsampled per series: {"raw_points", "method", "series": {name: {"t", "v"}},
+    "latest"}, times in epoch ms; `method` is lttb (default) or minmax. Gas,
+    risk and fatigue always keep per-bucket min/max so spikes survive.
+    """
     err = _require_admin()
     if err:
         return err
     minutes = int(request.args.get("minutes", 6))
+    max_points = request.args.get("max_points", type=int)
+    method = request.args.get("method", "lttb")
+    if max_points is not None and (max_points < 3 or method not in METHODS):
+        return jsonify({"error": "max_points must be >= 3 and method one of " + ", ".join(METHODS)}), 400
+    # the minute bucket lets rows age out of the window for idle workers
+    etag = versions.etag(
+        "history", worker_id, versions.worker(worker_id), minutes, max_points, method, int(time.time() // 60)
+    )
+    cached = _not_modified(etag)
+    if cached:
+        return cached
     since = dt.datetime.utcnow() - dt.timedelta(minutes=minutes)
+    if max_points is not None:
+        return _with_etag(jsonify(_downsampled_history(worker_id, since, max_points, method)), etag)
+    if config.HISTORY_STORE_ENABLED:
+        cached = history_store.window(worker_id, since)
+        if cached is not None:
+            return _with_etag(jsonify(cached), etag)
     readings = (
-        Reading.query.filter(Reading.worker_id == worker_id, Reading.timestamp >= since)
+        read_session().query(Reading).filter(Reading.worker_id == worker_id, Reading.timestamp >= since)
         .order_by(Reading.timestamp.asc())
         .all()
     )
-    return jsonify(
-        [
+    archived = archive.history_columns(worker_id, since)
+    resp = jsonify(
+        (to_payload(archived) if archived is not None else [])
+        + [
             {
                 "timestamp": r.timestamp.isoformat(),
                 "heart_rate": r.heart_rate,
@@ -152,6 +185,148 @@ def worker_history(worker_id):
             for r in readings
         ]
     )
+    return _with_etag(resp, etag)
+
+
+def _downsampled_history(worker_id: str, since: dt.datetime, max_points: int, method: str):
+    cols = history_store.window_columns(worker_id, since) if config.HISTORY_STORE_ENABLED else None
+    if cols is None:
+        rows = read_session().execute(
+            select(Reading.__table__)
+            .where(Reading.worker_id == worker_id, Reading.timestamp >= since)
+            .order_by(Reading.timestamp.asc())
+        ).mappings()
+        cols = columns_from_rows(rows)
+        archived = archive.history_columns(worker_id, since)
+        if archived is not None:
+            cols = {name: np.concatenate((archived[name], col)) for name, col in cols.items()}
+            if (np.diff(cols["timestamp"]) < np.timedelta64(0)).any():  # late rows not yet archived
+                order = np.argsort(cols["timestamp"], kind="stable")
+                cols = {name: col[order] for name, col in cols.items()}
+    raw_points = len(cols["id"])
+    times_ms = cols["timestamp"].astype("datetime64[ms]").astype(np.int64)
+    series = downsample(times_ms, {name: cols[name] for name in SERIES}, max_points, method)
+    latest = to_payload({name: col[-1:] for name, col in cols.items()})[0] if raw_points else None
+    return {"raw_points": raw_points, "method": method, "series": series, "latest": latest}
+
+
+def _rollup_payload(r) -> dict:
+    n = r.count or 0
+
+    def avg(total):
+        return round(total / n, 2) if n else None
+
+    return {
+        "bucket": r.bucket.isoformat(),
+        "count": n,
+        "avg_hr": avg(r.sum_hr),
+        "min_hr": r.min_hr,
+        "max_hr": r.max_hr,
+        "avg_spo2": avg(r.sum_spo2),
+        "min_spo2": r.min_spo2,
+        "max_spo2": r.max_spo2,
+        "avg_temp": avg(r.sum_temp),
+        "min_temp": r.min_temp,
+        "max_temp": r.max_temp,
+        "avg_gas": avg(r.sum_gas),
+        "min_gas": r.min_gas,
+        "max_gas": r.max_gas,
+        "avg_risk": avg(r.sum_risk),
+        "max_risk": r.max_risk,
+        "safe": r.safe_count,
+        "warning": r.warning_count,
+        "emergency": r.emergency_count,
+        "alerts": r.alert_count,
+    }
+
+
+@admin_bp.route("/worker/<worker_id>/trend", methods=["GET"])
+def worker_trend(worker_id):
+    """Per-minute or per-hour rollups (`resolution`) for the last `hours` (default 24)."""
+    err = _require_admin()
+    if err:
+        return err
+    hours = int(request.args.get("hours", 24))
+    model = MinuteRollup if request.args.get("resolution", "hour") == "minute" else HourRollup
+    since = dt.datetime.utcnow() - dt.timedelta(hours=hours)
+    rows = (
+        read_session().query(model)
+        .filter(model.worker_id == worker_id, model.bucket >= since.replace(second=0, microsecond=0))
+        .order_by(model.bucket.asc())
+        .all()
+    )
+    return jsonify([_rollup_payload(r) for r in rows])
+
+
+@admin_bp.route("/kpis", methods=["GET"])
+def fleet_kpis():
+    """Fleet totals over the last `hours` (default 24) from the hourly rollups."""
+    err = _require_admin()
+    if err:
+        return err
+    hours = int(request.args.get("hours", 24))
+    since = (dt.datetime.utcnow() - dt.timedelta(hours=hours)).replace(minute=0, second=0, microsecond=0)
+    h = HourRollup
+    t = read_session().execute(
+        select(
+            func.count(func.distinct(h.worker_id)).label("workers"),
+            func.coalesce(func.sum(h.count), 0).label("readings"),
+            func.coalesce(func.sum(h.safe_count), 0).label("safe"),
+            func.coalesce(func.sum(h.warning_count), 0).label("warning"),
+            func.coalesce(func.sum(h.emergency_count), 0).label("emergency"),
+            func.coalesce(func.sum(h.alert_count), 0).label("alerts"),
+            func.max(h.max_risk).label("max_risk"),
+        ).where(h.bucket >= since)
+    ).one()
+    total = t.readings
+
+    def pct(n):
+        return round(n / total * 100, 2) if total else 0.0
+
+    return jsonify(
+        {
+            "since": since.isoformat(),
+            "workers_reporting": t.workers,
+            "total_readings": total,
+            "total_alerts": t.alerts,
+            "max_risk": t.max_risk,
+            "%safe": pct(t.safe),
+            "%warning": pct(t.warning),
+            "%emergency": pct(t.emergency),
+        }
+    )
+
+
+@admin_bp.route("/stream", methods=["GET"])
+def stream():
+    """
+    Server-Sent Events: `worker` state deltas and `alert` changes for the fleet,
+    plus `reading` events for ?worker_id=<id>. Clients load a snapshot through
+    the regular endpoints on (re)connect and then apply the deltas.
+    """
+    err = _require_admin()
+    if err:
+        return err
+    sub = bus.subscribe(worker_id=request.args.get("worker_id"))
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            while not sub.overflowed:
+                try:
+                    event, data = sub.queue.get(timeout=config.SSE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event, data)
+        finally:
+            bus.unsubscribe(sub)
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @admin_bp.route("/message", methods=["POST"])
@@ -188,9 +363,7 @@ def ack_alert():
     alert = Alert.query.get(alert_id)
     if not alert:
         return jsonify({"error": "alert not found"}), 404
-    alert.acknowledged_by = admin_user
-    alert.acknowledged_at = dt.datetime.utcnow()
-    db.session.commit()
+    acknowledge_alert(alert, admin_user)
     return jsonify({"message": "acknowledged"})
 
 
@@ -204,8 +377,7 @@ def resolve_alert():
     alert = Alert.query.get(alert_id)
     if not alert:
         return jsonify({"error": "alert not found"}), 404
-    alert.resolved = True
-    db.session.commit()
+    mark_alert_resolved(alert)
     return jsonify({"message": "resolved"})
 
 
@@ -228,80 +400,97 @@ def admin_action():
     return jsonify({"message": "action applied"})
 
 
+def _parse_date(value: str, default: dt.date = None) -> dt.date:
+    return dt.datetime.strptime(value, "%Y-%m-%d").date() if value else default
+
+
+def _parse_range(start: str, end: str):
+    """(first, last, None) for a valid start..end, else (None, None, error response)."""
+    try:
+        first = _parse_date(start)
+        last = _parse_date(end, first)
+    except (TypeError, ValueError):
+        return None, None, (jsonify({"error": "dates must be YYYY-MM-DD"}), 400)
+    if first is None or last < first:
+        return None, None, (jsonify({"error": "start required and end must not precede it"}), 400)
+    if (last - first).days >= config.REPORT_MAX_DAYS:
+        return None, None, (jsonify({"error": "range too long", "max_days": config.REPORT_MAX_DAYS}), 400)
+    return first, last, None
+
+
+def _report_response(first: dt.date, last: dt.date):
+    try:
+        paths = write_report(read_session(), first, last, source=request.args.get("source"))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    if paths is None:
+        return jsonify({"error": "no data"}), 404
+    summary_path, alerts_path = paths
+    return jsonify({"summary": str(summary_path), "alerts": str(alerts_path)})
+
+
 @admin_bp.route("/report/daily", methods=["GET"])
 def daily_report():
     err = _require_admin()
     if err:
         return err
-    date_str = request.args.get("date")
-    date = dt.datetime.strptime(date_str, "%Y-%m-%d").date() if date_str else dt.date.today()
-    start = dt.datetime.combine(date, dt.time.min)
-    end = dt.datetime.combine(date, dt.time.max)
+    date = _parse_date(request.args.get("date"), clock.utcnow().date())  # days are UTC, like the readings
+    return _report_response(date, date)
 
-    readings = Reading.query.filter(Reading.timestamp >= start, Reading.timestamp <= end).all()
-    alerts = Alert.query.filter(Alert.timestamp >= start, Alert.timestamp <= end).all()
 
-    if not readings:
-        return jsonify({"error": "no data"}), 404
+@admin_bp.route("/report/range", methods=["GET"])
+def range_report():
+    """One summary row per worker and day for start..end (inclusive), in a single query."""
+    err = _require_admin()
+    if err:
+        return err
+    first, last, err = _parse_range(request.args.get("start"), request.args.get("end"))
+    if err:
+        return err
+    return _report_response(first, last)
 
-    df = pd.DataFrame(
-        [
-            {
-                "worker_id": r.worker_id,
-                "timestamp": r.timestamp,
-                "risk_score": r.risk_score,
-                "status": r.status,
-                "heart_rate": r.heart_rate,
-                "spo2": r.spo2,
-                "temperature": r.temperature,
-                "gas": r.gas,
-            }
-            for r in readings
-        ]
-    )
-    summary_rows = []
-    for worker_id, group in df.groupby("worker_id"):
-        total = len(group)
-        safe = (group["status"] == "SAFE").sum()
-        warning = (group["status"] == "WARNING").sum()
-        emergency = (group["status"] == "EMERGENCY").sum()
-        summary_rows.append(
-            {
-                "worker_id": worker_id,
-                "date": date,
-                "total_readings": total,
-                "total_alerts": len([a for a in alerts if a.worker_id == worker_id]),
-                "avg_hr": round(group["heart_rate"].mean(), 2),
-                "avg_spo2": round(group["spo2"].mean(), 2),
-                "avg_temp": round(group["temperature"].mean(), 2),
-                "avg_gas": round(group["gas"].mean(), 2),
-                "%safe": round(safe / total * 100, 2),
-                "%warning": round(warning / total * 100, 2),
-                "%emergency": round(emergency / total * 100, 2),
-            }
-        )
-    summary_df = pd.DataFrame(summary_rows)
-    reports_dir = Path("reports")
-    reports_dir.mkdir(exist_ok=True)
-    report_path = reports_dir / f"daily_report_{date}.csv"
-    summary_df.to_csv(report_path, index=False)
-
-    alerts_path = reports_dir / f"alerts_{date}.csv"
-    pd.DataFrame(
-        [
-            {
-                "timestamp": a.timestamp,
-                "worker_id": a.worker_id,
-                "alert_type": a.alert_type,
-                "priority": a.priority,
-                "reason": a.reason,
-                "acknowledged_by": a.acknowledged_by,
-                "resolved": a.resolved,
-            }
-            for a in alerts
-        ]
-    ).to_csv(alerts_path, index=False)
 
-    return jsonify({"summary": str(report_path), "alerts": str(alerts_path)})
+@admin_bp.route("/report/jobs", methods=["POST"])
+def submit_report_job():
+    """Queue a report for {"date"} or {"start", "end"}; poll the returned job id."""
+    err = _require_admin()
+    if err:
+        return err
+    payload = request.get_json(silent=True) or {}
+    first, last, err = _parse_range(payload.get("start") or payload.get("date"), payload.get("end"))
+    if err:
+        return err
+    source = payload.get("source") or config.REPORT_SOURCE
+    if source not in SOURCES:
+        return jsonify({"error": f"source must be one of {', '.join(SOURCES)}"}), 400
+    job = report_jobs.submit(first, last, source)
+    return jsonify(job.to_dict()), 202
+
+
+@admin_bp.route("/report/jobs/<job_id>", methods=["GET"])
+def report_job_status(job_id):
+    err = _require_admin()
+    if err:
+        return err
+    job = report_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify(job.to_dict())
 
 
+@admin_bp.route("/report/jobs/<job_id>/download", methods=["GET"])
+def download_report_job(job_id):
+    """?file=summary (default) or alerts, once the job is done."""
+    err = _require_admin()
+    if err:
+        return err
+    job = report_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    if job.status != "done":
+        return jsonify({"error": "job not done", "status": job.status}), 409
+    which = request.args.get("file", "summary")
+    if which not in ("summary", "alerts"):
+        return jsonify({"error": "file must be summary or alerts"}), 400
+    path = job.summary if which == "summary" else job.alerts
+    return send_file(path.resolve(), mimetype="text/csv", as_attachment=True, download_name=path.name)
@@ -4,18 +4,30 @@ from __future__ import annotations
 
 import datetime as dt
 
+import numpy as np
 from flask import Blueprint, jsonify, request, session
+from sqlalchemy import func, insert
 
 import config
 from backend.alerts import create_or_update_alert
 from backend.auth import ensure_worker
+from backend.clock import clock
 from backend.db import db
-from backend.decision_engine import DecisionEngine
-from backend.models import Message, Reading, Worker
+from backend.decision_engine import CompiledDecisionEngine, DecisionEngine
+from backend.events import publish_readings
+from backend.history_store import history_store
+from backend.models import Message, Reading, Worker, WorkerState
 from backend.rate_limit import allow as rate_allow
+from backend.rollups import apply_readings
+from backend.scheduler import scheduler
+from backend.versions import mark_worker_changed
+from backend.worker_state import upsert_states
+from backend.write_behind import WriteBehindError, writer
 
 worker_bp = Blueprint("worker", __name__)
-engine = DecisionEngine()
+engine = CompiledDecisionEngine() if config.DECISION_ENGINE_COMPILED else DecisionEngine()
+
+REQUIRED_FIELDS = ["heart_rate", "spo2", "temperature", "gas", "fatigue"]
 
 
 def _require_worker():
@@ -35,8 +47,7 @@ def profile():
 
 
 def _process_reading(payload: dict, worker: Worker):
-    required = ["heart_rate", "spo2", "temperature", "gas", "fatigue"]
-    if not all(k in payload for k in required):
+    if not all(k in payload for k in REQUIRED_FIELDS):
         return jsonify({"error": "missing fields"}), 400
 
     if not rate_allow(worker.worker_id):
@@ -53,19 +64,32 @@ def _process_reading(payload: dict, worker: Worker):
     }
 
     detail = engine.evaluate(reading)
-    rec = Reading(
-        worker_id=worker.worker_id,
-        timestamp=dt.datetime.utcnow(),
-        heart_rate=reading["heart_rate"],
-        spo2=reading["spo2"],
-        temperature=reading["temperature"],
-        gas=reading["gas"],
-        fatigue=reading["fatigue"],
-        risk_score=detail.final_risk_score,
-        status=detail.status,
-    )
-    db.session.add(rec)
-    worker.last_seen = dt.datetime.utcnow()
+    row = {
+        "worker_id": worker.worker_id,
+        "timestamp": clock.utcnow(),
+        "heart_rate": reading["heart_rate"],
+        "spo2": reading["spo2"],
+        "temperature": reading["temperature"],
+        "gas": reading["gas"],
+        "fatigue": reading["fatigue"],
+        "risk_score": detail.final_risk_score,
+        "status": detail.status,
+    }
+    if writer.running:
+        # Write-behind: the writer group-commits the row, worker state and last_seen.
+        try:
+            writer.submit(row, flush=detail.status == "EMERGENCY")
+        except WriteBehindError as exc:
+            return jsonify({"error": str(exc)}), 503
+    else:
+        record = Reading(**row)
+        db.session.add(record)
+        db.session.flush()
+        row["id"] = record.id
+        upsert_states(db.session, [row])
+        apply_readings(db.session, [row])
+        worker.last_seen = row["timestamp"]
+        mark_worker_changed(worker.worker_id)
 
     play_sound = False
     banner = False
@@ -76,16 +100,17 @@ def _process_reading(payload: dict, worker: Worker):
         play_sound = detail.status == "EMERGENCY" or created
         banner = True
 
-    db.session.commit()
+    if not writer.running or db.session.dirty or db.session.new:
+        db.session.commit()
+    if not writer.running and config.HISTORY_STORE_ENABLED:
+        history_store.append([row])
+    scheduler.arm_inactivity(worker.worker_id, row["timestamp"])
+    publish_readings([row])
 
     response = {
         "status": detail.status,
         "risk_score": detail.final_risk_score,
-        "detail": {
-            "parameter_risks": detail.parameter_risks,
-            "reasons": detail.reasons,
-            "fusion_reason": detail.fusion_reason,
-        },
+        "detail": detail.to_dict(),
         "play_sound": play_sound,
         "banner": banner,
     }
@@ -102,6 +127,114 @@ def submit_reading():
     return _process_reading(payload, worker)
 
 
+def _parse_timestamp(value, default: dt.datetime) -> dt.datetime:
+    """Accept epoch seconds or an ISO-8601 string; aware values are converted to naive UTC."""
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return dt.datetime.utcfromtimestamp(value)
+    ts = dt.datetime.fromisoformat(str(value))
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def _process_batch(readings, worker: Worker):
+    """
+    Evaluate a buffered block of readings, insert them with one bulk statement
+    and commit once. The worst reading of the batch drives a single AI alert.
+    """
+    if not isinstance(readings, list) or not readings:
+        return jsonify({"error": "readings must be a non-empty list"}), 400
+    if len(readings) > config.BATCH_MAX_READINGS:
+        return jsonify({"error": "too many readings", "max": config.BATCH_MAX_READINGS}), 413
+    for idx, payload in enumerate(readings):
+        if not isinstance(payload, dict) or not all(k in payload for k in REQUIRED_FIELDS):
+            return jsonify({"error": "missing fields", "index": idx}), 400
+
+    if not rate_allow(worker.worker_id):
+        return jsonify({"error": "rate limit"}), 429
+
+    now = clock.utcnow()
+    timestamps = []
+    for idx, payload in enumerate(readings):
+        try:
+            timestamps.append(_parse_timestamp(payload.get("timestamp"), now))
+        except (TypeError, ValueError, OverflowError, OSError):
+            return jsonify({"error": "invalid timestamp", "index": idx}), 400
+
+    columns = {k: [payload[k] for payload in readings] for k in REQUIRED_FIELDS}
+    try:
+        batch = engine.evaluate_batch(**columns, zone=worker.zone)
+    except (TypeError, ValueError):
+        return jsonify({"error": "invalid reading values"}), 400
+
+    statuses = batch.status
+    scores = batch.final_risk_score.tolist()
+    rows = [
+        {
+            "worker_id": worker.worker_id,
+            "timestamp": timestamps[i],
+            **{k: payload[k] for k in REQUIRED_FIELDS},
+            "risk_score": scores[i],
+            "status": statuses[i],
+        }
+        for i, payload in enumerate(readings)
+    ]
+    results = [
+        {"timestamp": timestamps[i].isoformat(), "status": statuses[i], "risk_score": scores[i]}
+        for i in range(len(rows))
+    ]
+    # Latest reading among the most severe ones drives the alert.
+    worst_idx = len(rows) - 1 - int(np.argmax(batch.status_code[::-1]))
+    worst_status = statuses[worst_idx]
+
+    ids = db.session.execute(insert(Reading).returning(Reading.id, sort_by_parameter_order=True), rows).scalars()
+    for row, reading_id in zip(rows, ids):
+        row["id"] = reading_id
+    upsert_states(db.session, rows)
+    apply_readings(db.session, rows)
+    worker.last_seen = now
+    mark_worker_changed(worker.worker_id)
+
+    play_sound = False
+    banner = False
+    if worst_status in ("WARNING", "EMERGENCY"):
+        alert, created = create_or_update_alert(
+            worker.worker_id, "AI", worst_status, batch.fusion_reason[worst_idx], commit=False
+        )
+        play_sound = worst_status == "EMERGENCY" or created
+        banner = True
+
+    db.session.commit()
+    if config.HISTORY_STORE_ENABLED:
+        history_store.append(rows)
+    scheduler.arm_inactivity(worker.worker_id, now)
+    publish_readings(rows, last_seen=now)
+
+    return jsonify(
+        {
+            "count": len(rows),
+            "worst_status": worst_status,
+            "worst_risk_score": scores[worst_idx],
+            "results": results,
+            "play_sound": play_sound,
+            "banner": banner,
+        }
+    )
+
+
+@worker_bp.route("/readings/batch", methods=["POST"])
+def submit_readings_batch():
+    err = _require_worker()
+    if err:
+        return err
+    worker = Worker.query.filter_by(worker_id=session["worker_id"]).first()
+    payload = request.get_json(force=True)
+    readings = payload.get("readings") if isinstance(payload, dict) else payload
+    return _process_batch(readings, worker)
+
+
 @worker_bp.route("/hazard", methods=["POST"])
 def hazard():
     err = _require_worker()
@@ -126,24 +259,33 @@ def emergency():
     return jsonify({"message": "emergency sent", "play_sound": True, "banner": True})
 
 
-@worker_bp.route("/poll", methods=["POST"])
-def poll():
-    err = _require_worker()
-    if err:
-        return err
-    worker_id = session["worker_id"]
-    worker = Worker.query.filter_by(worker_id=worker_id).first()
-    worker.last_seen = dt.datetime.utcnow()
-    db.session.commit()
-
-    since = dt.datetime.utcnow() - dt.timedelta(minutes=6)
-    history = (
-        Reading.query.filter(Reading.worker_id == worker_id, Reading.timestamp >= since)
-        .order_by(Reading.timestamp.asc())
-        .all()
-    )
-    history_payload = [
+def _poll_readings(worker_id: str, since):
+    """
+    Readings for a poll: the latest one without `since`, else up to
+    POLL_MAX_READINGS + 1 after the id or timestamp cursor. Served from the
+    history store when it holds them, otherwise from SQLite.
+    """
+    limit = config.POLL_MAX_READINGS + 1
+    if config.HISTORY_STORE_ENABLED:
+        if since is None:
+            cached = history_store.latest(worker_id)
+        elif isinstance(since, int):
+            cached = history_store.after_id(worker_id, since, limit)
+        else:
+            cached = history_store.after_time(worker_id, since, limit)
+        if cached is not None:
+            return cached
+
+    query = Reading.query.filter(Reading.worker_id == worker_id)
+    if since is None:
+        query = query.order_by(Reading.id.desc()).limit(1)
+    elif isinstance(since, int):
+        query = query.filter(Reading.id > since).order_by(Reading.id.asc()).limit(limit)
+    else:
+        query = query.filter(Reading.timestamp > since).order_by(Reading.id.asc()).limit(limit)
+    return [
         {
+            "id": r.id,
             "timestamp": r.timestamp.isoformat(),
             "heart_rate": r.heart_rate,
             "spo2": r.spo2,
@@ -153,10 +295,46 @@ def poll():
             "risk_score": r.risk_score,
             "status": r.status,
         }
-        for r in history
+        for r in query.all()
     ]
 
-    messages = Message.query.filter_by(to_worker_id=worker_id, delivered=False).all()
+
+@worker_bp.route("/poll", methods=["POST"])
+def poll():
+    """
+    Incremental poll. Send back the returned `cursor` as `since` (a reading id;
+    an ISO-8601 timestamp is also accepted) to receive only readings stored
+    after it. Without `since` the reply is a snapshot: the latest reading only.
+    """
+    err = _require_worker()
+    if err:
+        return err
+    worker_id = session["worker_id"]
+    data = request.get_json(silent=True) or {}
+    since = data.get("since")
+
+    now = clock.utcnow()
+    Worker.query.filter_by(worker_id=worker_id).update({"last_seen": now}, synchronize_session=False)
+
+    is_id = isinstance(since, int) and not isinstance(since, bool)
+    if since is not None and not is_id:
+        try:
+            since = _parse_timestamp(since, now)
+        except (TypeError, ValueError, OverflowError, OSError):
+            return jsonify({"error": "invalid since"}), 400
+    readings = _poll_readings(worker_id, since)
+    has_more = len(readings) > config.POLL_MAX_READINGS
+    readings = readings[: config.POLL_MAX_READINGS]
+    if readings:
+        cursor = max(r["id"] for r in readings)
+    elif is_id:
+        cursor = since
+    else:
+        # Nothing after a timestamp (or no snapshot yet): hand out an id cursor
+        # at the newest stored reading so an echoed cursor never replays history.
+        cursor = db.session.query(func.max(Reading.id)).filter(Reading.worker_id == worker_id).scalar() or 0
+
+    messages = Message.query.filter(Message.to_worker_id == worker_id, Message.delivered.is_(False)).all()
     msg_payload = [
         {
             "id": m.id,
@@ -169,19 +347,20 @@ def poll():
     ]
     for m in messages:
         m.delivered = True
-    db.session.commit()
 
-    last_reading = (
-        Reading.query.filter_by(worker_id=worker_id).order_by(Reading.timestamp.desc()).first()
-    )
-    latest_status = last_reading.status if last_reading else "SAFE"
+    state = db.session.get(WorkerState, worker_id)
+    db.session.commit()
+    scheduler.arm_inactivity(worker_id, now)
 
+    latest_status = state.status if state else "SAFE"
     alerts_flag = latest_status in {"WARNING", "EMERGENCY"}
 
     return jsonify(
         {
             "status": latest_status,
-            "history": history_payload,
+            "history": readings,
+            "cursor": cursor,
+            "has_more": has_more,
             "messages": msg_payload,
             "play_sound": alerts_flag,
             "banner": alerts_flag,
@@ -0,0 +1,229 @@
+"""
+Deadline scheduler for unconscious detection and alert escalation.
+
+A min-heap holds one deadline per worker (last_seen + INACTIVITY_TIMEOUT) and per
+open EMERGENCY alert (timestamp + ESCALATE_AFTER_SECONDS), plus the periodic
+retention run when RETENTION_ENABLED. Ingest, polls and
+alert updates re-arm them; a background thread fires each one when it is due,
+so detection latency no longer depends on admin dashboard traffic.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import heapq
+import itertools
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import config
+from backend.alerts import create_or_update_alert, escalate_overdue_emergencies, publish_alert
+from backend.archive import run_retention
+from backend.clock import clock
+from backend.db import db
+from backend.models import Alert, Worker, WorkerState
+
+log = logging.getLogger(__name__)
+
+INACTIVITY = "inactivity"
+ESCALATION = "escalation"
+RETENTION = "retention"
+
+
+def _after(ts: dt.datetime, seconds: float) -> dt.datetime:
+    # Checks are strict ("more than N seconds"), so the deadline is just past the threshold.
+    return ts + dt.timedelta(seconds=seconds, microseconds=1)
+
+
+class DeadlineScheduler:
+    def __init__(self):
+        self._heap = []
+        self._deadlines: Dict[Tuple[str, object], dt.datetime] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        # worker_id -> last_seen at the time an UNCONSCIOUS alert fired (one alert per episode)
+        self._reported: Dict[str, dt.datetime] = {}
+        self._retention: Optional[threading.Thread] = None
+
+    # -- arming -------------------------------------------------------------
+    def arm(self, kind: str, key, when: dt.datetime) -> None:
+        """Set (or move) the deadline for (kind, key). Superseded heap entries are skipped lazily."""
+        with self._cond:
+            self._deadlines[(kind, key)] = when
+            heapq.heappush(self._heap, (when, next(self._seq), kind, key))
+            if self._heap[0][2:] == (kind, key):
+                self._cond.notify()
+
+    def disarm(self, kind: str, key) -> None:
+        with self._cond:
+            self._deadlines.pop((kind, key), None)
+
+    def arm_inactivity(self, worker_id: str, last_seen: dt.datetime) -> None:
+        self.arm(INACTIVITY, worker_id, _after(last_seen, config.INACTIVITY_TIMEOUT))
+
+    def arm_escalation(self, alert_id: int, timestamp: dt.datetime) -> None:
+        self.arm(ESCALATION, alert_id, _after(timestamp, config.ESCALATE_AFTER_SECONDS))
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._deadlines)
+
+    def next_deadline(self) -> Optional[dt.datetime]:
+        with self._cond:
+            self._discard_stale()
+            return self._heap[0][0] if self._heap else None
+
+    # -- lifecycle ----------------------------------------------------------
+    def bind(self, app) -> None:
+        """Attach to an app and arm deadlines for everything already in the database."""
+        self._app = app
+        with app.app_context():
+            escalate_overdue_emergencies()
+            for worker_id, last_seen in db.session.query(Worker.worker_id, Worker.last_seen):
+                if last_seen is not None:
+                    self.arm_inactivity(worker_id, last_seen)
+            open_emergencies = db.session.query(Alert.id, Alert.timestamp).filter(
+                Alert.priority == "EMERGENCY",
+                Alert.acknowledged_at.is_(None),
+                Alert.escalation_flag.is_(False),
+                Alert.resolved.is_(False),
+            )
+            for alert_id, timestamp in open_emergencies:
+                self.arm_escalation(alert_id, timestamp)
+            if config.RETENTION_ENABLED:
+                self.arm(RETENTION, None, clock.utcnow())
+            db.session.remove()
+
+    def start(self, app) -> None:
+        self.bind(app)
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="deadline-scheduler", daemon=True)
+        self._thread.start()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self) -> None:
+        thread = self._thread
+        if thread is None:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        thread.join()
+        self._thread = None
+
+    # -- firing -------------------------------------------------------------
+    def _discard_stale(self) -> None:
+        while self._heap:
+            when, _, kind, key = self._heap[0]
+            if self._deadlines.get((kind, key)) == when:
+                return
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, now: dt.datetime):
+        due = []
+        with self._cond:
+            while True:
+                self._discard_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                _, _, kind, key = heapq.heappop(self._heap)
+                del self._deadlines[(kind, key)]
+                due.append((kind, key))
+        return due
+
+    def run_due(self, now: Optional[dt.datetime] = None) -> int:
+        """Fire every deadline at or before `now` (default: clock.utcnow()). Returns how many fired."""
+        now = now or clock.utcnow()
+        due = self._pop_due(now)
+        if not due:
+            return 0
+        with self._app.app_context():
+            try:
+                for kind, key in due:
+                    if kind == INACTIVITY:
+                        self._check_inactivity(key, now)
+                    elif kind == RETENTION:
+                        self._start_retention(now)
+                    else:
+                        self._check_escalation(key, now)
+                db.session.commit()
+            finally:
+                db.session.remove()
+        return len(due)
+
+    def _check_inactivity(self, worker_id: str, now: dt.datetime) -> None:
+        row = (
+            db.session.query(Worker.last_seen, WorkerState.status)
+            .outerjoin(WorkerState, WorkerState.worker_id == Worker.worker_id)
+            .filter(Worker.worker_id == worker_id)
+            .first()
+        )
+        if row is None or row.last_seen is None:
+            return
+        if (now - row.last_seen).total_seconds() <= config.INACTIVITY_TIMEOUT:
+            # Seen since the deadline was armed (e.g. by another process).
+            self.arm_inactivity(worker_id, row.last_seen)
+            return
+        if self._reported.get(worker_id) != row.last_seen and (row.status is None or row.status in {"SAFE", "WARNING"}):
+            create_or_update_alert(
+                worker_id, "UNCONSCIOUS", "EMERGENCY", "No recent activity — possible unconsciousness", commit=False
+            )
+            self._reported[worker_id] = row.last_seen
+        # Keep watching at the same cadence so activity seen by another process starts a new episode.
+        self.arm_inactivity(worker_id, now)
+
+    def _check_escalation(self, alert_id: int, now: dt.datetime) -> None:
+        alert = db.session.get(Alert, alert_id)
+        if alert is None or alert.resolved or alert.acknowledged_at is not None or alert.escalation_flag:
+            return
+        if (now - alert.timestamp).total_seconds() > config.ESCALATE_AFTER_SECONDS:
+            alert.escalation_flag = True
+            publish_alert("escalated", alert, on_commit=True)  # run_due commits
+        else:
+            # Timestamp was refreshed by a repeat within cooldown.
+            self.arm_escalation(alert.id, alert.timestamp)
+
+    def _start_retention(self, now: dt.datetime) -> None:
+        """Archive on a side thread so deadlines keep firing meanwhile; re-armed for the next interval."""
+        self.arm(RETENTION, None, now + dt.timedelta(seconds=config.RETENTION_INTERVAL_SECONDS))
+        if self._retention is not None and self._retention.is_alive():
+            return
+        self._retention = threading.Thread(target=_retain, args=(db.engine,), name="retention", daemon=True)
+        self._retention.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if self._stopping:
+                    return
+                self._discard_stale()
+                timeout = None
+                if self._heap:
+                    timeout = max(0.0, (self._heap[0][0] - clock.utcnow()).total_seconds())
+                if timeout is None or timeout > 0:
+                    self._cond.wait(timeout)
+                if self._stopping:
+                    return
+            try:
+                self.run_due()
+            except Exception:  # keep the scheduler alive; the next tick retries
+                log.exception("deadline scheduler tick failed")
+
+
+def _retain(engine) -> None:
+    try:
+        run_retention(engine)
+    except Exception:  # retried at the next interval
+        log.exception("retention run failed")
+
+
+scheduler = DeadlineScheduler()
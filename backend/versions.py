@@ -0,0 +1,89 @@
+"""
+Version counters behind the admin ETags.
+
+A global counter covers alerts, and each worker has a counter for its readings
+and state (plus a fleet counter bumped with any of them). Writers mark changes
+inside their transaction; the marks are applied after the commit, so a GET
+never caches pre-commit data under a new version. Counters are per process and
+the ETag carries a per-process epoch, so a restart invalidates every tag.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.db import db
+
+_PENDING_KEY = "version_bumps"
+
+
+class Versions:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.epoch = uuid.uuid4().hex[:8]
+        self._alerts = 0
+        self._fleet = 0
+        self._workers: Dict[str, int] = {}
+
+    def alerts(self) -> int:
+        return self._alerts
+
+    def fleet(self) -> int:
+        return self._fleet
+
+    def worker(self, worker_id: str) -> int:
+        return self._workers.get(worker_id, 0)
+
+    def bump_alerts(self) -> None:
+        with self._lock:
+            self._alerts += 1
+
+    def bump_worker(self, worker_id: str) -> None:
+        with self._lock:
+            self._workers[worker_id] = self._workers.get(worker_id, 0) + 1
+            self._fleet += 1
+
+    def etag(self, *parts) -> str:
+        return "-".join([self.epoch, *(str(p) for p in parts)])
+
+
+versions = Versions()
+
+
+def _apply(key) -> None:
+    if key == "alerts":
+        versions.bump_alerts()
+    else:
+        versions.bump_worker(key[1])
+
+
+def _mark(key) -> None:
+    session = db.session()
+    if session.in_transaction():
+        session.info.setdefault(_PENDING_KEY, set()).add(key)
+    else:  # already committed
+        _apply(key)
+
+
+def mark_alerts_changed() -> None:
+    _mark("alerts")
+
+
+def mark_worker_changed(worker_id: str) -> None:
+    _mark(("worker", worker_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session) -> None:
+    for key in session.info.pop(_PENDING_KEY, ()):
+        _apply(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
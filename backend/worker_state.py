@@ -0,0 +1,57 @@
+"""Maintenance of the worker_state table (latest reading per worker)."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from backend.models import Reading, WorkerState
+
+STATE_COLUMNS = ("timestamp", "heart_rate", "spo2", "temperature", "gas", "fatigue", "risk_score", "status")
+
+
+@lru_cache(maxsize=None)
+def _upsert_stmt():
+    table = WorkerState.__table__
+    stmt = sqlite_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.worker_id],
+        set_={col: stmt.excluded[col] for col in STATE_COLUMNS},
+        where=table.c.timestamp.is_(None) | (table.c.timestamp <= stmt.excluded.timestamp),
+    )
+
+
+def upsert_states(executor, rows: Iterable[Dict]) -> None:
+    """
+    Upsert the newest of `rows` for each worker. executor is a Session or
+    Connection; the write joins the caller's transaction. An older reading
+    (e.g. a late gateway batch) never replaces a newer state.
+    """
+    latest: Dict[str, Dict] = {}
+    for row in rows:
+        current = latest.get(row["worker_id"])
+        if current is None or row["timestamp"] >= current["timestamp"]:
+            latest[row["worker_id"]] = row
+    if not latest:
+        return
+    executor.execute(_upsert_stmt(), [{"worker_id": wid, **{c: row[c] for c in STATE_COLUMNS}} for wid, row in latest.items()])
+
+
+def rebuild_states(executor) -> None:
+    """Recompute every worker's state from the readings table in one statement."""
+    readings = Reading.__table__
+    newest = (
+        select(readings.c.worker_id, func.max(readings.c.timestamp).label("ts"))
+        .group_by(readings.c.worker_id)
+        .subquery()
+    )
+    source = select(readings.c.worker_id, *(readings.c[c] for c in STATE_COLUMNS)).join(
+        newest, (readings.c.worker_id == newest.c.worker_id) & (readings.c.timestamp == newest.c.ts)
+    )
+    table = WorkerState.__table__
+    executor.execute(
+        sqlite_insert(table).prefix_with("OR REPLACE").from_select(["worker_id", *STATE_COLUMNS], source)
+    )
@@ -0,0 +1,218 @@
+"""Write-behind group-commit writer for Reading rows."""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, insert, update
+
+import config
+from backend.history_store import history_store
+from backend.models import Reading, Worker
+from backend.rollups import apply_readings
+from backend.versions import versions
+from backend.worker_state import upsert_states
+
+log = logging.getLogger(__name__)
+
+
+class WriteBehindError(RuntimeError):
+    """A reading was not queued (queue full) or, for a synchronous submit, not stored."""
+
+
+class ReadingWriter:
+    """
+    Buffers evaluated Reading rows and writes them in one transaction every
+    flush interval or once max_rows are queued. Each flush also updates
+    worker_state and workers.last_seen so the request path does not commit.
+    A batch that keeps failing is retried max_retries times, then written row
+    by row; rows that fail on their own are set aside in dead_letter.
+    """
+
+    def __init__(self, flush_interval_ms: int = None, max_rows: int = None, max_queue: int = None,
+                 max_retries: int = None):
+        self.flush_interval = (flush_interval_ms or config.WRITE_BEHIND_FLUSH_MS) / 1000.0
+        self.max_rows = max_rows or config.WRITE_BEHIND_MAX_ROWS
+        self.max_queue = max_queue or config.WRITE_BEHIND_MAX_QUEUE
+        self.max_retries = config.WRITE_BEHIND_MAX_RETRIES if max_retries is None else max_retries
+        self._buffer: List[Dict] = []
+        self._in_flight = 0
+        self._failures = 0  # consecutive failed flushes of the current batch
+        self.dead_letter = deque(maxlen=self.max_queue)
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._engine = None
+        self._stopping = False
+        self.flushed_rows = 0
+        self.flush_count = 0
+        self.last_flush_ms = 0.0
+        self.failed_flushes = 0
+        self.rejected_rows = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, engine) -> None:
+        if self.running:
+            return
+        self._engine = engine
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="reading-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def submit(self, row: Dict, flush: bool = False) -> None:
+        """
+        Queue a row; flush=True writes it (and everything queued) before returning.
+        Raises WriteBehindError when max_queue rows are pending, or when a
+        flush=True row could not be stored (it is then withdrawn from the queue).
+        """
+        with self._cond:
+            if len(self._buffer) + self._in_flight >= self.max_queue:
+                self.rejected_rows += 1
+                raise WriteBehindError(f"write-behind queue full ({self.max_queue} readings)")
+            self._buffer.append(row)
+            if len(self._buffer) >= self.max_rows:
+                self._cond.notify()
+        if flush:
+            self.flush()
+            with self._flush_lock:
+                with self._cond:
+                    if "id" in row:  # assigned only by a committed insert
+                        return
+                    self._buffer = [r for r in self._buffer if r is not row]
+                # its batch failed: store this reading on its own or report it lost
+                started = time.perf_counter()
+                try:
+                    self._commit([row])
+                except Exception as exc:
+                    row.pop("id", None)
+                    raise WriteBehindError("reading was not stored") from exc
+                self._written([row], started)
+
+    def queue_depth(self) -> int:
+        with self._cond:
+            return len(self._buffer)
+
+    def metrics(self) -> Dict:
+        return {
+            "enabled": self.running,
+            "queue_depth": self.queue_depth(),
+            "flushed_rows": self.flushed_rows,
+            "flush_count": self.flush_count,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "failed_flushes": self.failed_flushes,
+            "rejected_rows": self.rejected_rows,
+            "dead_letter": len(self.dead_letter),
+        }
+
+    def flush(self) -> int:
+        """Write every queued row in a single transaction. Returns rows written."""
+        with self._flush_lock:
+            with self._cond:
+                rows, self._buffer = self._buffer, []
+                self._in_flight = len(rows)
+            try:
+                return self._flush(rows)
+            finally:
+                with self._cond:
+                    self._in_flight = 0
+
+    def _flush(self, rows: List[Dict]) -> int:
+        if not rows:
+            return 0
+        started = time.perf_counter()
+        try:
+            self._commit(rows)
+        except Exception:
+            log.exception("write-behind flush of %d readings failed", len(rows))
+            self.failed_flushes += 1
+            self._failures += 1
+            for row in rows:
+                row.pop("id", None)  # assigned by the rolled-back insert
+            if self._failures <= self.max_retries:
+                # keep rows for the next attempt rather than losing readings
+                with self._cond:
+                    self._buffer[:0] = rows
+                return 0
+            rows = self._write_each(rows)
+        self._failures = 0
+        self._written(rows, started)
+        return len(rows)
+
+    def _commit(self, rows: List[Dict]) -> None:
+        with self._engine.begin() as conn:
+            self._write(conn, rows)
+
+    def _written(self, rows: List[Dict], started: float) -> None:
+        if config.HISTORY_STORE_ENABLED:
+            history_store.append(rows)
+        for worker_id in {row["worker_id"] for row in rows}:
+            versions.bump_worker(worker_id)
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+        self.flushed_rows += len(rows)
+        self.flush_count += 1
+
+    def _write_each(self, rows: List[Dict]) -> List[Dict]:
+        """Write rows one transaction each; returns those stored, dead-letters the rest."""
+        written = []
+        for row in rows:
+            try:
+                self._commit([row])
+            except Exception:
+                log.exception("write-behind set aside a reading of %s that cannot be stored", row.get("worker_id"))
+                row.pop("id", None)
+                self.dead_letter.append(row)
+            else:
+                written.append(row)
+        return written
+
+    @staticmethod
+    def _write(conn, rows: List[Dict]) -> None:
+        table = Reading.__table__
+        ids = conn.execute(insert(table).returning(table.c.id, sort_by_parameter_order=True), rows).scalars()
+        for row, reading_id in zip(rows, ids):
+            row["id"] = reading_id
+        upsert_states(conn, rows)
+        apply_readings(conn, rows)
+        last_seen: Dict[str, object] = {}
+        for row in rows:
+            last_seen[row["worker_id"]] = max(row["timestamp"], last_seen.get(row["worker_id"], row["timestamp"]))
+        workers = Worker.__table__
+        conn.execute(
+            update(workers).where(workers.c.worker_id == bindparam("wid")).values(last_seen=bindparam("ts")),
+            [{"wid": wid, "ts": ts} for wid, ts in last_seen.items()],
+        )
+
+    def stop(self) -> None:
+        """Stop the background thread and drain whatever is still queued."""
+        thread = self._thread
+        if thread is not None:
+            with self._cond:
+                self._stopping = True
+                self._cond.notify()
+            thread.join()
+            self._thread = None
+        if self._engine is not None:
+            self.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                # after a failed flush wait out the interval even with a full buffer
+                if not self._stopping and (len(self._buffer) < self.max_rows or self._failures):
+                    self._cond.wait(self.flush_interval)
+                stopping = self._stopping
+            self.flush()
+            if stopping:
+                return
+
+
+writer = ReadingWriter()
@@ -32,3 +32,73 @@ ESCALATE_AFTER_SECONDS = 60
 # Rate limiting: max readings per worker per second
 RATE_LIMIT_READINGS_PER_SEC = 2
 
+
+# Batch ingest: max readings accepted per /worker/readings/batch request
+BATCH_MAX_READINGS = 500
+
+# Worker poll: max readings returned per incremental /worker/poll (client follows has_more)
+POLL_MAX_READINGS = 500
+
+# Write-behind ingest: answer /worker/reading immediately and group-commit
+# buffered Reading rows every WRITE_BEHIND_FLUSH_MS or WRITE_BEHIND_MAX_ROWS.
+# EMERGENCY readings are always flushed synchronously. At most
+# WRITE_BEHIND_MAX_QUEUE readings wait (ingest answers 503 beyond that); a
+# failing batch is retried WRITE_BEHIND_MAX_RETRIES times, then written row by
+# row with the rows that still fail set aside.
+WRITE_BEHIND_ENABLED = False
+WRITE_BEHIND_FLUSH_MS = 200
+WRITE_BEHIND_MAX_ROWS = 500
+WRITE_BEHIND_MAX_QUEUE = 10000
+WRITE_BEHIND_MAX_RETRIES = 3
+
+# Decision engine: table-driven evaluation with an LRU cache keyed on clamped inputs
+DECISION_ENGINE_COMPILED = True
+DECISION_CACHE_SIZE = 65536
+
+# SQLite tuning applied to every new connection (None/{} to keep SQLite defaults)
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # negative = KiB, i.e. 64 MiB
+}
+
+# Read-only engine used by admin GET endpoints so readers never take the writer's
+# connections: True opens the main database file read-only, a URI overrides it,
+# None reads through the main session
+SQLITE_READONLY_URI = True
+
+# Background deadline scheduler for unconscious detection and escalation
+SCHEDULER_ENABLED = True
+
+# Admin Server-Sent Events stream
+SSE_HEARTBEAT_SECONDS = 15
+SSE_QUEUE_SIZE = 1000
+
+# In-memory recent history per worker (NumPy ring buffers) serving history reads
+# and polls: rows held per worker and how far back the startup rebuild loads
+HISTORY_STORE_ENABLED = True
+HISTORY_STORE_CAPACITY = 1024
+HISTORY_STORE_WINDOW_SECONDS = 600
+
+# Reports: output folder, aggregate source ("rollups" or "readings") and rows
+# fetched per chunk while streaming the alerts CSV
+REPORTS_DIR = "reports"
+REPORT_SOURCE = "rollups"
+REPORT_CHUNK_ROWS = 5000
+REPORT_MAX_DAYS = 366
+
+# Asynchronous report jobs: per-day pool processes and how many finished jobs
+# stay queryable; closed days are cached in REPORTS_DIR/report_cache.json
+REPORT_WORKERS = 4
+REPORT_JOBS_KEEP = 200
+
+# Retention: whole days of readings and resolved alerts older than
+# RETENTION_DAYS move to per-day Arrow files under ARCHIVE_DIR, deleted from
+# SQLite RETENTION_BATCH_ROWS at a time; the scheduler runs it every interval
+RETENTION_ENABLED = False
+RETENTION_DAYS = 30
+RETENTION_BATCH_ROWS = 5000
+RETENTION_INTERVAL_SECONDS = 3600
+ARCHIVE_DIR = "archive"
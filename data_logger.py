@@ -6,29 +6,322 @@ from __future__ import annotations
 
 import csv
 import datetime as dt
+import io
+import itertools
+import json
+import math
+import os
+import threading
+import time
+import weakref
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict
+from typing import Callable, Dict, List, Optional
 
 import pandas as pd
 
 
+SENSOR_HEADER = ["timestamp", "worker_id", "heart_rate", "spo2", "temperature", "gas", "fatigue"]
+ALERT_HEADER = ["timestamp", "worker_id", "overall_status", "reason"]
+
+
 def _ensure_parent(path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
 
 
+class RotatingCsvWriter:
+    """
+    Long-lived CSV appender. Rows are buffered and written once `flush_rows`
+    are pending or `flush_seconds` have passed (checked on each write). The
+    file is rotated to `<stem>.<date>[.<n>].csv` when rows of a new day arrive
+    or it grows past `max_bytes`; the live file always keeps its plain name.
+    """
+
+    def __init__(self, path: Path, header: List[str], flush_rows: int = 256, flush_seconds: float = 1.0,
+                 max_bytes: int = 64 * 2**20, rotate_daily: bool = True,
+                 on_write: Optional[Callable] = None, on_rotate: Optional[Callable] = None):
+        self.path = Path(path)
+        self.header = header
+        # on_write(file_name, day, rows, start, end) per day's rows written at byte range [start, end);
+        # on_rotate(old_name, new_name) when the live file is moved aside
+        self.on_write = on_write
+        self.on_rotate = on_rotate
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self._pending: List[list] = []
+        self._last_flush = time.monotonic()
+        self._fh = None
+        self._day: Optional[str] = None
+        _ensure_parent(self.path)
+        if self.path.exists() and self.path.stat().st_size:
+            self._day = self._last_day()
+        else:
+            self._open()
+
+    @property
+    def day(self) -> Optional[str]:
+        """Date (YYYY-MM-DD) of the rows in the live file, None while it is empty."""
+        return self._day
+
+    def _last_day(self) -> Optional[str]:
+        """Date (YYYY-MM-DD) of the last row of an existing file."""
+        with self.path.open("rb") as f:
+            f.seek(max(0, self.path.stat().st_size - 4096))
+            lines = f.read().splitlines()
+        for line in reversed(lines):
+            day = line[:10].decode(errors="ignore")
+            if len(day) == 10 and day[4] == "-" and day[7] == "-":
+                return day
+        return None
+
+    def _open(self) -> None:
+        new = not self.path.exists() or not self.path.stat().st_size
+        self._fh = self.path.open("a", newline="", buffering=2**16)
+        self._writer = csv.writer(self._fh)
+        if new:
+            self._writer.writerow(self.header)
+            self._fh.flush()
+
+    def _rotated_name(self, day: str) -> Path:
+        candidate = self.path.with_name(f"{self.path.stem}.{day}{self.path.suffix}")
+        n = 1
+        while candidate.exists():
+            candidate = self.path.with_name(f"{self.path.stem}.{day}.{n}{self.path.suffix}")
+            n += 1
+        return candidate
+
+    def rotate(self) -> Optional[Path]:
+        """Move the live file aside (after flushing) and start a fresh one. Returns the rotated path."""
+        self._write_pending()
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        rotated = None
+        if self.path.exists() and self.path.stat().st_size:
+            rotated = self._rotated_name(self._day or dt.date.today().isoformat())
+            os.replace(self.path, rotated)
+            if self.on_rotate is not None:
+                self.on_rotate(self.path.name, rotated.name)
+        self._open()
+        return rotated
+
+    def write(self, row: list) -> None:
+        day = str(row[0])[:10]
+        if self.rotate_daily and self._day is not None and day != self._day:
+            self.rotate()
+        self._day = day
+        self._pending.append(row)
+        if len(self._pending) >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def _write_pending(self) -> None:
+        if not self._pending:
+            return
+        if self._fh is None:
+            self._open()
+        if self.on_write is None:
+            self._writer.writerows(self._pending)
+        else:
+            for day, group in itertools.groupby(self._pending, key=lambda row: str(row[0])[:10]):
+                rows = list(group)
+                start = self._fh.tell()
+                self._writer.writerows(rows)
+                self.on_write(self.path.name, day, rows, start, self._fh.tell())
+        self._pending.clear()
+
+    def flush(self) -> None:
+        self._write_pending()
+        if self._fh is not None:
+            self._fh.flush()
+            if self._fh.tell() >= self.max_bytes:
+                self.rotate()
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        self._write_pending()
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+def _number(value) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def _empty_day() -> Dict:
+    return {"count": 0, "sum_hr": 0.0, "min_spo2": None, "max_temp": None, "max_gas": None, "fatigue_events": 0}
+
+
+def _combine(agg: Dict, count: int, sum_hr: float, min_spo2, max_temp, max_gas, fatigue_events: int) -> None:
+    agg["count"] += count
+    agg["sum_hr"] += sum_hr
+    for key, value, pick in (("min_spo2", min_spo2, min), ("max_temp", max_temp, max), ("max_gas", max_gas, max)):
+        if value is not None:
+            agg[key] = value if agg[key] is None else pick(agg[key], value)
+    agg["fatigue_events"] += fatigue_events
+
+
+class DailyIndex:
+    """
+    Running per-day aggregates of the sensor log and the byte ranges each day
+    occupies in which file, kept up to date as rows are written and persisted
+    as JSON next to the log. Days in `partial` (rows written before the index
+    existed) are not trusted and get rescanned.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.days: Dict[str, Dict] = {}
+        self.offsets: Dict[str, List[list]] = {}
+        self.partial: set = set()
+        self.loaded = False
+        self._dirty = False
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+            except ValueError:  # unreadable: start over, reports fall back to scans
+                return
+            self.days, self.offsets = data["days"], data["offsets"]
+            self.partial = set(data.get("partial", []))
+            self.loaded = True
+
+    def add(self, file_name: str, day: str, rows: List[list], start: int, end: int) -> None:
+        hr = [v for v in (_number(r[2]) for r in rows) if v is not None]
+        spo2 = [v for v in (_number(r[3]) for r in rows) if v is not None]
+        temp = [v for v in (_number(r[4]) for r in rows) if v is not None]
+        gas = [v for v in (_number(r[5]) for r in rows) if v is not None]
+        fatigue = sum(1 for r in rows if (_number(r[6]) or 0) >= 1)
+        _combine(self.days.setdefault(day, _empty_day()), len(rows), sum(hr), min(spo2, default=None),
+                 max(temp, default=None), max(gas, default=None), fatigue)
+        spans = self.offsets.setdefault(day, [])
+        if spans and spans[-1][0] == file_name and spans[-1][2] == start:
+            spans[-1][2] = end
+        else:
+            spans.append([file_name, start, end])
+        self._dirty = True
+
+    def renamed(self, old_name: str, new_name: str) -> None:
+        for spans in self.offsets.values():
+            for span in spans:
+                if span[0] == old_name:
+                    span[0] = new_name
+        self._dirty = True
+
+    def replace_day(self, day: str, agg: Dict) -> None:
+        """Trust a full scan's figures for `day` (its offsets stay unknown)."""
+        self.days[day] = agg
+        self.offsets.pop(day, None)
+        self.partial.discard(day)
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        tmp = self.path.with_suffix(".tmp")
+        payload = {"days": self.days, "offsets": self.offsets, "partial": sorted(self.partial)}
+        tmp.write_text(json.dumps(payload, separators=(",", ":")))
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+class _SharedLog:
+    """A log file's writer (and a sensor log's DailyIndex), shared by every DataLogger on that file."""
+
+    def __init__(self, key: Path, writer: RotatingCsvWriter, index: Optional[DailyIndex] = None):
+        self.key = key
+        self.writer = writer
+        self.index = index
+        self.lock = threading.RLock()
+        self.users = 0
+
+    def close(self) -> None:
+        with self.lock:
+            self.writer.close()
+            if self.index is not None:
+                self.index.save()
+
+
+# One writer per log file in the process: loggers on the same path (e.g. one per
+# dashboard session) would otherwise interleave buffers, offsets and rotations.
+_shared_logs: Dict[Path, _SharedLog] = {}
+_shared_lock = threading.Lock()
+
+
+def _acquire(path: Path, open_log: Callable[[Path], _SharedLog]) -> _SharedLog:
+    key = path.resolve()
+    with _shared_lock:
+        log = _shared_logs.get(key)
+        if log is None:
+            log = _shared_logs[key] = open_log(key)
+        log.users += 1
+        return log
+
+
+def _release(*logs: _SharedLog) -> None:
+    """Drop one user of each log; the last one out closes it."""
+    with _shared_lock:
+        for log in logs:
+            log.users -= 1
+            if not log.users:
+                del _shared_logs[log.key]
+                log.close()
+
+
+def _open_sensor_log(key: Path, options: Dict) -> _SharedLog:
+    index = DailyIndex(key.with_name(f"{key.stem}.daily.json"))
+    writer = RotatingCsvWriter(key, SENSOR_HEADER, on_write=index.add, on_rotate=index.renamed, **options)
+    if not index.loaded and writer.day is not None:
+        # log written before the index existed: its last day is only partly counted from here on
+        index.partial.add(writer.day)
+    return _SharedLog(key, writer, index)
+
+
 @dataclass
 class DataLogger:
+    """
+    Sensor and alert CSV logs written through RotatingCsvWriter. Call close()
+    (or use it as a context manager) so buffered rows reach disk; they are also
+    flushed at interpreter exit. Daily report figures come from a DailyIndex
+    (`<log stem>.daily.json`) maintained as sensor rows are written.
+    Loggers on the same files share one writer and index per file (the first
+    one's flush and rotation options apply) until the last of them closes.
+    """
+
     sensor_log_path: Path = Path("logs/sensor_data.csv")
     alert_log_path: Path = Path("logs/alerts.csv")
     report_path: Path = Path("logs/daily_report.csv")
+    flush_rows: int = 256
+    flush_seconds: float = 1.0
+    max_bytes: int = 64 * 2**20
+    rotate_daily: bool = True
 
     def __post_init__(self):
-        _ensure_parent(self.sensor_log_path)
-        _ensure_parent(self.alert_log_path)
+        self.sensor_log_path = Path(self.sensor_log_path)
+        self.alert_log_path = Path(self.alert_log_path)
+        self.report_path = Path(self.report_path)
         _ensure_parent(self.report_path)
-        self._init_file(self.sensor_log_path, ["timestamp", "worker_id", "heart_rate", "spo2", "temperature", "gas", "fatigue"])
-        self._init_file(self.alert_log_path, ["timestamp", "worker_id", "overall_status", "reason"])
+        options = dict(flush_rows=self.flush_rows, flush_seconds=self.flush_seconds, max_bytes=self.max_bytes,
+                       rotate_daily=self.rotate_daily)
+        self.index_path = self.sensor_log_path.with_name(f"{self.sensor_log_path.stem}.daily.json")
+        self._sensor_log = _acquire(self.sensor_log_path, lambda key: _open_sensor_log(key, options))
+        self._alert_log = _acquire(
+            self.alert_log_path, lambda key: _SharedLog(key, RotatingCsvWriter(key, ALERT_HEADER, **options))
+        )
+        self._index, self._sensor = self._sensor_log.index, self._sensor_log.writer
+        self._alerts = self._alert_log.writer
+        self._finalizer = weakref.finalize(self, _release, self._sensor_log, self._alert_log)
+
+    def __enter__(self) -> "DataLogger":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
     def _init_file(self, path: Path, header: list) -> None:
         if not path.exists():
@@ -46,8 +339,9 @@ class DataLogger:
             reading["gas"],
             reading["fatigue"],
         ]
-        with self.sensor_log_path.open("a", newline="") as f:
-            csv.writer(f).writerow(row)
+        with self._sensor_log.lock:
+            self._sensor.write(row)
+            self._index.save()
 
     def log_alert(self, reading: Dict, reason: str) -> None:
         row = [
@@ -56,35 +350,86 @@ class DataLogger:
             reading.get("overall", "unknown"),
             reason,
         ]
-        with self.alert_log_path.open("a", newline="") as f:
-            csv.writer(f).writerow(row)
-
-    def generate_daily_report(self) -> Path:
-        """Aggregate the latest day's data into a report CSV."""
-        if not self.sensor_log_path.exists():
-            return self.report_path
-
-        df = pd.read_csv(self.sensor_log_path)
-        if df.empty:
-            return self.report_path
-
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-        today = pd.Timestamp.now().normalize()
-        df_today = df[df["timestamp"] >= today]
-
-        summary = {
-            "date": today.date(),
-            "total_readings": len(df_today),
-            "mean_heart_rate": round(df_today["heart_rate"].mean(), 2),
-            "min_spo2": df_today["spo2"].min(),
-            "max_temperature": df_today["temperature"].max(),
-            "max_gas": df_today["gas"].max(),
-            "fatigue_events": int((df_today["fatigue"] >= 1).sum()),
-        }
+        with self._alert_log.lock:
+            self._alerts.write(row)
+            # alerts are rare and worth having on disk straight away
+            self._alerts.flush()
 
-        self._init_file(self.report_path, list(summary.keys()))
-        with self.report_path.open("a", newline="") as f:
-            csv.writer(f).writerow(summary.values())
-        return self.report_path
+    def flush(self) -> None:
+        with self._sensor_log.lock:
+            self._sensor.flush()
+            self._index.save()
+        with self._alert_log.lock:
+            self._alerts.flush()
+
+    def close(self) -> None:
+        self._finalizer()
+
+    def _log_files(self) -> List[Path]:
+        path = self.sensor_log_path
+        rotated = sorted(path.parent.glob(f"{path.stem}.*{path.suffix}"))
+        return rotated + ([path] if path.exists() else [])
 
+    def _scan_day(self, day: str, chunk_rows: int = 100_000) -> Dict:
+        """
+        Aggregate `day` from the CSVs themselves: only the indexed byte ranges
+        when known, else a chunked scan of every log file reading just the
+        numeric columns and matching the date on the raw timestamp text.
+        """
+        usecols = ["timestamp", "heart_rate", "spo2", "temperature", "gas", "fatigue"]
+        dtype = {name: "float64" for name in usecols[1:]}
+        dtype["timestamp"] = "string"
+        agg = _empty_day()
+        spans = None if day in self._index.partial else self._index.offsets.get(day)
+        if spans:
+            frames = []
+            for name, start, end in spans:
+                with (self.sensor_log_path.parent / name).open("rb") as f:
+                    f.seek(start)
+                    frames.append(pd.read_csv(io.BytesIO(f.read(end - start)), header=None, names=SENSOR_HEADER,
+                                              usecols=usecols, dtype=dtype))
+            chunks = frames
+        else:
+            chunks = (
+                chunk[chunk["timestamp"].str.startswith(day)]
+                for path in self._log_files()
+                for chunk in pd.read_csv(path, usecols=usecols, dtype=dtype, chunksize=chunk_rows)
+            )
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            _combine(agg, len(chunk), float(chunk["heart_rate"].sum()), _number(chunk["spo2"].min()),
+                     _number(chunk["temperature"].max()), _number(chunk["gas"].max()),
+                     int((chunk["fatigue"] >= 1).sum()))
+        return agg
 
+    def daily_summary(self, day: dt.date = None) -> Dict:
+        """Report figures for `day` (default today), from the running aggregates when they are complete."""
+        day = (day or dt.date.today()).isoformat()
+        self.flush()
+        with self._sensor_log.lock:
+            agg = self._index.days.get(day)
+            if agg is None or day in self._index.partial:
+                agg = self._scan_day(day)
+                if agg["count"]:
+                    self._index.replace_day(day, agg)
+                    self._index.save()
+        count = agg["count"]
+        return {
+            "date": day,
+            "total_readings": count,
+            "mean_heart_rate": round(agg["sum_hr"] / count, 2) if count else None,
+            "min_spo2": agg["min_spo2"],
+            "max_temperature": agg["max_temp"],
+            "max_gas": agg["max_gas"],
+            "fatigue_events": agg["fatigue_events"],
+        }
+
+    def generate_daily_report(self, day: dt.date = None) -> Path:
+        """Append `day`'s (default today's) summary to the report CSV."""
+        summary = self.daily_summary(day)
+        with self._sensor_log.lock:
+            self._init_file(self.report_path, list(summary.keys()))
+            with self.report_path.open("a", newline="") as f:
+                csv.writer(f).writerow(summary.values())
+        return self.report_path
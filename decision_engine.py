@@ -8,19 +8,36 @@ from dataclasses import dataclass
 from typing import Dict, List, Tuple
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ParameterStatus:
     level: str  # "normal" | "warning" | "critical"
     reason: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class EvaluationResult:
     overall: str  # "safe" | "warning" | "emergency"
     parameter_status: Dict[str, ParameterStatus]
     triggers: List[str]
 
 
+# Statuses are immutable, so each outcome is a single shared instance.
+SPO2_CRITICAL = ParameterStatus("critical", "Respiratory Risk: SpO2 below 90%")
+SPO2_NORMAL = ParameterStatus("normal", "SpO2 within safe range")
+HR_CRITICAL = ParameterStatus("critical", "Cardiac Stress: Heart rate above 120 bpm")
+HR_WARNING = ParameterStatus("warning", "Elevated heart rate >100 bpm")
+HR_NORMAL = ParameterStatus("normal", "Heart rate normal")
+TEMP_CRITICAL = ParameterStatus("critical", "Heat/Fever Risk: Temperature > 38.5°C")
+TEMP_WARNING = ParameterStatus("warning", "Temperature slightly elevated")
+TEMP_NORMAL = ParameterStatus("normal", "Temperature normal")
+GAS_CRITICAL = ParameterStatus("critical", "Gas Critical: >150 PPM")
+GAS_WARNING = ParameterStatus("warning", "Gas Warning: 50-150 PPM")
+GAS_NORMAL = ParameterStatus("normal", "Gas Safe: <50 PPM")
+FATIGUE_CRITICAL = ParameterStatus("critical", "Fatigue Critical: Drowsiness detected")
+FATIGUE_WARNING = ParameterStatus("warning", "Fatigue Warning: Reduced alertness")
+FATIGUE_NORMAL = ParameterStatus("normal", "Fatigue Normal")
+
+
 class DecisionEngine:
     """Encapsulates thresholds and multi-parameter fusion logic."""
 
@@ -36,26 +53,26 @@ class DecisionEngine:
         status: Dict[str, ParameterStatus] = {}
 
         if spo2 < self.spo2_low:
-            status["spo2"] = ParameterStatus("critical", "Respiratory Risk: SpO2 below 90%")
+            status["spo2"] = SPO2_CRITICAL
             triggers.append("respiratory_risk")
         else:
-            status["spo2"] = ParameterStatus("normal", "SpO2 within safe range")
+            status["spo2"] = SPO2_NORMAL
 
         if hr > self.hr_high:
-            status["heart_rate"] = ParameterStatus("critical", "Cardiac Stress: Heart rate above 120 bpm")
+            status["heart_rate"] = HR_CRITICAL
             triggers.append("cardiac_stress")
         elif hr > 100:
-            status["heart_rate"] = ParameterStatus("warning", "Elevated heart rate >100 bpm")
+            status["heart_rate"] = HR_WARNING
         else:
-            status["heart_rate"] = ParameterStatus("normal", "Heart rate normal")
+            status["heart_rate"] = HR_NORMAL
 
         if temp > self.temp_high:
-            status["temperature"] = ParameterStatus("critical", "Heat/Fever Risk: Temperature > 38.5°C")
+            status["temperature"] = TEMP_CRITICAL
             triggers.append("fever_risk")
         elif temp > 37.8:
-            status["temperature"] = ParameterStatus("warning", "Temperature slightly elevated")
+            status["temperature"] = TEMP_WARNING
         else:
-            status["temperature"] = ParameterStatus("normal", "Temperature normal")
+            status["temperature"] = TEMP_NORMAL
 
         return triggers, status
 
@@ -63,21 +80,21 @@ class DecisionEngine:
         triggers: List[str] = []
         if gas > self.gas_critical:
             triggers.append("gas_critical")
-            return triggers, ParameterStatus("critical", "Gas Critical: >150 PPM")
+            return triggers, GAS_CRITICAL
         if gas > self.gas_warning:
             triggers.append("gas_warning")
-            return triggers, ParameterStatus("warning", "Gas Warning: 50-150 PPM")
-        return triggers, ParameterStatus("normal", "Gas Safe: <50 PPM")
+            return triggers, GAS_WARNING
+        return triggers, GAS_NORMAL
 
     def _fatigue_status(self, fatigue: int) -> Tuple[List[str], ParameterStatus]:
         triggers: List[str] = []
         if fatigue >= 2:
             triggers.append("fatigue_critical")
-            return triggers, ParameterStatus("critical", "Fatigue Critical: Drowsiness detected")
+            return triggers, FATIGUE_CRITICAL
         if fatigue == 1:
             triggers.append("fatigue_warning")
-            return triggers, ParameterStatus("warning", "Fatigue Warning: Reduced alertness")
-        return triggers, ParameterStatus("normal", "Fatigue Normal")
+            return triggers, FATIGUE_WARNING
+        return triggers, FATIGUE_NORMAL
 
     def _fusion_logic(self, parameter_status: Dict[str, ParameterStatus], triggers: List[str]) -> str:
         """Multi-parameter fusion following the provided rules."""
@@ -5,7 +5,7 @@ param(
 # Ensure we run from the script's directory
 Set-Location -Path $PSScriptRoot
 
-Write-Host "Starting Flask (FLASK_APP=backend, FLASK_ENV=$Env)"
-$Env:FLASK_APP = 'backend'
+Write-Host "Starting Flask (FLASK_APP=wsgi, FLASK_ENV=$Env)"
+$Env:FLASK_APP = 'wsgi'
 $Env:FLASK_ENV = $Env
 flask run
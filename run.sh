@@ -1,5 +1,5 @@
 #!/bin/sh
-export FLASK_APP=backend
+export FLASK_APP=wsgi
 export FLASK_RUN_HOST=0.0.0.0
 flask run
 
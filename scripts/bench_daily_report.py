@@ -0,0 +1,144 @@
+"""
+Daily report generation on a seeded day: the old ORM + pandas path vs the SQL
+aggregate over readings vs the hourly rollups, plus the streamed alerts CSV.
+Reports wall time and peak Python memory (tracemalloc) for each.
+Run from the project root:
+    python scripts/bench_daily_report.py [--rows 2000000] [--workers 200] [--legacy]
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from backend.db import configure_sqlite, db  # noqa: E402
+from backend.models import Alert, Reading  # noqa: E402
+from backend.reports import summarize, write_alerts_csv  # noqa: E402
+from backend.rollups import rebuild_rollups  # noqa: E402
+
+DAY = dt.date(2024, 1, 15)
+STATUSES = np.array(["SAFE", "WARNING", "EMERGENCY"])
+
+
+def seed(engine, rows: int, workers: int, chunk: int = 200_000) -> None:
+    """Bulk-load `rows` readings spread over DAY, plus one alert per 1000 readings."""
+    db.metadata.create_all(engine)
+    rng = np.random.default_rng(7)
+    start = np.datetime64(dt.datetime.combine(DAY, dt.time.min), "us")
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        for lo in range(0, rows, chunk):
+            n = min(chunk, rows - lo)
+            offsets = rng.integers(0, 86_400_000_000, n)
+            stamps = np.datetime_as_string(start + offsets.astype("timedelta64[us]"), unit="us")
+            risk = rng.integers(0, 100, n)
+            status = STATUSES[np.digitize(risk, [41, 71])]
+            cur.executemany(
+                "INSERT INTO readings (worker_id, timestamp, heart_rate, spo2, temperature, gas, fatigue,"
+                " risk_score, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                zip(
+                    (f"W-{w:04d}" for w in rng.integers(0, workers, n).tolist()),
+                    (s.replace("T", " ") for s in stamps.tolist()),
+                    rng.integers(55, 160, n).tolist(),
+                    rng.integers(82, 100, n).tolist(),
+                    np.round(rng.uniform(36.0, 39.5, n), 1).tolist(),
+                    rng.integers(0, 600, n).tolist(),
+                    rng.integers(0, 3, n).tolist(),
+                    risk.tolist(),
+                    status.tolist(),
+                ),
+            )
+            alert_count = max(1, n // 1000)
+            alert_stamps = np.datetime_as_string(
+                start + rng.integers(0, 86_400_000_000, alert_count).astype("timedelta64[us]"), unit="us"
+            )
+            cur.executemany(
+                "INSERT INTO alerts (worker_id, timestamp, alert_type, priority, reason, resolved, count,"
+                " escalation_flag) VALUES (?, ?, 'AI', 'WARNING', 'bench', 0, 1, 0)",
+                zip(
+                    (f"W-{w:04d}" for w in rng.integers(0, workers, alert_count).tolist()),
+                    (s.replace("T", " ") for s in alert_stamps.tolist()),
+                ),
+            )
+            raw.commit()
+    finally:
+        raw.close()
+
+
+def legacy_report(session: Session):
+    """The original implementation: ORM rows for the day, pandas groupby, list-comprehension alert counts."""
+    import pandas as pd
+
+    start = dt.datetime.combine(DAY, dt.time.min)
+    end = dt.datetime.combine(DAY, dt.time.max)
+    readings = session.query(Reading).filter(Reading.timestamp >= start, Reading.timestamp <= end).all()
+    alerts = session.query(Alert).filter(Alert.timestamp >= start, Alert.timestamp <= end).all()
+    df = pd.DataFrame(
+        [
+            {"worker_id": r.worker_id, "status": r.status, "heart_rate": r.heart_rate, "spo2": r.spo2,
+             "temperature": r.temperature, "gas": r.gas}
+            for r in readings
+        ]
+    )
+    out = []
+    for worker_id, group in df.groupby("worker_id"):
+        out.append((worker_id, len(group), len([a for a in alerts if a.worker_id == worker_id]),
+                    group["heart_rate"].mean(), (group["status"] == "SAFE").sum()))
+    return out
+
+
+def measure(label: str, fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed * 1000:>10.1f} ms   peak {peak / 2**20:>8.1f} MiB")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--workers", type=int, default=200)
+    parser.add_argument("--legacy", action="store_true", help="also time the old ORM + pandas report (slow, memory hungry)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        engine = create_engine(f"sqlite:///{path}")
+        configure_sqlite(engine)
+        started = time.perf_counter()
+        seed(engine, args.rows, args.workers)
+        with Session(engine) as session:
+            rebuild_rollups(session)
+            session.commit()
+        print(f"seeded {args.rows:,} readings for {args.workers} workers in {time.perf_counter() - started:.1f}s\n")
+
+        with Session(engine) as session:
+            if args.legacy:
+                measure("ORM + pandas (old)", lambda: legacy_report(session))
+            by_sql = measure("SQL GROUP BY readings", lambda: summarize(session, DAY, DAY, source="readings"))
+            by_rollups = measure("hourly rollups", lambda: summarize(session, DAY, DAY, source="rollups"))
+            written = measure(
+                "alerts CSV (streamed)", lambda: write_alerts_csv(session, DAY, DAY, Path(tmp) / "alerts.csv")
+            )
+        assert [r["total_readings"] for r in by_sql] == [r["total_readings"] for r in by_rollups]
+        print(f"\n{len(by_sql)} summary rows, {written:,} alerts written")
+
+
+if __name__ == "__main__":
+    main()
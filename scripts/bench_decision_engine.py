@@ -0,0 +1,65 @@
+"""
+Micro-benchmark: rule cascade vs compiled lookup tables vs memoised evaluation.
+Run from the project root: python scripts/bench_decision_engine.py [n_readings]
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.decision_engine import CompiledDecisionEngine, DecisionEngine  # noqa: E402
+
+
+def make_readings(n: int, seed: int = 42):
+    """Readings quantised like real sensors: integer vitals, temperature to 0.1 C."""
+    rng = random.Random(seed)
+    zones = ["NORMAL", "CHEMICAL", "MINING", "FIRE-RESCUE"]
+    return [
+        {
+            "heart_rate": int(rng.gauss(90, 20)),
+            "spo2": int(rng.gauss(95, 3)),
+            "temperature": round(rng.gauss(37.2, 0.8), 1),
+            "gas": int(abs(rng.gauss(60, 120))),
+            "fatigue": rng.choice([0, 0, 0, 1, 2]),
+            "zone": rng.choice(zones),
+        }
+        for _ in range(n)
+    ]
+
+
+def scenario_readings(n: int):
+    """Replayed demo scenarios: the repetitive stream a real wearable produces."""
+    frames = [pd.read_csv(p) for p in sorted(Path("demo_data").glob("scenario_*.csv"))]
+    rows = pd.concat(frames).drop(columns=["timestamp"]).to_dict("records")
+    return [dict(rows[i % len(rows)], zone="NORMAL") for i in range(n)]
+
+
+def timed(label: str, fn, readings) -> float:
+    start = time.perf_counter()
+    for reading in readings:
+        fn(reading)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1e6 / len(readings):8.2f} us/reading  {len(readings) / elapsed:12,.0f} readings/s")
+    return elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    cascade = DecisionEngine()
+    for name, readings in (("random fleet", make_readings(n)), ("demo scenarios", scenario_readings(n))):
+        compiled = CompiledDecisionEngine()
+        print(f"-- {name} ({n} readings)")
+        base = timed("cascade (DecisionEngine)", cascade.evaluate, readings)
+        tables = timed("compiled tables, no cache", lambda r: compiled._evaluate_normalised(*compiled._normalise(r)), readings)
+        cached = timed("compiled + LRU cache", compiled.evaluate, readings)
+        print(f"speed-up: tables x{base / tables:.2f}, cached x{base / cached:.2f}  ({compiled.cache_info()})")
+
+
+if __name__ == "__main__":
+    main()
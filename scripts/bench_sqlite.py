@@ -0,0 +1,137 @@
+"""
+Concurrent read/write throughput on SQLite: default settings vs the tuned profile
+(config.SQLITE_PRAGMAS + separate read-only engine).
+Run from the project root: python scripts/bench_sqlite.py [seconds] [readers]
+"""
+from __future__ import annotations
+
+import datetime as dt
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from backend.db import configure_sqlite, db  # noqa: E402
+from backend.models import Reading  # noqa: E402
+
+WORKERS = [f"W-{i:03d}" for i in range(50)]
+readings = Reading.__table__
+
+
+def make_engines(path: Path, tuned: bool):
+    writer = create_engine(f"sqlite:///{path}")
+    if not tuned:
+        return writer, writer
+    configure_sqlite(writer)
+    reader = create_engine(f"sqlite:///file:{path}?mode=ro&uri=true")
+    configure_sqlite(reader, readonly=True)
+    return writer, reader
+
+
+def seed(engine, rows_per_worker: int = 2000):
+    db.metadata.create_all(engine)
+    start = dt.datetime.utcnow() - dt.timedelta(seconds=rows_per_worker)
+    rows = [
+        {
+            "worker_id": w,
+            "timestamp": start + dt.timedelta(seconds=i),
+            "heart_rate": 80,
+            "spo2": 97,
+            "temperature": 36.9,
+            "gas": 20,
+            "fatigue": 0,
+            "risk_score": 8,
+            "status": "SAFE",
+        }
+        for w in WORKERS
+        for i in range(rows_per_worker)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(readings), rows)
+
+
+def run(tuned: bool, seconds: float, n_readers: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        writer, reader = make_engines(path, tuned)
+        seed(writer)
+        stop = threading.Event()
+        counts = {"writes": 0, "reads": 0, "errors": 0}
+        lock = threading.Lock()
+
+        def bump(key):
+            with lock:
+                counts[key] += 1
+
+        def write_loop():
+            rng = random.Random(1)
+            while not stop.is_set():
+                row = {
+                    "worker_id": rng.choice(WORKERS),
+                    "timestamp": dt.datetime.utcnow(),
+                    "heart_rate": rng.randint(60, 140),
+                    "spo2": rng.randint(85, 100),
+                    "temperature": 37.0,
+                    "gas": rng.randint(0, 300),
+                    "fatigue": 0,
+                    "risk_score": 10,
+                    "status": "SAFE",
+                }
+                try:
+                    with writer.begin() as conn:  # one commit per reading, like /worker/reading
+                        conn.execute(insert(readings), row)
+                    bump("writes")
+                except OperationalError:
+                    bump("errors")
+
+        def read_loop(seed_value):
+            rng = random.Random(seed_value)
+            while not stop.is_set():
+                wid = rng.choice(WORKERS)
+                since = dt.datetime.utcnow() - dt.timedelta(minutes=6)
+                try:
+                    with reader.connect() as conn:
+                        conn.execute(
+                            select(readings).where(readings.c.worker_id == wid).order_by(readings.c.timestamp.desc()).limit(1)
+                        ).all()
+                        conn.execute(
+                            select(readings).where(readings.c.worker_id == wid, readings.c.timestamp >= since)
+                        ).all()
+                    bump("reads")
+                except OperationalError:
+                    bump("errors")
+
+        threads = [threading.Thread(target=write_loop)] + [
+            threading.Thread(target=read_loop, args=(i,)) for i in range(n_readers)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        writer.dispose()
+        reader.dispose()
+    label = "tuned (WAL + read-only engine)" if tuned else "default"
+    print(
+        f"{label:<32} writes/s {counts['writes'] / seconds:9,.0f}   "
+        f"reads/s {counts['reads'] / seconds:9,.0f}   errors {counts['errors']}"
+    )
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    n_readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    run(False, seconds, n_readers)
+    run(True, seconds, n_readers)
+
+
+if __name__ == "__main__":
+    main()
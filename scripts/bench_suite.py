@@ -0,0 +1,291 @@
+"""
+Benchmark suite: both decision engines at the micro level, then ingest, poll
+and the admin endpoints through the Flask test client against a temporary
+database seeded with fixed seeds (/admin/workers at each fleet size).
+Reports median and p95 microseconds per operation, writes them as JSON and
+compares medians with a stored baseline: any case slower than the baseline by
+more than --tolerance makes the run exit with status 1.
+Run from the project root:
+    python scripts/bench_suite.py [--sizes 10,100,1000] [--readings-per-worker 200] [--json out.json]
+    python scripts/bench_suite.py --save-baseline     # after an intended change, on the reference machine
+    python scripts/bench_suite.py --record            # also append the run to benchmarks/history.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import config  # noqa: E402
+
+BASELINE = ROOT / "benchmarks" / "baseline.json"
+HISTORY = ROOT / "benchmarks" / "history.jsonl"
+ZONES = ["NORMAL", "CHEMICAL", "MINING", "FIRE-RESCUE"]
+READING_INTERVAL = 3  # seconds between seeded readings of one worker
+
+
+def isolate(tmp: Path) -> None:
+    """Point the app at a scratch database and folders; must run before `backend` is imported."""
+    path = tmp / "bench.db"
+    config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+    config.SCHEDULER_ENABLED = False
+    config.WRITE_BEHIND_ENABLED = False
+    config.RETENTION_ENABLED = False
+    config.RATE_LIMIT_READINGS_PER_SEC = 10**9
+    config.REPORTS_DIR = str(tmp / "reports")
+    config.ARCHIVE_DIR = str(tmp / "archive")
+
+
+def make_readings(n: int, seed: int):
+    rng = random.Random(seed)
+    return [
+        {
+            "heart_rate": int(rng.gauss(90, 20)),
+            "spo2": int(rng.gauss(95, 3)),
+            "temperature": round(rng.gauss(37.2, 0.8), 1),
+            "gas": int(abs(rng.gauss(60, 120))),
+            "fatigue": rng.choice([0, 0, 0, 1, 2]),
+            "zone": rng.choice(ZONES),
+        }
+        for _ in range(n)
+    ]
+
+
+def measure(fn, repeat: int, ops: int = 1, warmup: int = 3) -> dict:
+    """Time `repeat` calls of fn (each doing `ops` operations); microseconds per operation."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append((time.perf_counter_ns() - t0) / 1000 / ops)
+    samples.sort()
+    return {
+        "median_us": round(statistics.median(samples), 2),
+        "p95_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+        "min_us": round(samples[0], 2),
+        "samples": repeat,
+        "ops_per_sample": ops,
+    }
+
+
+def _ok(resp, *codes):
+    if resp.status_code not in (codes or (200,)):
+        raise RuntimeError(f"{resp.request.method} {resp.request.path}: HTTP {resp.status_code} {resp.data[:200]!r}")
+    return resp
+
+
+def bench_engines(results: dict, args) -> None:
+    import decision_engine as legacy
+    from backend.decision_engine import CompiledDecisionEngine, DecisionEngine
+
+    readings = make_readings(args.engine_readings, args.seed)
+    for name, engine in (
+        ("engine.legacy.evaluate", legacy.DecisionEngine()),
+        ("engine.backend.evaluate", DecisionEngine()),
+        ("engine.backend.compiled.evaluate", CompiledDecisionEngine()),
+    ):
+        evaluate = engine.evaluate
+
+        def run():
+            for r in readings:
+                evaluate(r)
+
+        results[name] = measure(run, args.engine_repeat, ops=len(readings))
+
+
+def seed_fleet(lo: int, hi: int, per_worker: int, seed: int, now: dt.datetime) -> None:
+    """Bulk-load workers lo..hi-1 with `per_worker` readings each, ending at `now`, then rebuild derived tables."""
+    from sqlalchemy import insert
+
+    from backend.db import db
+    from backend.history_store import history_store
+    from backend.models import Reading, Worker
+    from backend.rollups import rebuild_rollups
+    from backend.worker_state import rebuild_states
+
+    rng = np.random.default_rng([seed, lo])
+    ids = [f"B-{i:04d}" for i in range(lo, hi)]
+    db.session.execute(
+        insert(Worker.__table__),
+        [{"worker_id": w, "name": f"Bench {w}", "zone": ZONES[i % len(ZONES)], "last_seen": now} for i, w in enumerate(ids)],
+    )
+    n = len(ids) * per_worker
+    stamps = [now - dt.timedelta(seconds=READING_INTERVAL * (per_worker - k)) for k in range(per_worker)]
+    hr, spo2, gas = rng.integers(55, 160, n).tolist(), rng.integers(85, 100, n).tolist(), rng.integers(0, 400, n).tolist()
+    temp, fatigue = np.round(rng.uniform(36.0, 39.5, n), 1).tolist(), rng.integers(0, 3, n).tolist()
+    risk = rng.integers(0, 100, n)
+    status = np.array(["SAFE", "WARNING", "EMERGENCY"])[np.digitize(risk, [41, 71])].tolist()
+    risk = risk.tolist()
+    rows = [
+        {
+            "worker_id": ids[j // per_worker],
+            "timestamp": stamps[j % per_worker],
+            "heart_rate": hr[j],
+            "spo2": spo2[j],
+            "temperature": temp[j],
+            "gas": gas[j],
+            "fatigue": fatigue[j],
+            "risk_score": risk[j],
+            "status": status[j],
+        }
+        for j in range(n)
+    ]
+    for start in range(0, n, 50_000):
+        db.session.execute(insert(Reading.__table__), rows[start:start + 50_000])
+    rebuild_states(db.session)
+    rebuild_rollups(db.session)
+    db.session.commit()
+    history_store.rebuild(db.session)
+
+
+def bench_endpoints(results: dict, args) -> None:
+    from backend import create_app
+    from backend.rate_limit import window_counts
+
+    app = create_app()
+    now = dt.datetime.utcnow()
+    with app.app_context():
+        worker = app.test_client()
+        _ok(worker.post("/login/worker", json={"worker_id": "W-001", "pin": "1234"}))
+        admin = app.test_client()
+        _ok(admin.post("/login/admin", json={"username": "admin", "password": "admin123"}))
+
+        seeded = 0
+        for size in args.sizes:
+            seed_fleet(seeded, size, args.readings_per_worker, args.seed, now)
+            seeded = size
+            results[f"GET /admin/workers [{size}]"] = measure(lambda: _ok(admin.get("/admin/workers")), args.repeat)
+        etag = admin.get("/admin/workers").headers["ETag"]
+        results[f"GET /admin/workers [{seeded}, 304]"] = measure(
+            lambda: _ok(admin.get("/admin/workers", headers={"If-None-Match": etag}), 304), args.repeat
+        )
+
+        readings = iter(make_readings(args.repeat * 4 + 100, args.seed + 1))
+
+        def ingest():
+            window_counts.clear()
+            _ok(worker.post("/worker/reading", json=next(readings)))
+
+        results["POST /worker/reading"] = measure(ingest, args.repeat)
+
+        cursor = {"since": _ok(worker.post("/worker/poll", json={})).get_json()["cursor"]}
+
+        def poll():
+            cursor["since"] = _ok(worker.post("/worker/poll", json=cursor)).get_json()["cursor"]
+
+        results["POST /worker/poll"] = measure(poll, args.repeat)
+
+        window = READING_INTERVAL * args.readings_per_worker // 60
+        results["GET /admin/worker/<id>/history"] = measure(
+            lambda: _ok(admin.get("/admin/worker/B-0000/history")), args.repeat
+        )
+        results["GET /admin/worker/<id>/history?max_points=100"] = measure(
+            lambda: _ok(admin.get(f"/admin/worker/B-0000/history?minutes={window}&max_points=100")), args.repeat
+        )
+        day = now.date().isoformat()
+        results["GET /admin/report/daily"] = measure(
+            lambda: _ok(admin.get(f"/admin/report/daily?date={day}")), args.repeat
+        )
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Print each case against the baseline; returns the names slower than tolerance allows."""
+    base = baseline.get("cases", {})
+    regressions = []
+    print(f"{'case':<48} {'median us':>11} {'p95 us':>11} {'baseline':>11} {'ratio':>7}")
+    for name, r in results.items():
+        ref = base.get(name, {}).get("median_us")
+        ratio = r["median_us"] / ref if ref else None
+        flag = ""
+        if ratio is not None and ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<48} {r['median_us']:>11,.2f} {r['p95_us']:>11,.2f} "
+            f"{ref if ref is not None else '-':>11} {f'{ratio:.2f}' if ratio else '-':>7}{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000", help="fleet sizes for /admin/workers, ascending")
+    parser.add_argument("--readings-per-worker", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=50, help="timed requests per endpoint case")
+    parser.add_argument("--engine-readings", type=int, default=2000)
+    parser.add_argument("--engine-repeat", type=int, default=15)
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed median slowdown, 0.3 = 30%%")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--record", action="store_true", help=f"append this run to {HISTORY.relative_to(ROOT)}")
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    args = parser.parse_args()
+    args.sizes = sorted(int(s) for s in args.sizes.split(","))
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate(Path(tmp))
+        bench_engines(results, args)
+        bench_endpoints(results, args)
+
+    params = {k: v for k, v in vars(args).items() if k in ("sizes", "readings_per_worker", "seed", "repeat",
+                                                          "engine_readings", "engine_repeat")}
+    run = {
+        "commit": git_commit(),
+        "timestamp": dt.datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "params": params,
+        "cases": results,
+    }
+    if args.json:
+        args.json.write_text(json.dumps(run, indent=2))
+    if args.record:
+        HISTORY.parent.mkdir(exist_ok=True)
+        with HISTORY.open("a") as fh:
+            fh.write(json.dumps(run) + "\n")
+    if args.save_baseline:
+        args.baseline.parent.mkdir(exist_ok=True)
+        args.baseline.write_text(json.dumps(run, indent=2) + "\n")
+        compare(results, {}, args.tolerance)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if baseline and baseline.get("params") != params:
+        print(f"warning: baseline was recorded with {baseline.get('params')}, this run used {params}")
+    regressions = compare(results, baseline, args.tolerance)
+    if not baseline:
+        print(f"no baseline at {args.baseline}; run with --save-baseline to create one")
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than baseline by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""
+Asynchronous load generator for a locally running server.
+N simulated workers post readings at a fixed rate, and optionally poll like the worker UI, each with
+its own session (cookies) over one pooled connector; rows come from a seeded mix of the
+demo_data/scenario_*.csv files. Admin clients can poll the dashboard endpoints alongside.
+Reports p50/p95/p99 latency, throughput and error/429 counts per endpoint; --ramp runs
+stages of growing fleet size to locate the saturation point.
+Run from the project root (server on localhost:5000):
+    python scripts/load_generator.py --workers 200 --rate 1 --duration 30
+    python scripts/load_generator.py --ramp 50,100,200,400 --duration 20 --json load.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import aiohttp
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+SERVER = "http://localhost:5000"
+SCENARIO_DIR = Path("demo_data")
+SCENARIO_COLUMNS = ["heart_rate", "spo2", "temperature", "gas", "fatigue"]
+PIN = "1234"
+
+
+def load_scenarios(paths: Sequence[Path]) -> List[List[Dict]]:
+    """Each scenario as ready-to-post reading payloads."""
+    scenarios = []
+    for path in paths:
+        df = pd.read_csv(path, usecols=SCENARIO_COLUMNS)
+        scenarios.append(
+            [
+                {"heart_rate": int(hr), "spo2": int(spo2), "temperature": float(temp), "gas": int(gas),
+                 "fatigue": int(fatigue)}
+                for hr, spo2, temp, gas, fatigue in df.itertuples(index=False, name=None)
+            ]
+        )
+    return scenarios
+
+
+def ensure_workers(worker_ids: Sequence[str]) -> int:
+    """Create worker accounts (PIN 1234) missing from the configured database. Returns how many were added."""
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import Session
+
+    import config
+    from backend.models import User, Worker
+
+    engine = create_engine(config.SQLALCHEMY_DATABASE_URI)
+    with Session(engine) as session:
+        existing = set(session.scalars(select(User.worker_id).where(User.worker_id.in_(worker_ids))))
+        missing = [w for w in worker_ids if w not in existing]
+        known = set(session.scalars(select(Worker.worker_id).where(Worker.worker_id.in_(missing))))
+        now = dt.datetime.utcnow()
+        for worker_id in missing:
+            if worker_id not in known:
+                session.add(Worker(worker_id=worker_id, name=f"Load {worker_id}", zone="NORMAL", last_seen=now))
+            session.add(User(username=f"load-{worker_id}", role="worker", worker_id=worker_id, pin=PIN,
+                             password_hash="!"))
+        session.commit()
+    return len(missing)
+
+
+class Recorder:
+    """Latency samples and status counts per endpoint."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, endpoint: str, seconds: float, status: Optional[int]) -> None:
+        self.latencies[endpoint].append(seconds)
+        self.statuses[endpoint][status if status is not None else "error"] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Dict]:
+        out = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            ms = np.asarray(samples) * 1000
+            statuses = self.statuses[endpoint]
+            errors = sum(n for status, n in statuses.items() if status == "error" or (status >= 400 and status != 429))
+            out[endpoint] = {
+                "count": len(samples),
+                "throughput": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+                "p50_ms": round(float(np.percentile(ms, 50)), 2),
+                "p95_ms": round(float(np.percentile(ms, 95)), 2),
+                "p99_ms": round(float(np.percentile(ms, 99)), 2),
+                "errors": errors,
+                "rate_limited": statuses.get(429, 0),
+                "not_modified": statuses.get(304, 0),
+            }
+        return out
+
+
+async def _call(session, recorder: Recorder, endpoint: str, method: str, url: str, **kwargs):
+    started = time.perf_counter()
+    try:
+        async with session.request(method, url, **kwargs) as resp:
+            body = await resp.read()
+            recorder.record(endpoint, time.perf_counter() - started, resp.status)
+            return resp, body
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        recorder.record(endpoint, time.perf_counter() - started, None)
+        return None, None
+
+
+class Stage:
+    """One run: a fleet of simulated workers (and admins) for a fixed duration."""
+
+    def __init__(self, args, workers: int, scenarios: List[List[Dict]]):
+        self.args = args
+        self.workers = workers
+        self.scenarios = scenarios
+        self.recorder = Recorder()
+        self.logins = Recorder()  # before the measured window
+        self.start = asyncio.Event()
+        self.deadline = 0.0
+
+    def _session(self, connector) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(
+            base_url=self.args.server,
+            connector=connector,
+            connector_owner=False,
+            timeout=aiohttp.ClientTimeout(total=self.args.timeout),
+        )
+
+    async def worker(self, index: int, connector, ready: List[bool]) -> None:
+        rng = np.random.default_rng((self.args.seed, index))
+        rows = self.scenarios[rng.integers(len(self.scenarios))]
+        cursor = int(rng.integers(len(rows)))
+        loop = asyncio.get_running_loop()
+        async with self._session(connector) as session:
+            worker_id = f"{self.args.prefix}{index:04d}"
+            resp, _ = await _call(session, self.logins, "POST /login/worker", "POST", "/login/worker",
+                                  json={"worker_id": worker_id, "pin": PIN})
+            ok = resp is not None and resp.status == 200
+            ready.append(ok)
+            await self.start.wait()
+            if not ok:
+                return
+            interval = 1.0 / self.args.rate
+            next_send = loop.time() + rng.random() * interval  # spread the fleet over the first interval
+            polls = asyncio.create_task(self._poll(session, rng)) if self.args.poll_every else None
+            while next_send < self.deadline:
+                await asyncio.sleep(max(0.0, next_send - loop.time()))
+                await _call(session, self.recorder, "POST /worker/reading", "POST", "/worker/reading",
+                            json=rows[cursor])
+                cursor = (cursor + 1) % len(rows)
+                next_send += interval
+            if polls is not None:
+                polls.cancel()
+                await asyncio.gather(polls, return_exceptions=True)
+
+    async def _poll(self, session, rng) -> None:
+        loop = asyncio.get_running_loop()
+        since = None
+        await asyncio.sleep(rng.random() * self.args.poll_every)
+        while loop.time() < self.deadline:
+            payload = {"since": since} if since is not None else {}
+            resp, body = await _call(session, self.recorder, "POST /worker/poll", "POST", "/worker/poll", json=payload)
+            if resp is not None and resp.status == 200:
+                since = json.loads(body).get("cursor", since)
+            await asyncio.sleep(self.args.poll_every)
+
+    async def admin(self, index: int, connector) -> None:
+        loop = asyncio.get_running_loop()
+        async with self._session(connector) as session:
+            await _call(session, self.logins, "POST /login/admin", "POST", "/login/admin",
+                        json={"username": "admin", "password": self.args.admin_password})
+            await self.start.wait()
+            etags: Dict[str, str] = {}
+            while loop.time() < self.deadline:
+                for path in ("/admin/workers", "/admin/alerts"):
+                    headers = {"If-None-Match": etags[path]} if path in etags else None
+                    resp, _ = await _call(session, self.recorder, f"GET {path}", "GET", path, headers=headers)
+                    if resp is not None and resp.headers.get("ETag"):
+                        etags[path] = resp.headers["ETag"]
+                await asyncio.sleep(self.args.admin_every)
+
+    async def run(self) -> Dict:
+        connector = aiohttp.TCPConnector(limit=self.args.connections)
+        ready: List[bool] = []
+        tasks = [asyncio.create_task(self.worker(i, connector, ready)) for i in range(self.workers)]
+        tasks += [asyncio.create_task(self.admin(i, connector)) for i in range(self.args.admins)]
+        while len(ready) < self.workers:  # logins first; they are not part of the measured window
+            await asyncio.sleep(0.05)
+        loop = asyncio.get_running_loop()
+        self.deadline = loop.time() + self.args.duration
+        started = time.perf_counter()
+        self.start.set()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+        await connector.close()
+        logins = self.logins.latencies.get("POST /login/worker", [0.0])
+        return {
+            "workers": self.workers,
+            "logged_in": sum(ready),
+            "offered_rps": round(sum(ready) * self.args.rate, 1),
+            "duration_s": self.args.duration,
+            "elapsed_s": round(elapsed, 2),
+            "login_p50_ms": round(float(np.percentile(logins, 50)) * 1000, 2),
+            "endpoints": self.recorder.summary(elapsed),
+        }
+
+
+def print_stage(result: Dict) -> None:
+    print(f"\n{result['workers']} workers ({result['logged_in']} logged in), offered {result['offered_rps']} readings/s,"
+          f" {result['elapsed_s']}s")
+    print(f"{'endpoint':<24}{'count':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}{'429':>7}")
+    for endpoint, s in result["endpoints"].items():
+        print(f"{endpoint:<24}{s['count']:>8}{s['throughput']:>9}{s['p50_ms']:>9}{s['p95_ms']:>9}{s['p99_ms']:>9}"
+              f"{s['errors']:>8}{s['rate_limited']:>7}")
+
+
+def saturation(results: List[Dict], slo_ms: float) -> Optional[int]:
+    """Largest fleet whose readings all went out on schedule (within 5%), inside the p99 SLO and error-free."""
+    best = None
+    for result in results:
+        stats = result["endpoints"].get("POST /worker/reading")
+        if not stats:
+            continue
+        kept_up = stats["count"] >= 0.95 * result["offered_rps"] * result["duration_s"]
+        if kept_up and stats["p99_ms"] <= slo_ms and not stats["errors"]:
+            best = result["workers"]
+        else:
+            break
+    return best
+
+
+async def replay_scenarios(paths: Sequence[Path], server: str = SERVER, worker_id: str = "W-001",
+                           pin: str = PIN, rate: float = 1.0) -> None:
+    """Post each scenario's rows in order as one worker, `rate` rows per second."""
+    loop = asyncio.get_running_loop()
+    async with aiohttp.ClientSession(base_url=server) as session:
+        async with session.post("/login/worker", json={"worker_id": worker_id, "pin": pin}) as resp:
+            resp.raise_for_status()
+        for path, rows in zip(paths, load_scenarios(paths)):
+            started = loop.time()
+            for i, payload in enumerate(rows):
+                await asyncio.sleep(max(0.0, started + i / rate - loop.time()))
+                async with session.post("/worker/reading", json=payload) as resp:
+                    await resp.read()
+            print(f"Scenario {path.name} done in {loop.time() - started:.1f}s")
+
+
+async def main_async(args) -> List[Dict]:
+    paths = sorted(Path(args.scenarios).glob("scenario_*.csv"))
+    if not paths:
+        raise SystemExit(f"no scenario_*.csv files in {args.scenarios}")
+    scenarios = load_scenarios(paths)
+    results = []
+    for workers in args.ramp or [args.workers]:
+        result = await Stage(args, workers, scenarios).run()
+        print_stage(result)
+        results.append(result)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--server", default=SERVER)
+    parser.add_argument("--workers", type=int, default=50)
+    parser.add_argument("--ramp", type=lambda s: [int(n) for n in s.split(",")], help="fleet sizes, e.g. 50,100,200")
+    parser.add_argument("--rate", type=float, default=1.0, help="readings per second per worker")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per stage")
+    parser.add_argument("--poll-every", type=float, default=0.0, help="worker poll interval in seconds (0: off)")
+    parser.add_argument("--admins", type=int, default=0, help="admin dashboards polling workers/alerts")
+    parser.add_argument("--admin-every", type=float, default=1.0)
+    parser.add_argument("--admin-password", default="admin123")
+    parser.add_argument("--connections", type=int, default=100, help="connection pool size")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--prefix", default="LG-", help="simulated worker id prefix")
+    parser.add_argument("--scenarios", default=str(SCENARIO_DIR))
+    parser.add_argument("--no-seed-workers", action="store_true", help="do not create missing worker accounts")
+    parser.add_argument("--slo-ms", type=float, default=250.0, help="p99 bound for the saturation estimate")
+    parser.add_argument("--json", type=Path, help="write results here")
+    args = parser.parse_args()
+
+    if not args.no_seed_workers:
+        fleet = max(args.ramp or [args.workers])
+        added = ensure_workers([f"{args.prefix}{i:04d}" for i in range(fleet)])
+        if added:
+            print(f"created {added} worker accounts")
+    results = asyncio.run(main_async(args))
+    if len(results) > 1:
+        best = saturation(results, args.slo_ms)
+        verdict = f"below {results[0]['workers']}" if best is None else f"at least {best}"
+        print(f"\nsustained fleet: {verdict} workers (p99 <= {args.slo_ms:g} ms, readings within 5% of offered)")
+    if args.json:
+        args.json.write_text(json.dumps({"args": {k: str(v) for k, v in vars(args).items()}, "stages": results},
+                                        indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Headless accelerated replay: demo scenarios or archived days go through the
+real ingest, alert, escalation and unconscious-detection logic on a virtual
+clock, against a scratch database, and the raised alerts are summarised.
+Use --set to try threshold changes, e.g. --set ALERT_COOLDOWN=60.
+Run from the project root:
+    python scripts/replay.py [demo_data/scenario_*.csv ...] [--workers 50] [--hours 24] [--tail 120]
+    python scripts/replay.py --archive 2024-03-01 2024-03-02 [--archive-dir archive]
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import datetime as dt
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import config  # noqa: E402
+
+
+def isolate(db_path: Path, archive_dir: str) -> None:
+    """Scratch database, no background threads; must run before `backend` is imported."""
+    config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+    config.SQLITE_PRAGMAS = dict(config.SQLITE_PRAGMAS or {}, synchronous="OFF")
+    config.SCHEDULER_ENABLED = False
+    config.WRITE_BEHIND_ENABLED = False
+    config.RETENTION_ENABLED = False
+    config.ARCHIVE_DIR = archive_dir
+    config.REPORTS_DIR = str(db_path.parent / "reports")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenarios", nargs="*", type=Path, help="scenario CSVs (default: demo_data/scenario_*.csv)")
+    parser.add_argument("--workers", type=int, help="simulated workers; worker i plays scenario i mod n")
+    parser.add_argument("--hours", type=float, help="loop the scenarios for this much virtual time")
+    parser.add_argument("--tail", type=float, default=0.0, help="virtual seconds to keep running after the data")
+    parser.add_argument("--archive", nargs=2, metavar=("START", "END"), help="replay archived readings instead")
+    parser.add_argument("--archive-dir", default=config.ARCHIVE_DIR)
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="override a config knob")
+    parser.add_argument("--db", type=Path, help="keep the replay database here (default: a temporary file)")
+    parser.add_argument("--json", type=Path, help="write the result, alerts included, to this file")
+    args = parser.parse_args()
+
+    for item in args.set:
+        name, _, value = item.partition("=")
+        if not hasattr(config, name):
+            parser.error(f"unknown config knob {name}")
+        setattr(config, name, ast.literal_eval(value))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or Path(tmp) / "replay.db"
+        if db_path.exists():
+            parser.error(f"{db_path} exists; replay needs a fresh database")
+        isolate(db_path.resolve(), str(Path(args.archive_dir).resolve()))
+
+        from backend import create_app
+        from backend.replay import ReplayEngine, archived_readings, replay_scenarios
+
+        app = create_app()
+        if args.archive:
+            start, end = (dt.datetime.fromisoformat(v) for v in args.archive)
+            result = ReplayEngine(app).run(archived_readings(start, end), tail_seconds=args.tail)
+        else:
+            paths = args.scenarios or sorted((ROOT / "demo_data").glob("scenario_*.csv"))
+            result = replay_scenarios(app, paths, args.workers, hours=args.hours, tail_seconds=args.tail)
+
+    summary = result.to_dict()
+    alerts = summary.pop("alerts")
+    for key, value in summary.items():
+        print(f"{key:<14} {value}")
+    if args.json:
+        args.json.write_text(json.dumps(dict(summary, alerts=alerts), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Archive readings and resolved alerts older than the retention horizon to
+per-day Arrow files now, instead of waiting for the scheduler.
+Run from the project root: python scripts/run_retention.py [--days 30] [--archive-dir archive]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine  # noqa: E402
+
+import config  # noqa: E402
+from backend.archive import run_retention  # noqa: E402
+from backend.db import configure_sqlite  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=config.RETENTION_DAYS)
+    parser.add_argument("--archive-dir", default=config.ARCHIVE_DIR)
+    args = parser.parse_args()
+    engine = create_engine(config.SQLALCHEMY_DATABASE_URI)
+    configure_sqlite(engine)
+    moved = run_retention(engine, root=args.archive_dir, days=args.days)
+    print(", ".join(f"{n:,} {kind}" for kind, n in moved.items()), f"archived to {args.archive_dir}")
+
+
+if __name__ == "__main__":
+    main()
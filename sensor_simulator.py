@@ -1,57 +1,193 @@
 """
 Virtual sensor simulator for the AI-Based Virtual Wearable Safety System.
-Generates realistic per-second readings with optional CSV playback.
+Generates realistic per-second readings with optional CSV playback, and
+FleetSimulator for generating many workers' readings at once.
+
+CSV playback goes through ReplayDataset: a recording is converted once into
+one raw binary file per column plus a small JSON index next to it, then
+memory-mapped read-only and shared by every simulator replaying it.
 """
 
 from __future__ import annotations
 
+import json
+import os
 import random
+import shutil
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional, Sequence
 
+import numpy as np
 import pandas as pd
 
+# Scenario bands of the random generator: cumulative probabilities of normal and
+# warning (the rest is critical), and per band the mean/stddev of
+# heart_rate, spo2, temperature, gas.
+BAND_CUTS = np.array([0.65, 0.9])
+BAND_MEANS = np.array([[82, 97, 36.9, 20], [110, 92, 37.8, 90], [135, 86, 39.5, 190]], dtype=np.float64)
+BAND_STDS = np.array([[8, 1.5, 0.3, 10], [10, 2, 0.5, 25], [12, 3, 0.5, 25]], dtype=np.float64)
+# Fatigue 0 / 1 / 2 with probability 0.7 / 0.2 / 0.1.
+FATIGUE_CUTS = np.array([0.7, 0.9])
+VITALS = ("heart_rate", "spo2", "temperature", "gas")
+VITAL_BOUNDS = np.array([[50, 180], [70, 100], [35.0, 41.0], [0, 400]], dtype=np.float64)
+
+REPLAY_COLUMNS = (
+    ("heart_rate", "float64"),
+    ("spo2", "float64"),
+    ("temperature", "float64"),
+    ("gas", "float64"),
+    ("fatigue", "int8"),
+)
+REPLAY_BLOCK_ROWS = 1024  # rows a simulator converts to Python values at a time
+_REPLAY_FORMAT = 1
+_opened_replays: Dict[Path, "ReplayDataset"] = {}
+
 
 def _bounded(value: float, low: float, high: float) -> float:
     """Clamp value into [low, high]."""
     return max(low, min(high, value))
 
 
+def _check_columns(columns) -> None:
+    missing = {name for name, _ in REPLAY_COLUMNS} - set(columns)
+    if missing:
+        raise ValueError(f"Dataset missing columns: {missing}")
+
+
+class ReplayDataset:
+    """
+    Replay columns (heart_rate, spo2, temperature, gas, fatigue) as NumPy
+    arrays: read-only memmaps for converted CSVs, plain arrays for frames.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+        self._length = len(columns["heart_rate"])
+
+    def __len__(self) -> int:
+        return self._length
+
+    def rows(self, start: int, count: int) -> List[tuple]:
+        """Rows start..start+count (cut at the end) as tuples in REPLAY_COLUMNS order."""
+        end = min(self._length, start + count)
+        return list(zip(*(self.columns[name][start:end].tolist() for name, _ in REPLAY_COLUMNS)))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "ReplayDataset":
+        _check_columns(df.columns)
+        return cls({name: _column(df[name], dtype) for name, dtype in REPLAY_COLUMNS})
+
+    @classmethod
+    def open(cls, folder: Path) -> "ReplayDataset":
+        meta = json.loads((Path(folder) / "index.json").read_text())
+        rows = meta["rows"]
+        columns = {
+            name: np.memmap(Path(folder) / f"{name}.bin", dtype=dtype, mode="r", shape=(rows,))
+            if rows else np.empty(0, dtype=dtype)
+            for name, dtype in REPLAY_COLUMNS
+        }
+        return cls(columns)
+
+    @staticmethod
+    def _source_stamp(csv_path: Path) -> Dict:
+        stat = csv_path.stat()
+        return {"format": _REPLAY_FORMAT, "source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+    @classmethod
+    def build(cls, csv_path: Path, folder: Path, chunk_rows: int = 500_000) -> None:
+        """Convert a CSV into `folder` (replacing it) with a chunked, column-restricted read."""
+        csv_path, folder = Path(csv_path), Path(folder)
+        _check_columns(pd.read_csv(csv_path, nrows=0).columns)
+        tmp = folder.with_name(folder.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        files = {name: (tmp / f"{name}.bin").open("wb") for name, _ in REPLAY_COLUMNS}
+        rows = 0
+        try:
+            names = [name for name, _ in REPLAY_COLUMNS]
+            for chunk in pd.read_csv(csv_path, usecols=names, dtype="float64", chunksize=chunk_rows):
+                for name, dtype in REPLAY_COLUMNS:
+                    _column(chunk[name], dtype).tofile(files[name])
+                rows += len(chunk)
+        finally:
+            for fh in files.values():
+                fh.close()
+        meta = dict(cls._source_stamp(csv_path), rows=rows, columns=dict(REPLAY_COLUMNS))
+        (tmp / "index.json").write_text(json.dumps(meta))
+        shutil.rmtree(folder, ignore_errors=True)
+        os.replace(tmp, folder)
+
+    @classmethod
+    def from_csv(cls, csv_path: Path, folder: Optional[Path] = None) -> "ReplayDataset":
+        """
+        The replay of `csv_path`, converted into `folder` (default `<csv>.replay`)
+        unless an up-to-date conversion exists. Opened datasets are shared per process.
+        """
+        csv_path = Path(csv_path)
+        folder = Path(folder or csv_path.with_name(csv_path.name + ".replay")).resolve()
+        try:
+            meta = json.loads((folder / "index.json").read_text())
+        except (OSError, ValueError):
+            meta = None
+        stamp = cls._source_stamp(csv_path)
+        if meta is None or any(meta.get(key) != value for key, value in stamp.items()):
+            cls.build(csv_path, folder)
+            _opened_replays.pop(folder, None)
+        dataset = _opened_replays.get(folder)
+        if dataset is None:
+            dataset = _opened_replays[folder] = cls.open(folder)
+        return dataset
+
+
+def _column(series: pd.Series, dtype: str) -> np.ndarray:
+    if dtype == "int8":
+        return series.fillna(0).to_numpy(dtype=np.float64).astype(np.int8)
+    return series.to_numpy(dtype=np.float64)
+
+
 @dataclass
 class VirtualSensorSimulator:
     worker_id: str
-    dataset: Optional[pd.DataFrame] = None
+    dataset: Optional[ReplayDataset] = None
     dataset_index: int = 0
     last_timestamp: float = field(default_factory=time.time)
+    _block: List[tuple] = field(default_factory=list, init=False, repr=False)
+    _block_start: int = field(default=0, init=False, repr=False)
 
     def load_csv_dataset(self, csv_path: Path) -> None:
-        """Load dataset from CSV. Expected columns: heart_rate, spo2, temperature, gas, fatigue."""
-        df = pd.read_csv(csv_path)
-        expected = {"heart_rate", "spo2", "temperature", "gas", "fatigue"}
-        missing = expected - set(df.columns)
-        if missing:
-            raise ValueError(f"Dataset missing columns: {missing}")
-        self.dataset = df.reset_index(drop=True)
-        self.dataset_index = 0
+        """
+        Replay a CSV with columns heart_rate, spo2, temperature, gas, fatigue.
+        It is converted to memory-mapped columns on first use (see ReplayDataset).
+        """
+        self._attach(ReplayDataset.from_csv(csv_path))
 
     def set_dataset(self, df: pd.DataFrame) -> None:
         """Attach an in-memory dataset (e.g., from Streamlit upload)."""
-        self.dataset = df.reset_index(drop=True)
+        self._attach(ReplayDataset.from_frame(df.reset_index(drop=True)))
+
+    def _attach(self, dataset: ReplayDataset) -> None:
+        self.dataset = dataset
         self.dataset_index = 0
+        self._block = []
+        self._block_start = 0
 
     def _sample_from_dataset(self) -> Dict:
         """Return the next row from dataset, cycling when reaching the end."""
         assert self.dataset is not None
-        row = self.dataset.iloc[self.dataset_index]
+        offset = self.dataset_index - self._block_start
+        if not 0 <= offset < len(self._block):
+            self._block_start, offset = self.dataset_index, 0
+            self._block = self.dataset.rows(self.dataset_index, REPLAY_BLOCK_ROWS)
+        hr, spo2, temp, gas, fatigue = self._block[offset]
         self.dataset_index = (self.dataset_index + 1) % len(self.dataset)
         return {
-            "heart_rate": float(row["heart_rate"]),
-            "spo2": float(row["spo2"]),
-            "temperature": float(row["temperature"]),
-            "gas": float(row["gas"]),
-            "fatigue": int(row["fatigue"]),
+            "heart_rate": hr,
+            "spo2": spo2,
+            "temperature": temp,
+            "gas": gas,
+            "fatigue": fatigue,
         }
 
     def _generate_random_reading(self) -> Dict:
@@ -111,3 +247,86 @@ class VirtualSensorSimulator:
         return values
 
 
+@dataclass
+class FleetBlock:
+    """
+    Readings of N workers over T ticks: `columns` maps each vital and
+    "fatigue" to an (N, T) array, `timestamps` holds the T tick times.
+    """
+
+    worker_ids: List[str]
+    timestamps: np.ndarray
+    columns: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.worker_ids) * len(self.timestamps)
+
+    def iter_readings(self) -> Iterator[Dict]:
+        """Per-reading dicts shaped like VirtualSensorSimulator.get_reading(), tick by tick."""
+        names = VITALS + ("fatigue",)
+        lists = {name: self.columns[name].T.tolist() for name in names}
+        for t, ts in enumerate(self.timestamps.tolist()):
+            rows = zip(*(lists[name][t] for name in names))
+            for worker_id, values in zip(self.worker_ids, rows):
+                reading = dict(zip(names, values))
+                reading["timestamp"] = ts
+                reading["worker_id"] = worker_id
+                yield reading
+
+    def to_dicts(self) -> List[Dict]:
+        return list(self.iter_readings())
+
+
+class FleetSimulator:
+    """
+    Random readings for a whole fleet per call, with the same scenario bands
+    and fatigue mix as VirtualSensorSimulator. Worker i draws from its own
+    generators seeded from (seed, i), so its readings do not depend on the
+    fleet size or on how ticks are split across block() calls. Draws are taken
+    `buffer_ticks` at a time per worker to keep per-call overhead flat.
+    """
+
+    def __init__(self, worker_ids: Sequence[str], seed: int = 0, start: Optional[float] = None,
+                 interval: float = 1.0, buffer_ticks: int = 256):
+        self.worker_ids = list(worker_ids)
+        self.interval = interval
+        self.buffer_ticks = buffer_ticks
+        self.next_timestamp = time.time() if start is None else start
+        streams = [child.spawn(2) for child in np.random.SeedSequence(seed).spawn(len(self.worker_ids))]
+        # separate uniform and normal streams keep each sequence independent of chunking
+        self._uniform = [np.random.default_rng(u) for u, _ in streams]
+        self._normal = [np.random.default_rng(z) for _, z in streams]
+        n = len(self.worker_ids)
+        self._u = np.empty((n, 0, 2))
+        self._z = np.empty((n, 0, 4))
+
+    def _draws(self, ticks: int):
+        if self._u.shape[1] < ticks:
+            more = max(self.buffer_ticks, ticks - self._u.shape[1])
+            u = np.empty((len(self.worker_ids), more, 2))
+            z = np.empty((len(self.worker_ids), more, 4))
+            for i, (uniform, normal) in enumerate(zip(self._uniform, self._normal)):
+                uniform.random(out=u[i])
+                normal.standard_normal(out=z[i])
+            self._u = np.concatenate((self._u, u), axis=1)
+            self._z = np.concatenate((self._z, z), axis=1)
+        u, z = self._u[:, :ticks], self._z[:, :ticks]
+        self._u, self._z = self._u[:, ticks:], self._z[:, ticks:]
+        return u, z
+
+    def block(self, ticks: int = 1) -> FleetBlock:
+        """The next `ticks` readings of every worker as (N, ticks) columns."""
+        u, z = self._draws(ticks)
+        band = np.searchsorted(BAND_CUTS, u[..., 0], side="right")
+        values = BAND_MEANS[band] + BAND_STDS[band] * z
+        values[..., 3] = np.abs(values[..., 3])  # gas
+        np.clip(values, VITAL_BOUNDS[:, 0], VITAL_BOUNDS[:, 1], out=values)
+        columns = {name: values[..., i] for i, name in enumerate(VITALS)}
+        columns["fatigue"] = np.searchsorted(FATIGUE_CUTS, u[..., 1], side="right").astype(np.int8)
+        timestamps = self.next_timestamp + self.interval * np.arange(ticks)
+        self.next_timestamp += self.interval * ticks
+        return FleetBlock(self.worker_ids, timestamps, columns)
+
+    def readings(self, ticks: int = 1) -> List[Dict]:
+        """Compatibility form of block(): one dict per reading."""
+        return self.block(ticks).to_dicts()
@@ -27,34 +27,49 @@ async function adminLogin() {
 
 document.getElementById("adminLoginBtn").onclick = adminLogin;
 
-async function loadWorkers() {
-  const workers = await api("/admin/workers");
-  workersCache = workers;
+const HISTORY_WINDOW_MS = 6 * 60 * 1000;
+// The server downsamples the window to about this many points per series.
+const HISTORY_MAX_POINTS = 600;
+let historySeries = { heart_rate: [], spo2: [] };
+const alertsCache = new Map();
+
+function selectWorker(workerId) {
+  selectedWorker = workerId;
+  highlightSelected();
+  loadHistory();
+  loadLatest();
+  openStream();
+}
+
+function renderWorkers() {
   const cards = document.getElementById("workerCards");
   cards.innerHTML = "";
-  workers.forEach((w) => {
+  workersCache.forEach((w) => {
     const div = document.createElement("div");
     div.className = "worker-card";
     div.innerHTML = `<strong>${w.worker_id}</strong><br>${w.name}<br>Status: ${w.status}<br>Zone: ${w.zone}<br>HR:${w.heart_rate ?? '-'} SpO2:${w.spo2 ?? '-'} Gas:${w.gas ?? '-'}`;
-    div.onclick = () => {
-      selectedWorker = w.worker_id;
-      highlightSelected();
-      loadHistory();
-      loadLatest();
-    };
+    div.onclick = () => selectWorker(w.worker_id);
     if (w.worker_id === selectedWorker) div.classList.add("selected");
     cards.appendChild(div);
   });
+}
+
+async function loadWorkers() {
+  const workers = await api("/admin/workers");
+  workersCache = workers;
+  renderWorkers();
   // auto-select first worker if none selected
-  if (!selectedWorker && workers.length > 0) {
-    selectedWorker = workers[0].worker_id;
-    highlightSelected();
-    loadHistory();
-    loadLatest();
-  }
+  if (!selectedWorker && workers.length > 0) selectWorker(workers[0].worker_id);
   return workers;
 }
 
+function applyWorkerDelta(delta) {
+  const w = workersCache.find((x) => x.worker_id === delta.worker_id);
+  if (!w) { loadWorkers(); return; }
+  Object.assign(w, delta);
+  renderWorkers();
+}
+
 function highlightSelected() {
   document.querySelectorAll(".worker-card").forEach((el) => {
     const id = el.querySelector("strong")?.innerText;
@@ -63,39 +78,69 @@ function highlightSelected() {
 }
 
 let historyChart;
-function renderHistory(data) {
+function renderHistory() {
+  if (historyChart) {
+    // update in place: no chart rebuild per refresh
+    historyChart.data.datasets[0].data = historySeries.heart_rate;
+    historyChart.data.datasets[1].data = historySeries.spo2;
+    historyChart.update("none");
+    return;
+  }
   const ctx = document.getElementById("historyChart");
-  const labels = data.map((d) => d.timestamp);
-  const hr = data.map((d) => d.heart_rate);
-  const spo2 = data.map((d) => d.spo2);
-  if (historyChart) historyChart.destroy();
   historyChart = new Chart(ctx, {
     type: "line",
-    data: { labels, datasets: [{ label: "HR", data: hr, borderColor: "#f87171" }, { label: "SpO2", data: spo2, borderColor: "#38bdf8" }] },
-    options: { responsive: true, scales: { x: { display: false } } },
+    data: {
+      datasets: [
+        { label: "HR", data: historySeries.heart_rate, borderColor: "#f87171" },
+        { label: "SpO2", data: historySeries.spo2, borderColor: "#38bdf8" },
+      ],
+    },
+    options: { responsive: true, parsing: false, animation: false, scales: { x: { type: "linear", display: false } } },
   });
 }
 
-async function loadHistory() {
-  if (!selectedWorker) return;
-  const data = await api(`/admin/worker/${selectedWorker}/history`);
-  renderHistory(data);
+function renderDetail(last) {
+  if (!last) return;
   const detail = document.getElementById("detail");
-  const last = data[data.length - 1];
-  if (last) {
-    detail.innerHTML = `
-      <div>Status: ${last.status}</div>
-      <div>Risk: ${last.risk_score}</div>
-      <div>HR ${last.heart_rate} | SpO2 ${last.spo2} | Temp ${last.temperature} | Gas ${last.gas}</div>`;
-    const live = document.getElementById("liveReadings");
-    live.innerHTML = `<strong>Latest Reading:</strong> ${new Date(last.timestamp).toLocaleTimeString()} — HR ${last.heart_rate}, SpO2 ${last.spo2}, Temp ${last.temperature}, Gas ${last.gas}, Fatigue ${last.fatigue}`;
-  }
+  detail.innerHTML = `
+    <div>Status: ${last.status}</div>
+    <div>Risk: ${last.risk_score}</div>
+    <div>HR ${last.heart_rate} | SpO2 ${last.spo2} | Temp ${last.temperature} | Gas ${last.gas}</div>`;
 }
 
-async function loadLatest() {
+// Server timestamps are naive UTC ISO strings.
+function epochMs(timestamp) {
+  return Date.parse(/(?:[zZ]|[+-]\d\d:\d\d)$/.test(timestamp) ? timestamp : `${timestamp}Z`);
+}
+
+function toPoints(series) {
+  return series.t.map((t, i) => ({ x: t, y: series.v[i] }));
+}
+
+async function loadHistory() {
   if (!selectedWorker) return;
-  const latest = await api(`/admin/latest/${selectedWorker}`);
-  if (latest.error) return;
+  const data = await api(`/admin/worker/${selectedWorker}/history?max_points=${HISTORY_MAX_POINTS}`);
+  if (data.error) return;
+  historySeries = { heart_rate: toPoints(data.series.heart_rate), spo2: toPoints(data.series.spo2) };
+  renderHistory();
+  renderDetail(data.latest);
+}
+
+function appendReading(reading) {
+  if (reading.worker_id !== selectedWorker) return;
+  const x = epochMs(reading.timestamp);
+  const cutoff = x - HISTORY_WINDOW_MS;
+  historySeries.heart_rate.push({ x, y: reading.heart_rate });
+  historySeries.spo2.push({ x, y: reading.spo2 });
+  Object.keys(historySeries).forEach((name) => {
+    historySeries[name] = historySeries[name].filter((p) => p.x >= cutoff);
+  });
+  renderHistory();
+  renderDetail(reading);
+  renderLatest(reading);
+}
+
+function renderLatest(latest) {
   const live = document.getElementById("liveReadings");
   live.innerHTML = `<strong>Latest Reading:</strong> ${new Date(latest.timestamp).toLocaleTimeString()} — HR ${latest.heart_rate}, SpO2 ${latest.spo2}, Temp ${latest.temperature}, Gas ${latest.gas}, Fatigue ${latest.fatigue} | Status ${latest.status} (Risk ${latest.risk_score})`;
   // Suggest a decision message for admin approval
@@ -111,10 +156,17 @@ async function loadLatest() {
   }
 }
 
-async function loadAlerts() {
-  const alerts = await api("/admin/alerts");
+async function loadLatest() {
+  if (!selectedWorker) return;
+  const latest = await api(`/admin/latest/${selectedWorker}`);
+  if (latest.error) return;
+  renderLatest(latest);
+}
+
+function renderAlerts() {
   const list = document.getElementById("alertsList");
   list.innerHTML = "";
+  const alerts = [...alertsCache.values()].sort((a, b) => (a.timestamp < b.timestamp ? 1 : -1));
   alerts.forEach((a) => {
     const div = document.createElement("div");
     div.className = "alert-card";
@@ -141,6 +193,19 @@ async function loadAlerts() {
   });
 }
 
+async function loadAlerts() {
+  const alerts = await api("/admin/alerts");
+  alertsCache.clear();
+  alerts.forEach((a) => alertsCache.set(a.id, a));
+  renderAlerts();
+}
+
+function applyAlertEvent({ action, alert }) {
+  if (action === "resolved" || alert.resolved) alertsCache.delete(alert.id);
+  else alertsCache.set(alert.id, alert);
+  renderAlerts();
+}
+
 document.getElementById("sendMsgBtn").onclick = async () => {
   const worker_id = document.getElementById("msgWorker").value || selectedWorker;
   const message = document.getElementById("msgText").value;
@@ -173,8 +238,38 @@ async function adminPoll() {
   await loadAlerts();
 }
 
-function startAdminPoll() {
-  adminPoll();
-  setInterval(adminPoll, 1000);
+// Live updates arrive over Server-Sent Events; polling is only the fallback
+// while the stream is down (or when EventSource is unavailable).
+let stream = null;
+let pollTimer = null;
+
+function startPolling() {
+  if (!pollTimer) pollTimer = setInterval(adminPoll, 1000);
 }
 
+function stopPolling() {
+  if (pollTimer) clearInterval(pollTimer);
+  pollTimer = null;
+}
+
+function openStream() {
+  if (!window.EventSource) return;
+  if (stream) stream.close();
+  const query = selectedWorker ? `?worker_id=${encodeURIComponent(selectedWorker)}` : "";
+  stream = new EventSource(`/admin/stream${query}`, { withCredentials: true });
+  stream.onopen = () => {
+    stopPolling();
+    adminPoll(); // resync anything missed while disconnected
+  };
+  stream.onerror = () => startPolling();
+  stream.addEventListener("worker", (e) => applyWorkerDelta(JSON.parse(e.data)));
+  stream.addEventListener("reading", (e) => appendReading(JSON.parse(e.data)));
+  stream.addEventListener("alert", (e) => applyAlertEvent(JSON.parse(e.data)));
+}
+
+function startAdminPoll() {
+  adminPoll().then(() => {
+    if (!window.EventSource) startPolling();
+    else if (!stream) openStream();
+  });
+}
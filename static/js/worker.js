@@ -113,10 +113,13 @@ function toggleAutoSim() {
 
 autoSimBtn.onclick = toggleAutoSim;
 
-function renderMessages(msgs) {
+// Messages are delivered once; keep them on screen until acknowledged.
+const pendingMessages = new Map();
+
+function renderMessages() {
   const list = document.getElementById("messageList");
   list.innerHTML = "";
-  msgs.forEach((m) => {
+  pendingMessages.forEach((m) => {
     const div = document.createElement("div");
     div.className = "message";
     const cmd = m.command ? `<span class='danger' style="padding:4px 8px;border-radius:6px;display:inline-block;">${m.command}</span>` : "";
@@ -125,6 +128,8 @@ function renderMessages(msgs) {
     ack.textContent = "Acknowledge";
     ack.onclick = async () => {
       await api("/worker/ack_message", { id: m.id });
+      pendingMessages.delete(m.id);
+      renderMessages();
     };
     div.appendChild(ack);
     list.appendChild(div);
@@ -138,11 +143,18 @@ function updateStatus(res) {
   if (res.play_sound) playBeep();
 }
 
+let pollCursor = null;
+
 async function poll() {
-  const res = await api("/worker/poll", {});
+  const res = await api("/worker/poll", pollCursor === null ? {} : { since: pollCursor });
+  if (res.error) return;
+  pollCursor = res.cursor;
   updateStatus(res);
-  renderMessages(res.messages || []);
-  if (res.messages && res.messages.length) playBeep();
+  if (res.messages && res.messages.length) {
+    res.messages.forEach((m) => pendingMessages.set(m.id, m));
+    renderMessages();
+    playBeep();
+  }
 }
 
 let pollHandle;
@@ -0,0 +1,126 @@
+import csv
+import datetime as dt
+
+from sqlalchemy import update
+
+import config
+from backend import archive, create_app
+from backend.db import db, init_db
+from backend.models import Alert, HourRollup, Reading
+from backend.rate_limit import window_counts
+from backend.reports import summarize, write_alerts_csv
+
+OLD_DAY = dt.date.today() - dt.timedelta(days=config.RETENTION_DAYS + 5)
+RECENT_DAY = dt.date.today() - dt.timedelta(days=1)
+
+
+def _batch(day, count, hour=8):
+    start = dt.datetime.combine(day, dt.time(hour, 0))
+    return [
+        {
+            "timestamp": (start + dt.timedelta(seconds=61 * i)).isoformat(),
+            "heart_rate": 72 + i % 30,
+            "spo2": 97 - i % 4,
+            "temperature": 36.7,
+            "gas": 30 + (i * 11) % 250,
+            "fatigue": i % 3,
+        }
+        for i in range(count)
+    ]
+
+
+def setup_module(module):
+    app = create_app()
+    app.testing = True
+    module.app = app
+    module.ctx = app.app_context()
+    module.ctx.push()
+    db.drop_all()
+    db.create_all()
+    init_db()
+    worker = app.test_client()
+    worker.post("/login/worker", json={"worker_id": "W-001", "pin": "1234"})
+    for day, count in ((OLD_DAY, 120), (RECENT_DAY, 40)):
+        window_counts.clear()
+        assert worker.post("/worker/readings/batch", json=_batch(day, count)).status_code == 200
+    for resolved, minute in ((True, 5), (False, 10)):
+        db.session.add(
+            Alert(worker_id="W-001", alert_type="MANUAL", priority="WARNING", reason="old",
+                  resolved=resolved, timestamp=dt.datetime.combine(OLD_DAY, dt.time(9, minute)))
+        )
+    db.session.commit()
+    module.admin = app.test_client()
+    module.admin.post("/login/admin", json={"username": "admin", "password": "admin123"})
+
+
+def teardown_module(module):
+    db.session.remove()
+    db.drop_all()
+    module.ctx.pop()
+
+
+def _alert_rows(path):
+    with path.open() as fh:
+        return list(csv.DictReader(fh))
+
+
+def test_retention_moves_old_days_and_reads_stay_transparent(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    minutes = (config.RETENTION_DAYS + 6) * 24 * 60
+    before_summary = summarize(db.session, OLD_DAY, RECENT_DAY, source="readings")
+    write_alerts_csv(db.session, OLD_DAY, RECENT_DAY, tmp_path / "before.csv")
+    before_history = admin.get(f"/admin/worker/W-001/history?minutes={minutes}").get_json()
+    rollups = HourRollup.query.count()
+
+    moved = archive.run_retention(db.engine)
+    assert moved == {"readings": 120, "alerts": 1}
+    db.session.expire_all()
+    assert Reading.query.count() == 40
+    assert Alert.query.filter(Alert.reason == "old").count() == 1  # the open one stays
+    assert archive.archived_days("readings") == [OLD_DAY]
+    assert HourRollup.query.count() == rollups
+
+    assert summarize(db.session, OLD_DAY, RECENT_DAY, source="readings") == before_summary
+    write_alerts_csv(db.session, OLD_DAY, RECENT_DAY, tmp_path / "after.csv", chunk_rows=1)
+    assert _alert_rows(tmp_path / "after.csv") == _alert_rows(tmp_path / "before.csv")
+    after_history = admin.get(f"/admin/worker/W-001/history?minutes={minutes}").get_json()
+    assert after_history == before_history
+    sampled = admin.get(f"/admin/worker/W-001/history?minutes={minutes}&max_points=50").get_json()
+    assert sampled["raw_points"] == len(before_history)
+
+    # nothing left to move; a late reading for the archived day is appended on the next run
+    assert archive.run_retention(db.engine) == {"readings": 0, "alerts": 0}
+    late = dict(_batch(OLD_DAY, 1, hour=23)[0], worker_id="W-001", risk_score=10, status="SAFE")
+    late["timestamp"] = dt.datetime.fromisoformat(late["timestamp"])
+    db.session.add(Reading(**late))
+    db.session.commit()
+    assert archive.run_retention(db.engine)["readings"] == 1
+    assert archive.read_day("readings", OLD_DAY).num_rows == 121
+
+
+def test_alert_resolved_while_archiving_stays_in_sqlite(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    day = OLD_DAY - dt.timedelta(days=1)
+    # the open alert gets the lower id, so it sits inside the range of ids written
+    late = Alert(worker_id="W-001", alert_type="MANUAL", priority="WARNING", reason="late", resolved=False,
+                 timestamp=dt.datetime.combine(day, dt.time(9, 30)))
+    done = Alert(worker_id="W-001", alert_type="MANUAL", priority="WARNING", reason="done", resolved=True,
+                 timestamp=dt.datetime.combine(day, dt.time(9, 0)))
+    db.session.add(late)
+    db.session.flush()
+    db.session.add(done)
+    db.session.commit()
+    late_id, done_id = late.id, done.id
+    write_batch = archive._batch
+
+    def resolve_meanwhile(rows, sch):
+        with db.engine.begin() as conn:
+            conn.execute(update(Alert.__table__).where(Alert.id == late_id).values(resolved=True))
+        return write_batch(rows, sch)
+
+    monkeypatch.setattr(archive, "_batch", resolve_meanwhile)
+    assert archive.archive_day(db.engine, "alerts", day) == 1
+    assert archive.read_day("alerts", day)["id"].to_pylist() == [done_id]
+    db.session.expire_all()
+    assert db.session.get(Alert, done_id) is None
+    assert db.session.get(Alert, late_id).resolved  # not in the file, so not deleted
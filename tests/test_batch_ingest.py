@@ -0,0 +1,67 @@
+from backend import create_app
+from backend.db import db, init_db
+from backend.models import Alert, Reading, WorkerState
+from backend.rate_limit import window_counts
+
+
+def setup_module(module):
+    app = create_app()
+    app.testing = True
+    module.app = app
+    module.ctx = app.app_context()
+    module.ctx.push()
+    db.drop_all()
+    db.create_all()
+    init_db()
+
+
+def teardown_module(module):
+    db.session.remove()
+    db.drop_all()
+    module.ctx.pop()
+
+
+def _client():
+    client = app.test_client()
+    client.post("/login/worker", json={"worker_id": "W-001", "pin": "1234"})
+    window_counts.clear()
+    return client
+
+
+def test_batch_inserts_all_readings_and_reports_worst():
+    client = _client()
+    readings = [
+        {"timestamp": 1700000000 + i, "heart_rate": 80, "spo2": 98, "temperature": 36.8, "gas": 20, "fatigue": 0}
+        for i in range(5)
+    ]
+    readings.append(
+        {"timestamp": "2023-11-14T22:13:25", "heart_rate": 110, "spo2": 88, "temperature": 37.2, "gas": 900, "fatigue": 0}
+    )
+    res = client.post("/worker/readings/batch", json={"readings": readings})
+    assert res.status_code == 200
+    body = res.get_json()
+    assert body["count"] == 6
+    assert [r["status"] for r in body["results"]][:5] == ["SAFE"] * 5
+    assert body["worst_status"] == "EMERGENCY"
+    assert Reading.query.filter_by(worker_id="W-001").count() == 6
+    assert Alert.query.filter_by(worker_id="W-001", alert_type="AI").count() == 1
+
+
+def test_batch_rejects_incomplete_reading():
+    client = _client()
+    res = client.post("/worker/readings/batch", json=[{"heart_rate": 80}])
+    assert res.status_code == 400
+    assert res.get_json()["index"] == 0
+
+
+def test_late_batch_does_not_overwrite_newer_worker_state():
+    client = _client()
+    newest = {"timestamp": 1800000000, "heart_rate": 90, "spo2": 97, "temperature": 36.9, "gas": 30, "fatigue": 0}
+    older = {"timestamp": 1700000000, "heart_rate": 150, "spo2": 85, "temperature": 39.9, "gas": 900, "fatigue": 2}
+    client.post("/worker/readings/batch", json=[newest])
+    window_counts.clear()
+    client.post("/worker/readings/batch", json=[older])
+    state = db.session.get(WorkerState, "W-001")
+    db.session.refresh(state)
+    assert state.heart_rate == 90
+    assert state.status == "SAFE"
@@ -0,0 +1,119 @@
+import csv
+import datetime as dt
+
+import pandas as pd
+
+from data_logger import DataLogger
+
+
+def _reading(ts: dt.datetime, worker_id="W-1", **overrides):
+    reading = {
+        "timestamp": ts.timestamp(),
+        "worker_id": worker_id,
+        "heart_rate": 80,
+        "spo2": 97,
+        "temperature": 36.8,
+        "gas": 40,
+        "fatigue": 0,
+    }
+    reading.update(overrides)
+    return reading
+
+
+def _rows(path):
+    with path.open(newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_rows_are_buffered_until_flush_or_close(tmp_path):
+    path = tmp_path / "sensor.csv"
+    now = dt.datetime.now().replace(hour=12)
+    with DataLogger(sensor_log_path=path, alert_log_path=tmp_path / "alerts.csv", report_path=tmp_path / "r.csv",
+                    flush_rows=10, flush_seconds=3600) as logger:
+        for i in range(5):
+            logger.log_sensor_data(_reading(now + dt.timedelta(seconds=i)))
+        assert len(_rows(path)) == 1  # header only
+        for i in range(5, 10):
+            logger.log_sensor_data(_reading(now + dt.timedelta(seconds=i)))
+        assert len(_rows(path)) == 11
+        logger.log_sensor_data(_reading(now + dt.timedelta(seconds=10)))
+    assert len(_rows(path)) == 12
+
+
+def test_rotates_on_new_day_and_size(tmp_path):
+    path = tmp_path / "sensor.csv"
+    day1 = dt.datetime(2024, 3, 1, 23, 59, 58)
+    logger = DataLogger(sensor_log_path=path, alert_log_path=tmp_path / "alerts.csv", report_path=tmp_path / "r.csv",
+                        flush_rows=1, max_bytes=10**9)
+    logger.log_sensor_data(_reading(day1))
+    logger.log_sensor_data(_reading(day1 + dt.timedelta(seconds=4)))
+    rotated = tmp_path / "sensor.2024-03-01.csv"
+    assert [r[0][:10] for r in _rows(rotated)[1:]] == ["2024-03-01"]
+    assert [r[0][:10] for r in _rows(path)[1:]] == ["2024-03-02"]
+    logger.close()
+
+    # a reopened logger resumes the live file and rotates by size
+    small = DataLogger(sensor_log_path=path, alert_log_path=tmp_path / "alerts.csv", report_path=tmp_path / "r.csv",
+                       flush_rows=1, max_bytes=200)
+    for i in range(6):
+        small.log_sensor_data(_reading(day1 + dt.timedelta(hours=12, seconds=i)))
+    small.close()
+    parts = sorted(tmp_path.glob("sensor.2024-03-02*.csv"))
+    assert parts and all(_rows(p)[0][0] == "timestamp" for p in parts + [path])
+    assert sum(len(_rows(p)) - 1 for p in parts + [path]) == 7
+
+
+def _pandas_summary(paths, day):
+    df = pd.concat([pd.read_csv(p) for p in paths])
+    df = df[df["timestamp"].str.startswith(str(day))]
+    return len(df), round(df["heart_rate"].mean(), 2), df["spo2"].min(), df["gas"].max(), int((df["fatigue"] >= 1).sum())
+
+
+def test_daily_summary_from_running_aggregates_and_scans(tmp_path):
+    path = tmp_path / "sensor.csv"
+    day1 = dt.datetime(2024, 5, 6, 22, 0)
+    kwargs = dict(sensor_log_path=path, alert_log_path=tmp_path / "alerts.csv", report_path=tmp_path / "r.csv",
+                  flush_rows=7)
+    with DataLogger(**kwargs) as logger:
+        for i in range(300):
+            logger.log_sensor_data(_reading(day1 + dt.timedelta(seconds=37 * i), heart_rate=60 + i % 50,
+                                            spo2=90 + i % 9, gas=i % 400, fatigue=i % 3))
+    files = sorted(tmp_path.glob("sensor*.csv"))
+    index = path.with_name("sensor.daily.json")
+    assert index.exists()
+
+    with DataLogger(**kwargs) as logger:
+        for day in (day1.date(), day1.date() + dt.timedelta(days=1)):
+            s = logger.daily_summary(day)
+            assert (s["total_readings"], s["mean_heart_rate"], s["min_spo2"], s["max_gas"], s["fatigue_events"]) \
+                == _pandas_summary(files, day)
+            # the indexed byte ranges and a full scan agree with the running aggregates
+            assert logger._scan_day(day.isoformat()) == logger._index.days[day.isoformat()]
+
+    index.unlink()
+    with DataLogger(**kwargs) as logger:  # no index: the live file's day is rescanned
+        s = logger.daily_summary(day1.date() + dt.timedelta(days=1))
+        assert s["total_readings"] == _pandas_summary(files, day1.date() + dt.timedelta(days=1))[0]
+        logger.generate_daily_report(day1.date())
+    assert _rows(tmp_path / "r.csv")[1][:2] == [str(day1.date()), str(_pandas_summary(files, day1.date())[0])]
+
+
+def test_loggers_on_one_path_share_a_single_writer(tmp_path):
+    path = tmp_path / "sensor.csv"
+    day1 = dt.datetime(2024, 7, 1, 23, 59, 50)
+    kwargs = dict(sensor_log_path=path, alert_log_path=tmp_path / "alerts.csv", report_path=tmp_path / "r.csv",
+                  flush_rows=3, flush_seconds=3600)
+    first, second = DataLogger(**kwargs), DataLogger(**kwargs)
+    assert first._sensor is second._sensor and first._index is second._index
+    for i in range(20):  # the sessions take turns and cross midnight, so the file rotates under both
+        (first if i % 2 else second).log_sensor_data(_reading(day1 + dt.timedelta(seconds=i), heart_rate=100 + i))
+    first.close()
+    second.log_sensor_data(_reading(day1 + dt.timedelta(seconds=20), heart_rate=120))
+    second.close()
+
+    files = sorted(tmp_path.glob("sensor*.csv"))
+    rows = [row for p in files for row in _rows(p)[1:]]
+    assert sorted(int(r[2]) for r in rows) == list(range(100, 121))
+    with DataLogger(**kwargs) as logger:
+        totals = [logger.daily_summary(day)["total_readings"] for day in (day1.date(), day1.date() + dt.timedelta(days=1))]
+    assert totals == [10, 11]
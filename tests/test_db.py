@@ -0,0 +1,40 @@
+from sqlalchemy import inspect, text
+
+import config
+from backend import create_app
+from backend.db import db, init_db
+
+
+def setup_module(module):
+    app = create_app()
+    app.testing = True
+    module.ctx = app.app_context()
+    module.ctx.push()
+    db.drop_all()
+    db.create_all()
+
+
+def teardown_module(module):
+    db.session.remove()
+    db.drop_all()
+    module.ctx.pop()
+
+
+def test_init_db_adds_missing_indexes_idempotently():
+    with db.engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_readings_worker_id_timestamp"))
+        conn.execute(text("DROP INDEX ix_messages_undelivered"))
+    init_db()
+    init_db()
+    names = {ix["name"] for table in ("readings", "messages") for ix in inspect(db.engine).get_indexes(table)}
+    assert {"ix_readings_worker_id_timestamp", "ix_messages_undelivered"} <= names
+
+
+def test_readonly_engine_follows_the_main_database(tmp_path, monkeypatch):
+    path = tmp_path / "scratch.db"
+    monkeypatch.setattr(config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{path}")
+    app = create_app()
+    readonly = app.extensions["readonly_engine"]
+    assert readonly.url.database == f"file:{path}"
+    with readonly.connect() as conn:
+        assert conn.execute(text("SELECT username FROM users")).scalar() == "admin"
@@ -1,4 +1,6 @@
-from backend.decision_engine import DecisionEngine
+import random
+
+from backend.decision_engine import CompiledDecisionEngine, DecisionEngine
 
 
 def test_safe_reading():
@@ -22,3 +24,19 @@ def test_fatigue_hr_emergency():
     assert detail.final_risk_score >= 90
 
 
+def test_compiled_engine_matches_cascade():
+    rng = random.Random(11)
+    engine = DecisionEngine()
+    compiled = CompiledDecisionEngine(cache_size=128)
+    for _ in range(3000):
+        reading = {
+            "heart_rate": rng.randint(0, 260),
+            "spo2": rng.randint(40, 105),
+            "temperature": round(rng.uniform(25, 48), 1),
+            "gas": rng.randint(0, 6000),
+            "fatigue": rng.choice([0, 1, 2, 3]),
+            "zone": rng.choice(["NORMAL", "chemical", "MINING", "FIRE-RESCUE", "UNKNOWN", None]),
+        }
+        expected = engine.evaluate(reading)
+        assert compiled.evaluate(reading) == expected
+        assert compiled.evaluate(reading) is compiled.evaluate(reading)
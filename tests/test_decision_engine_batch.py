@@ -0,0 +1,79 @@
+import numpy as np
+
+from backend.decision_engine import DecisionEngine
+
+
+def _random_inputs(n, seed=7):
+    rng = np.random.default_rng(seed)
+    return {
+        "heart_rate": rng.integers(0, 260, n),
+        "spo2": rng.integers(40, 105, n),
+        "temperature": np.round(rng.uniform(25, 48, n), 1),
+        "gas": rng.integers(0, 6000, n),
+        "fatigue": rng.integers(0, 4, n),
+        "zone": rng.choice(["NORMAL", "chemical", "MINING", "FIRE-RESCUE", "UNKNOWN", ""], n),
+    }
+
+
+def test_batch_matches_scalar_path():
+    engine = DecisionEngine()
+    cols = _random_inputs(5000)
+    # Exact threshold values where comparison operators matter.
+    cols["temperature"][:6] = [28.0, 35.0, 38.0, 39.5, 41.0, 45.0]
+    cols["heart_rate"][:7] = [40, 50, 100, 120, 140, 180, 220]
+    cols["gas"][:5] = [50, 200, 400, 1000, 5000]
+    batch = engine.evaluate_batch(**cols)
+    for i in range(len(batch)):
+        reading = {k: v[i].item() for k, v in cols.items()}
+        detail = batch.detail(i)
+        expected = engine.evaluate(reading)
+        assert detail == expected
+        assert detail.reasons == expected.reasons
+
+
+def _outcome(fn):
+    try:
+        return fn()
+    except (TypeError, ValueError) as exc:
+        return type(exc)
+
+
+def test_batch_coerces_inputs_like_the_scalar_path():
+    engine = DecisionEngine()
+    base = {"heart_rate": 150, "spo2": 95, "temperature": 37.5, "gas": 100, "fatigue": 0}
+    variants = [
+        {"fatigue": "high"}, {"fatigue": "low"}, {"fatigue": "Medium"}, {"fatigue": "2"}, {"fatigue": "tired"},
+        {"heart_rate": "80"}, {"heart_rate": "80.5"}, {"heart_rate": 80.7}, {"heart_rate": None},
+        {"gas": "120"}, {"temperature": "38.6"}, {"temperature": "hot"},
+    ]
+    for change in variants:
+        reading = dict(base, **change)
+        scalar = _outcome(lambda: engine.evaluate(reading))
+        batch = _outcome(lambda: engine.evaluate_batch(**{k: [v] for k, v in reading.items()}).detail(0))
+        assert batch == scalar, change
+    # labels inside a column, with a scalar zone
+    batch = engine.evaluate_batch([150, 80], [95, 98], [37.5, 36.8], [100, 20], ["high", "low"], zone="NORMAL")
+    expected = [engine.evaluate({"heart_rate": hr, "spo2": s, "temperature": t, "gas": g, "fatigue": f})
+                for hr, s, t, g, f in ((150, 95, 37.5, 100, "high"), (80, 98, 36.8, 20, "low"))]
+    assert batch.details() == expected
+
+
+def test_batch_accepts_mixed_type_columns_like_the_scalar_path():
+    engine = DecisionEngine()
+    cols = {
+        "heart_rate": [80.5, "80", 150, True, 120.9],
+        "spo2": [95, "97", 88.2, 91, "100"],
+        "temperature": [36.5, "37", 41, "39.6", 38],
+        "gas": ["120", 450.7, 20, 1000, "5"],
+        "fatigue": [1.7, "2", "high", 0, "Low"],
+    }
+    batch = engine.evaluate_batch(**cols)
+    for i in range(len(batch)):
+        reading = {k: v[i] for k, v in cols.items()}
+        assert batch.detail(i) == engine.evaluate(reading), reading
+    for column, bad in (("heart_rate", "80.5"), ("temperature", None), ("fatigue", "tired")):
+        mixed = dict(cols, **{column: cols[column][:-1] + [bad]})
+        reading = {k: v[-1] for k, v in mixed.items()}
+        scalar = _outcome(lambda: engine.evaluate(reading))
+        assert scalar in (TypeError, ValueError)
+        assert _outcome(lambda: engine.evaluate_batch(**mixed)) == scalar
@@ -0,0 +1,73 @@
+import numpy as np
+
+from backend import create_app
+from backend.db import db, init_db
+from backend.downsample import downsample, lttb, minmax
+from backend.rate_limit import window_counts
+
+
+def setup_module(module):
+    app = create_app()
+    app.testing = True
+    module.app = app
+    module.ctx = app.app_context()
+    module.ctx.push()
+    db.drop_all()
+    db.create_all()
+    init_db()
+
+
+def teardown_module(module):
+    db.session.remove()
+    db.drop_all()
+    module.ctx.pop()
+
+
+def test_lttb_keeps_endpoints_and_peak():
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 500.0)
+    y[4321] = 5.0
+    keep = lttb(x, y, 200)
+    assert len(keep) == 200
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert (np.diff(keep) > 0).all()
+    assert 4321 in keep
+
+
+def test_minmax_never_drops_a_spike():
+    y = np.full(28_800, 20.0)
+    y[12_345] = 900.0
+    y[20_000] = 0.0
+    keep = minmax(y, 100)
+    assert len(keep) <= 100
+    assert 12_345 in keep and 20_000 in keep
+
+
+def test_series_are_reduced_independently_and_skip_missing_values():
+    t = np.arange(1000, dtype=np.int64) * 1000
+    hr = np.linspace(60, 120, 1000)
+    hr[10] = np.nan
+    series = downsample(t, {"heart_rate": hr, "gas": np.zeros(1000)}, 50, "lttb")
+    assert len(series["heart_rate"]["t"]) == 50
+    assert 10_000 not in series["heart_rate"]["t"]
+    assert all(isinstance(v, int) for v in series["gas"]["v"])
+
+
+def test_history_endpoint_downsamples_on_request():
+    worker = app.test_client()
+    worker.post("/login/worker", json={"worker_id": "W-001", "pin": "1234"})
+    readings = [
+        {"heart_rate": 80, "spo2": 98, "temperature": 36.8, "gas": 900 if i == 37 else 20, "fatigue": 0}
+        for i in range(120)
+    ]
+    window_counts.clear()
+    assert worker.post("/worker/readings/batch", json=readings).status_code == 200
+
+    admin = app.test_client()
+    admin.post("/login/admin", json={"username": "admin", "password": "admin123"})
+    body = admin.get("/admin/worker/W-001/history?max_points=20&method=lttb").get_json()
+    assert body["raw_points"] == 120
+    assert len(body["series"]["heart_rate"]["t"]) <= 20
+    assert 900 in body["series"]["gas"]["v"]
+    assert body["latest"]["heart_rate"] == 80
+    assert admin.get("/admin/worker/W-001/history?max_points=20&method=bogus").status_code == 400
@@ -0,0 +1,86 @@
+from backend import create_app
+from backend.alerts import create_or_update_alert
+from backend.db import db, init_db
+from backend.events import bus
+from backend.rate_limit import window_counts
+
+
+def setup_module(module):
+    app = create_app()
+    app.testing = True
+    module.app = app
+    module.ctx = app.app_context()
+    module.ctx.push()
+    db.drop_all()
+    db.create_all()
+    init_db()
+
+
+def teardown_module(module):
+    db.session.remove()
+    db.drop_all()
+    module.ctx.pop()
+
+
+def _drain(sub):
+    events = []
+    while not sub.queue.empty():
+        events.append(sub.queue.get_nowait())
+    return events
+
+
+def test_reading_and_alert_changes_are_published():
+    watching = bus.subscribe(worker_id="W-001")
+    other = bus.subscribe(worker_id="W-999")
+    try:
+        client = app.test_client()
+        client.post("/login/worker", json={"worker_id": "W-001", "pin": "1234"})
+        window_counts.clear()
+        client.post(
+            "/worker/reading",
+            json={"heart_rate": 110, "spo2": 88, "temperature": 37.2, "gas": 900, "fatigue": 0},
+        )
+        events = _drain(watching)
+        names = [name for name, _ in events]
+        assert "reading" in names and "worker" in names
+        created = [data for name, data in events if name == "alert"]
+        assert created and created[0]["action"] == "created"
+        # Readings only reach streams for that worker; fleet deltas reach everyone.
+        assert "reading" not in [name for name, _ in _drain(other)]
+
+        admin = app.test_client()
+        admin.post("/login/admin", json={"username": "admin", "password": "admin123"})
+        admin.post("/admin/resolve_alert", json={"alert_id": created[0]["alert"]["id"]})
+        assert ("alert", "resolved") in [(name, data.get("action")) for name, data in _drain(watching)]
+    finally:
+        bus.unsubscribe(watching)
+        bus.unsubscribe(other)
+
+
+def test_uncommitted_alert_changes_are_published_only_after_commit():
+    sub = bus.subscribe()
+    try:
+        create_or_update_alert("W-002", "HAZARD", "WARNING", "undone", commit=False)
+        assert _drain(sub) == []
+        db.session.rollback()
+        assert _drain(sub) == []
+
+        alert, _ = create_or_update_alert("W-002", "HAZARD", "WARNING", "kept", commit=False)
+        assert _drain(sub) == []
+        db.session.commit()
+        assert [(name, data["action"], data["alert"]["id"]) for name, data in _drain(sub)] == [
+            ("alert", "created", alert.id)
+        ]
+    finally:
+        bus.unsubscribe(sub)
+
+
+def test_stream_requires_admin_and_speaks_sse():
+    client = app.test_client()
+    assert client.get("/admin/stream").status_code == 401
+    client.post("/login/admin", json={"username": "admin", "password": "admin123"})
+    res = client.get("/admin/stream", buffered=False)
+    assert res.mimetype == "text/event-stream"
+    assert next(res.response).startswith(b"retry:")
+    res.close()
+    assert not bus.active
@@ -0,0 +1,88 @@
+import datetime as dt
+
+import config
+from backend import create_app
+from backend.db import db, init_db
+from backend.history_store import HistoryStore
+from backend.rate_limit import window_counts
+
+T0 = dt.datetime.utcnow().replace(microsecond=0)
+
+
+def setup_module(module):
+    app = create_app()
+    app.testing = True
+    module.app = app
+    module.ctx = app.app_context()
+    module.ctx.push()
+    db.drop_all()
+    db.create_all()
+    init_db()
+
+
+def teardown_module(module):
+    db.session.remove()
+    db.drop_all()
+    module.ctx.pop()
+
+
+def _row(i, seconds=None):
+    return {
+        "id": i,
+        "worker_id": "W-T",
+        "timestamp": T0 + dt.timedelta(seconds=i if seconds is None else seconds),
+        "heart_rate": 70 + i,
+        "spo2": 98,
+        "temperature": 36.5,
+        "gas": 10,
+        "fatigue": "low",
+        "risk_score": 12,
+        "status": "SAFE",
+    }
+
+
+def _store(capacity):
+    store = HistoryStore(capacity=capacity)
+    store.rebuild(db.session)
+    return store
+
+
+def test_ring_buffer_keeps_newest_rows_and_reports_what_it_lacks():
+    store = _store(4)
+    store.append([_row(i) for i in range(1, 11)])
+
+    assert store.window("W-T", T0 + dt.timedelta(seconds=2)) is None
+    window = store.window("W-T", T0 + dt.timedelta(seconds=7))
+    assert [r["heart_rate"] for r in window] == [77, 78, 79, 80]
+    assert window[0]["fatigue"] == 0 and window[0]["timestamp"] == (T0 + dt.timedelta(seconds=7)).isoformat()
+    assert [r["id"] for r in store.after_id("W-T", 6, 10)] == [7, 8, 9, 10]
+    assert store.after_id("W-T", 5, 10) is None
+    assert store.latest("W-T")[0]["id"] == 10
+    assert store.metrics()["bytes"] == store.metrics()["workers"] * 2 * 4 * 59
+
+
+def test_late_reading_is_inserted_in_time_order():
+    store = _store(8)
+    store.append([_row(i) for i in (1, 2, 4, 5)])
+    store.append([_row(6, seconds=3)])
+    window = store.window("W-T", T0)
+    assert [r["heart_rate"] for r in window] == [71, 72, 76, 74, 75]
+    assert [r["id"] for r in store.after_id("W-T", 4, 10)] == [5, 6]
+
+
+def test_history_endpoint_matches_database(monkeypatch):
+    worker = app.test_client()
+    worker.post("/login/worker", json={"worker_id": "W-001", "pin": "1234"})
+    for hr in (80, 95, 130):
+        window_counts.clear()
+        worker.post(
+            "/worker/reading", json={"heart_rate": hr, "spo2": 96, "temperature": 37.1, "gas": 40, "fatigue": 1}
+        )
+    admin = app.test_client()
+    admin.post("/login/admin", json={"username": "admin", "password": "admin123"})
+
+    cached = admin.get("/admin/worker/W-001/history").get_json()
+    monkeypatch.setattr(config, "HISTORY_STORE_ENABLED", False)
+    from_db = admin.get("/admin/worker/W-001/history", headers={"If-None-Match": "none"}).get_json()
+    assert len(cached) == 3
+    assert cached == from_db
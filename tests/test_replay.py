@@ -0,0 +1,75 @@
+import datetime as dt
+from pathlib import Path
+
+import config
+from backend import create_app
+from backend.clock import SystemClock, VirtualClock, clock
+from backend.db import db, init_db
+from backend.replay import ReplayEngine, replay_scenarios
+
+T0 = dt.datetime(2024, 6, 1, 8, 0)
+SAFE = {"heart_rate": 80, "spo2": 97, "temperature": 36.9, "gas": 20, "fatigue": 0}
+DANGER = dict(SAFE, spo2=85, gas=800)
+
+
+def _at(seconds, worker_id, payload):
+    return T0 + dt.timedelta(seconds=seconds), worker_id, payload
+
+
+def setup_module(module):
+    app = create_app()
+    app.testing = True
+    module.app = app
+    module.ctx = app.app_context()
+    module.ctx.push()
+    db.drop_all()
+    db.create_all()
+    init_db()
+
+
+def teardown_module(module):
+    db.session.remove()
+    db.drop_all()
+    module.ctx.pop()
+
+
+def test_cooldown_escalation_and_inactivity_follow_the_virtual_clock():
+    readings = [_at(0, "V-1", DANGER), _at(0, "V-2", SAFE), _at(10, "V-1", DANGER), _at(100, "V-1", DANGER)]
+    result = ReplayEngine(app).run(readings, tail_seconds=100)
+
+    assert result.readings == 4 and result.statuses == {"EMERGENCY": 3, "SAFE": 1}
+    assert result.end == T0 + dt.timedelta(seconds=200)
+    assert isinstance(clock.source, SystemClock)
+    first, second, unconscious = sorted(result.alerts, key=lambda a: (a["worker_id"], a["id"]))
+    # the repeat at 10 s folds into the first alert; 90 s later is past the cooldown
+    assert (first["count"], first["timestamp"]) == (2, (T0 + dt.timedelta(seconds=10)).isoformat())
+    assert second["timestamp"] == (T0 + dt.timedelta(seconds=100)).isoformat()
+    assert first["escalation_flag"] and second["escalation_flag"]
+    # V-2 went silent while SAFE: flagged the instant the inactivity timeout passed
+    assert unconscious["alert_type"] == "UNCONSCIOUS"
+    assert unconscious["timestamp"] == (T0 + dt.timedelta(seconds=config.INACTIVITY_TIMEOUT, microseconds=1)).isoformat()
+    assert result.alert_counts()["escalated"] == 3
+
+
+def test_rate_limit_counts_virtual_seconds():
+    burst = [_at(500, "V-3", SAFE)] * 3 + [_at(501, "V-3", SAFE)]
+    result = ReplayEngine(app).run(burst)
+    assert result.readings == 3 and result.rejected == {429: 1}
+
+
+def test_demo_scenarios_replay_without_waiting():
+    paths = sorted(Path("demo_data").glob("scenario_*.csv"))
+    result = replay_scenarios(app, paths, tail_seconds=120)
+    assert result.readings == 13
+    assert result.alert_counts()["UNCONSCIOUS/EMERGENCY"] == 2
+    span = result.end - result.start
+    assert span == dt.timedelta(seconds=90 + 120)
+    assert result.wall_seconds < span.total_seconds() / 2  # generous: a sleeping replay takes the full span
+
+
+def test_virtual_clock_is_swapped_in_and_restored():
+    with clock.use(VirtualClock(T0)) as virtual:
+        virtual.advance(1.5)
+        assert clock.utcnow() == T0 + dt.timedelta(seconds=1.5)
+        assert clock.time() == T0.replace(tzinfo=dt.timezone.utc).timestamp() + 1.5
+    assert isinstance(clock.source, SystemClock)
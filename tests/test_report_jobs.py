@@ -0,0 +1,110 @@
+import csv
+import datetime as dt
+import io
+import time
+
+import config
+from backend import create_app
+from backend.clock import VirtualClock, clock
+from backend.db import db, init_db
+from backend.models import Alert
+from backend.rate_limit import window_counts
+from backend.report_jobs import ReportJob, report_jobs
+from backend.reports import summarize
+
+DAY1 = dt.date.today() - dt.timedelta(days=3)
+DAY2 = DAY1 + dt.timedelta(days=1)
+
+
+def setup_module(module):
+    app = create_app()
+    app.testing = True
+    module.app = app
+    module.ctx = app.app_context()
+    module.ctx.push()
+    db.drop_all()
+    db.create_all()
+    init_db()
+    worker = app.test_client()
+    worker.post("/login/worker", json={"worker_id": "W-001", "pin": "1234"})
+    start = dt.datetime.combine(DAY1, dt.time(21, 0))
+    readings = [
+        {
+            "timestamp": (start + dt.timedelta(seconds=211 * i)).isoformat(),
+            "heart_rate": 70 + i % 40,
+            "spo2": 98 - i % 6,
+            "temperature": 36.6,
+            "gas": 20 + (i * 7) % 300,
+            "fatigue": i % 3,
+        }
+        for i in range(100)
+    ]
+    window_counts.clear()
+    assert worker.post("/worker/readings/batch", json=readings).status_code == 200
+    db.session.add(
+        Alert(worker_id="W-001", alert_type="MANUAL", priority="WARNING", reason="test",
+              timestamp=dt.datetime.combine(DAY2, dt.time(1, 0)))
+    )
+    db.session.commit()
+    module.admin = app.test_client()
+    module.admin.post("/login/admin", json={"username": "admin", "password": "admin123"})
+
+
+def teardown_module(module):
+    db.session.remove()
+    db.drop_all()
+    module.ctx.pop()
+
+
+def _wait(job_id):
+    for _ in range(200):
+        body = admin.get(f"/admin/report/jobs/{job_id}").get_json()
+        if body["status"] not in ("queued", "running"):
+            return body
+        time.sleep(0.05)
+    raise AssertionError("report job did not finish")
+
+
+def test_job_runs_days_in_pool_and_caches_closed_range(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "REPORTS_DIR", str(tmp_path))
+    res = admin.post("/admin/report/jobs", json={"start": str(DAY1), "end": str(DAY2)})
+    assert res.status_code == 202
+    body = _wait(res.get_json()["job_id"])
+    assert body["status"] == "done" and not body["cached"]
+
+    download = admin.get(f"/admin/report/jobs/{body['job_id']}/download?file=summary")
+    rows = list(csv.DictReader(io.StringIO(download.get_data(as_text=True))))
+    expected = summarize(db.session, DAY1, DAY2)
+    assert [(r["date"], r["total_readings"]) for r in rows] == [
+        (str(r["date"]), str(r["total_readings"])) for r in expected
+    ]
+
+    again = admin.post("/admin/report/jobs", json={"start": str(DAY1), "end": str(DAY2)}).get_json()
+    assert again["status"] == "done" and again["cached"]
+
+    alert = Alert.query.filter_by(reason="test").one()
+    alert.resolved = True
+    db.session.commit()
+    changed = admin.post("/admin/report/jobs", json={"start": str(DAY1), "end": str(DAY2)}).get_json()
+    assert not changed["cached"]
+    assert _wait(changed["job_id"])["status"] == "done"
+    alerts = admin.get(f"/admin/report/jobs/{changed['job_id']}/download?file=alerts").get_data(as_text=True)
+    assert "True" in alerts
+
+
+def test_job_validation_and_unknown_ids():
+    assert admin.post("/admin/report/jobs", json={"start": "yesterday"}).status_code == 400
+    assert admin.post("/admin/report/jobs", json={"date": str(DAY1), "source": "csv"}).status_code == 400
+    assert admin.get("/admin/report/jobs/nope").status_code == 404
+    empty = admin.post("/admin/report/jobs", json={"date": "2001-01-01"}).get_json()
+    assert _wait(empty["job_id"])["status"] == "no_data"
+    assert admin.get(f"/admin/report/jobs/{empty['job_id']}/download").status_code == 409
+    assert report_jobs.get(empty["job_id"]) is not None
+
+
+def test_a_range_closes_at_utc_midnight():
+    job = ReportJob(DAY1, DAY2, "readings")
+    with clock.use(VirtualClock(dt.datetime.combine(DAY2, dt.time(23, 30)))):
+        assert not report_jobs._closed(job)
+    with clock.use(VirtualClock(dt.datetime.combine(DAY2 + dt.timedelta(days=1), dt.time.min))):
+        assert report_jobs._closed(job)
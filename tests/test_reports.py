@@ -0,0 +1,117 @@
+import csv
+import datetime as dt
+import threading
+
+import pandas as pd
+
+import config
+from backend import create_app
+from backend.db import db, init_db
+from backend.models import Alert
+from backend.rate_limit import window_counts
+from backend.reports import SUMMARY_FIELDS, summarize, write_report, write_summary_csv
+
+DAY1 = dt.date.today() - dt.timedelta(days=2)
+DAY2 = DAY1 + dt.timedelta(days=1)
+
+
+def setup_module(module):
+    app = create_app()
+    app.testing = True
+    module.app = app
+    module.ctx = app.app_context()
+    module.ctx.push()
+    db.drop_all()
+    db.create_all()
+    init_db()
+    client = app.test_client()
+    client.post("/login/worker", json={"worker_id": "W-001", "pin": "1234"})
+    start = dt.datetime.combine(DAY1, dt.time(22, 0))
+    readings = [
+        {
+            "timestamp": (start + dt.timedelta(seconds=97 * i)).isoformat(),
+            "heart_rate": 65 + i % 50,
+            "spo2": 99 - i % 12,
+            "temperature": 36.4 + (i % 7) / 10,
+            "gas": 15 + (i * 13) % 400,
+            "fatigue": i % 3,
+        }
+        for i in range(150)
+    ]
+    window_counts.clear()
+    assert client.post("/worker/readings/batch", json=readings).status_code == 200
+    for hour in (23, 1):
+        day = DAY1 if hour == 23 else DAY2
+        db.session.add(
+            Alert(worker_id="W-001", alert_type="MANUAL", priority="WARNING", reason="test",
+                  timestamp=dt.datetime.combine(day, dt.time(hour, 5)))
+        )
+    db.session.commit()
+
+
+def teardown_module(module):
+    db.session.remove()
+    db.drop_all()
+    module.ctx.pop()
+
+
+def test_readings_aggregate_matches_pandas_per_day():
+    rows = summarize(db.session, DAY1, DAY2, source="readings")
+    assert [(r["date"], r["worker_id"]) for r in rows] == [(str(DAY1), "W-001"), (str(DAY2), "W-001")]
+    df = pd.read_sql("select * from readings", db.engine, parse_dates=["timestamp"])
+    for row in rows:
+        group = df[df["timestamp"].dt.date.astype(str) == row["date"]]
+        assert row["total_readings"] == len(group)
+        assert row["avg_hr"] == round(group["heart_rate"].mean(), 2)
+        assert row["avg_gas"] == round(group["gas"].mean(), 2)
+        assert row["%safe"] == round((group["status"] == "SAFE").sum() / len(group) * 100, 2)
+        assert row["total_alerts"] >= 1
+
+
+def test_rollup_source_gives_the_same_figures():
+    by_readings = summarize(db.session, DAY1, DAY2, source="readings")
+    by_rollups = summarize(db.session, DAY1, DAY2, source="rollups")
+    strip = [{k: v for k, v in r.items() if k != "total_alerts"} for r in by_readings]
+    assert strip == [{k: v for k, v in r.items() if k != "total_alerts"} for r in by_rollups]
+
+
+def test_range_report_writes_summary_and_streams_alerts(tmp_path, monkeypatch):
+    summary_path, alerts_path = write_report(db.session, DAY1, DAY2, reports_dir=tmp_path)
+    assert summary_path.name == f"report_{DAY1}_{DAY2}.csv"
+    with summary_path.open() as fh:
+        assert len(list(csv.DictReader(fh))) == 2
+    with alerts_path.open() as fh:
+        alerts = list(csv.DictReader(fh))
+    assert len(alerts) == Alert.query.filter(Alert.timestamp < dt.datetime.combine(DAY2, dt.time.max)).count()
+    assert alerts[0]["resolved"] == "False"
+
+    monkeypatch.setattr(config, "REPORTS_DIR", str(tmp_path))
+    admin = app.test_client()
+    admin.post("/login/admin", json={"username": "admin", "password": "admin123"})
+    res = admin.get(f"/admin/report/daily?date={DAY2}")
+    assert res.status_code == 200
+    assert res.get_json()["summary"].endswith(f"daily_report_{DAY2}.csv")
+    assert admin.get(f"/admin/report/range?start={DAY2}&end={DAY1}").status_code == 400
+
+
+def test_concurrent_writes_to_one_report_never_mix(tmp_path):
+    path = tmp_path / "daily_report.csv"
+    versions = [[dict.fromkeys(SUMMARY_FIELDS, f"v{n}")] * 3000 for n in range(6)]
+    errors = []
+
+    def write(rows):
+        try:
+            write_summary_csv(rows, path)
+        except OSError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write, args=(rows,)) for rows in versions]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    with path.open(newline="") as fh:
+        written = list(csv.DictReader(fh))
+    assert written in versions
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]  # no temp files left behind
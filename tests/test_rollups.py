@@ -0,0 +1,105 @@
+import datetime as dt
+
+from backend import create_app
+from backend.alerts import create_or_update_alert
+from backend.clock import VirtualClock, clock
+from backend.db import db, init_db
+from backend.models import Alert, HourRollup, MinuteRollup, Reading
+from backend.rate_limit import window_counts
+from backend.reports import summarize
+from backend.rollups import rebuild_rollups
+
+BASE = dt.datetime.utcnow().replace(minute=0, second=0, microsecond=0) - dt.timedelta(hours=2)
+
+
+def setup_module(module):
+    app = create_app()
+    app.testing = True
+    module.app = app
+    module.ctx = app.app_context()
+    module.ctx.push()
+    db.drop_all()
+    db.create_all()
+    init_db()
+
+
+def teardown_module(module):
+    db.session.remove()
+    db.drop_all()
+    module.ctx.pop()
+
+
+def _snapshot(model):
+    rows = model.query.order_by(model.worker_id, model.bucket).all()
+    return [
+        {c.name: getattr(r, c.name) for c in model.__table__.c}
+        for r in rows
+    ]
+
+
+def _ingest():
+    client = app.test_client()
+    client.post("/login/worker", json={"worker_id": "W-001", "pin": "1234"})
+    readings = [
+        {
+            "timestamp": (BASE + dt.timedelta(seconds=37 * i)).isoformat(),
+            "heart_rate": 70 + i % 40,
+            "spo2": 97 - i % 9,
+            "temperature": 36.5 + (i % 5) / 10,
+            "gas": 900 if i == 50 else 20 + i % 7,
+            "fatigue": i % 3,
+        }
+        for i in range(200)
+    ]
+    window_counts.clear()
+    assert client.post("/worker/readings/batch", json=readings).status_code == 200
+    window_counts.clear()
+    client.post("/worker/reading", json={"heart_rate": 80, "spo2": 98, "temperature": 36.8, "gas": 20, "fatigue": 0})
+
+
+def test_incremental_rollups_match_a_rebuild():
+    _ingest()
+    hours, minutes = _snapshot(HourRollup), _snapshot(MinuteRollup)
+    assert sum(r["count"] for r in hours) == Reading.query.count() == 201
+    assert max(r["max_gas"] for r in minutes) == 900
+
+    rebuild_rollups(db.session)
+    db.session.commit()
+    assert _snapshot(HourRollup) == hours
+    assert _snapshot(MinuteRollup) == minutes
+
+
+def test_trend_and_kpis_read_rollups():
+    admin = app.test_client()
+    admin.post("/login/admin", json={"username": "admin", "password": "admin123"})
+    trend = admin.get("/admin/worker/W-001/trend?hours=4").get_json()
+    assert [t["bucket"] for t in trend][:2] == [BASE.isoformat(), (BASE + dt.timedelta(hours=1)).isoformat()]
+    assert sum(t["count"] for t in trend) == 201
+    kpis = admin.get("/admin/kpis?hours=4").get_json()
+    assert kpis["total_readings"] == 201 and kpis["workers_reporting"] == 1
+    assert kpis["total_alerts"] >= 1
+
+
+def test_alert_repeat_moves_its_count_with_the_timestamp():
+    first = BASE + dt.timedelta(minutes=59, seconds=50)
+    virtual = VirtualClock(first)
+    with clock.use(virtual):
+        alert, _ = create_or_update_alert("W-002", "HAZARD", "WARNING", "repeat")
+        virtual.advance(20)  # within the cooldown, into the next hour
+        assert create_or_update_alert("W-002", "HAZARD", "WARNING", "repeat")[0].id == alert.id
+    assert db.session.get(Alert, alert.id).timestamp == first + dt.timedelta(seconds=20)
+    hours, minutes = _snapshot(HourRollup), _snapshot(MinuteRollup)
+    assert [(r["bucket"], r["alert_count"]) for r in hours if r["worker_id"] == "W-002"] == [
+        (BASE + dt.timedelta(hours=1), 1)
+    ]
+
+    days = (BASE.date(), (BASE + dt.timedelta(hours=2)).date())
+    totals = {
+        source: sorted((r["worker_id"], r["date"], r["total_alerts"]) for r in summarize(db.session, *days, source=source))
+        for source in ("rollups", "readings")
+    }
+    assert totals["rollups"] == totals["readings"]
+    rebuild_rollups(db.session)
+    db.session.commit()
+    assert _snapshot(HourRollup) == hours
+    assert _snapshot(MinuteRollup) == minutes
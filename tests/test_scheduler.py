@@ -0,0 +1,61 @@
+import datetime as dt
+
+import config
+from backend import create_app
+from backend.alerts import create_or_update_alert
+from backend.db import db, init_db
+from backend.models import Alert, Worker
+from backend.scheduler import DeadlineScheduler
+
+
+def setup_module(module):
+    app = create_app()
+    app.testing = True
+    module.app = app
+    module.ctx = app.app_context()
+    module.ctx.push()
+    db.drop_all()
+    db.create_all()
+    init_db()
+
+
+def teardown_module(module):
+    db.session.remove()
+    db.drop_all()
+    module.ctx.pop()
+
+
+def test_inactivity_deadline_raises_one_unconscious_alert_per_episode():
+    sched = DeadlineScheduler()
+    sched.bind(app)
+    worker = Worker.query.filter_by(worker_id="W-001").first()
+    last_seen = worker.last_seen
+    sched.arm_inactivity("W-001", last_seen)
+
+    assert sched.run_due(last_seen + dt.timedelta(seconds=config.INACTIVITY_TIMEOUT)) == 0
+    assert sched.run_due(last_seen + dt.timedelta(seconds=config.INACTIVITY_TIMEOUT + 1)) == 1
+    alert = Alert.query.filter_by(worker_id="W-001", alert_type="UNCONSCIOUS").one()
+    assert alert.count == 1
+
+    # Still inactive at the re-check: no repeat for the same episode.
+    sched.run_due(last_seen + dt.timedelta(seconds=3 * config.INACTIVITY_TIMEOUT))
+    db.session.refresh(alert)
+    assert alert.count == 1
+
+
+def test_escalation_fires_when_due_and_skips_acknowledged():
+    sched = DeadlineScheduler()
+    sched.bind(app)
+    alert, _ = create_or_update_alert("W-002", "MANUAL", "EMERGENCY", "test")
+    acked, _ = create_or_update_alert("W-003", "MANUAL", "EMERGENCY", "test")
+    acked.acknowledged_at = dt.datetime.utcnow()
+    db.session.commit()
+    sched.arm_escalation(alert.id, alert.timestamp)
+    sched.arm_escalation(acked.id, acked.timestamp)
+
+    later = alert.timestamp + dt.timedelta(seconds=config.ESCALATE_AFTER_SECONDS + 1)
+    assert sched.run_due(later) >= 2
+    db.session.refresh(alert)
+    db.session.refresh(acked)
+    assert alert.escalation_flag
+    assert not acked.escalation_flag
@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sensor_simulator import REPLAY_BLOCK_ROWS, FleetSimulator, ReplayDataset, VirtualSensorSimulator
+
+
+def test_fleet_block_shapes_bounds_and_mix():
+    fleet = FleetSimulator([f"W-{i}" for i in range(200)], seed=3, start=1000.0)
+    block = fleet.block(100)
+    assert block.columns["heart_rate"].shape == (200, 100)
+    assert block.timestamps.tolist()[:2] == [1000.0, 1001.0]
+    assert fleet.next_timestamp == 1100.0
+    assert 50 <= block.columns["heart_rate"].min() and block.columns["heart_rate"].max() <= 180
+    assert 0 <= block.columns["gas"].min() and block.columns["gas"].max() <= 400
+    fatigue = np.bincount(block.columns["fatigue"].ravel(), minlength=3) / len(block)
+    assert np.allclose(fatigue, [0.7, 0.2, 0.1], atol=0.02)
+    critical = (block.columns["temperature"] > 39.0).mean()
+    assert 0.06 < critical < 0.14
+
+
+def test_worker_streams_are_reproducible_and_chunking_independent():
+    ids = ["A", "B", "C"]
+    whole = FleetSimulator(ids, seed=11, start=0.0, buffer_ticks=4).block(10)
+    parts = FleetSimulator(ids, seed=11, start=0.0, buffer_ticks=4)
+    pieces = [parts.block(n) for n in (3, 1, 6)]
+    for name, col in whole.columns.items():
+        assert np.array_equal(col, np.concatenate([p.columns[name] for p in pieces], axis=1))
+    # worker 0 sees the same readings whatever the fleet size
+    alone = FleetSimulator(["A"], seed=11, start=0.0).block(10)
+    assert np.array_equal(alone.columns["spo2"][0], whole.columns["spo2"][0])
+
+
+def test_fleet_readings_match_single_worker_dict_shape():
+    readings = FleetSimulator(["W-1", "W-2"], seed=0).readings(2)
+    single = VirtualSensorSimulator("W-1").get_reading()
+    assert len(readings) == 4
+    assert [r["worker_id"] for r in readings] == ["W-1", "W-2", "W-1", "W-2"]
+    assert set(readings[0]) == set(single)
+    assert isinstance(readings[0]["fatigue"], int)
+
+
+def test_csv_replay_is_converted_once_and_shared(tmp_path):
+    csv_path = tmp_path / "shift.csv"
+    rows = REPLAY_BLOCK_ROWS + 50
+    df = pd.DataFrame({
+        "timestamp": range(rows),
+        "heart_rate": [60 + i % 90 for i in range(rows)],
+        "spo2": [90 + i % 10 for i in range(rows)],
+        "temperature": [36.5 + (i % 20) / 10 for i in range(rows)],
+        "gas": [i % 300 for i in range(rows)],
+        "fatigue": [i % 3 for i in range(rows)],
+    })
+    df.to_csv(csv_path, index=False)
+
+    a, b = VirtualSensorSimulator("A"), VirtualSensorSimulator("B")
+    a.load_csv_dataset(csv_path)
+    b.load_csv_dataset(csv_path)
+    assert a.dataset is b.dataset
+    assert isinstance(a.dataset.columns["heart_rate"], np.memmap)
+    replayed = [a.get_reading() for _ in range(rows + 2)]
+    assert [r["heart_rate"] for r in replayed[:rows]] == df["heart_rate"].astype(float).tolist()
+    assert replayed[rows]["gas"] == 0.0 and replayed[rows]["fatigue"] == 0  # wrapped around
+    assert replayed[5]["temperature"] == df["temperature"][5]
+
+    # a changed recording is converted again
+    df.iloc[:10].to_csv(csv_path, index=False)
+    os.utime(csv_path, ns=(1, 1))
+    assert len(ReplayDataset.from_csv(csv_path)) == 10
+
+    frame_sim = VirtualSensorSimulator("C")
+    frame_sim.set_dataset(df.iloc[:3])
+    assert [frame_sim.get_reading()["spo2"] for _ in range(4)] == [90.0, 91.0, 92.0, 90.0]
+    with pytest.raises(ValueError):
+        frame_sim.set_dataset(df.drop(columns=["gas"]))
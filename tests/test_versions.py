@@ -0,0 +1,58 @@
+from backend import create_app
+from backend.alerts import create_or_update_alert
+from backend.db import db, init_db
+from backend.rate_limit import window_counts
+
+
+def setup_module(module):
+    app = create_app()
+    app.testing = True
+    module.app = app
+    module.ctx = app.app_context()
+    module.ctx.push()
+    db.drop_all()
+    db.create_all()
+    init_db()
+
+
+def teardown_module(module):
+    db.session.remove()
+    db.drop_all()
+    module.ctx.pop()
+
+
+def _admin():
+    client = app.test_client()
+    client.post("/login/admin", json={"username": "admin", "password": "admin123"})
+    return client
+
+
+def test_alerts_etag_changes_only_after_commit():
+    admin = _admin()
+    first = admin.get("/admin/alerts")
+    etag = first.headers["ETag"]
+    assert admin.get("/admin/alerts", headers={"If-None-Match": etag}).status_code == 304
+
+    create_or_update_alert("W-001", "MANUAL", "WARNING", "test", commit=False)
+    assert admin.get("/admin/alerts", headers={"If-None-Match": etag}).status_code == 304
+    db.session.commit()
+    changed = admin.get("/admin/alerts", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(changed.get_json()) == 1
+
+
+def test_reading_invalidates_worker_views_only():
+    admin = _admin()
+    workers_etag = admin.get("/admin/workers").headers["ETag"]
+    alerts_etag = admin.get("/admin/alerts").headers["ETag"]
+
+    worker = app.test_client()
+    worker.post("/login/worker", json={"worker_id": "W-001", "pin": "1234"})
+    window_counts.clear()
+    worker.post("/worker/reading", json={"heart_rate": 80, "spo2": 98, "temperature": 36.8, "gas": 20, "fatigue": 0})
+
+    assert admin.get("/admin/workers", headers={"If-None-Match": workers_etag}).status_code == 200
+    assert admin.get("/admin/alerts", headers={"If-None-Match": alerts_etag}).status_code == 304
+    latest = admin.get("/admin/latest/W-001")
+    assert admin.get("/admin/latest/W-001", headers={"If-None-Match": latest.headers["ETag"]}).status_code == 304
@@ -0,0 +1,73 @@
+import datetime as dt
+
+from backend import create_app
+from backend.db import db, init_db
+from backend.rate_limit import window_counts
+
+
+def setup_module(module):
+    app = create_app()
+    app.testing = True
+    module.app = app
+    module.ctx = app.app_context()
+    module.ctx.push()
+    db.drop_all()
+    db.create_all()
+    init_db()
+
+
+def teardown_module(module):
+    db.session.remove()
+    db.drop_all()
+    module.ctx.pop()
+
+
+def _send(client, heart_rate):
+    window_counts.clear()
+    client.post(
+        "/worker/reading",
+        json={"heart_rate": heart_rate, "spo2": 98, "temperature": 36.8, "gas": 20, "fatigue": 0},
+    )
+
+
+def test_poll_returns_snapshot_then_only_new_readings_and_messages():
+    client = app.test_client()
+    client.post("/login/worker", json={"worker_id": "W-001", "pin": "1234"})
+    _send(client, 80)
+    _send(client, 81)
+
+    snapshot = client.post("/worker/poll", json={}).get_json()
+    assert [r["heart_rate"] for r in snapshot["history"]] == [81]
+    assert snapshot["status"] == "SAFE"
+    cursor = snapshot["cursor"]
+
+    admin = app.test_client()
+    admin.post("/login/admin", json={"username": "admin", "password": "admin123"})
+    admin.post("/admin/message", json={"worker_id": "W-001", "message": "check in"})
+    _send(client, 82)
+    _send(client, 83)
+
+    delta = client.post("/worker/poll", json={"since": cursor}).get_json()
+    assert [r["heart_rate"] for r in delta["history"]] == [82, 83]
+    assert [m["message"] for m in delta["messages"]] == ["check in"]
+    assert delta["cursor"] > cursor
+
+    idle = client.post("/worker/poll", json={"since": delta["cursor"]}).get_json()
+    assert idle["history"] == [] and idle["messages"] == []
+    assert idle["cursor"] == delta["cursor"]
+
+
+def test_timestamp_cursor_round_trip_does_not_replay_history():
+    client = app.test_client()
+    client.post("/login/worker", json={"worker_id": "W-001", "pin": "1234"})
+    _send(client, 90)
+    future = (dt.datetime.utcnow() + dt.timedelta(hours=1)).isoformat()
+
+    empty = client.post("/worker/poll", json={"since": future}).get_json()
+    assert empty["history"] == [] and empty["cursor"] > 0
+
+    echoed = client.post("/worker/poll", json={"since": empty["cursor"]}).get_json()
+    assert echoed["history"] == [] and echoed["cursor"] == empty["cursor"]
+    _send(client, 91)
+    after = client.post("/worker/poll", json={"since": empty["cursor"]}).get_json()
+    assert [r["heart_rate"] for r in after["history"]] == [91]
@@ -0,0 +1,98 @@
+import datetime as dt
+
+import pytest
+
+from backend import create_app
+from backend.db import db, init_db
+from backend.models import Reading, Worker
+from backend.write_behind import ReadingWriter, WriteBehindError
+
+
+def setup_module(module):
+    app = create_app()
+    app.testing = True
+    module.ctx = app.app_context()
+    module.ctx.push()
+    db.drop_all()
+    db.create_all()
+    init_db()
+
+
+def teardown_module(module):
+    db.session.remove()
+    db.drop_all()
+    module.ctx.pop()
+
+
+def _row(ts, status="SAFE"):
+    return {
+        "worker_id": "W-001",
+        "timestamp": ts,
+        "heart_rate": 80,
+        "spo2": 98,
+        "temperature": 36.8,
+        "gas": 20,
+        "fatigue": 0,
+        "risk_score": 10,
+        "status": status,
+    }
+
+
+def test_group_commit_and_drain_on_stop():
+    writer = ReadingWriter(flush_interval_ms=60_000, max_rows=1000)
+    writer.start(db.engine)
+    base = dt.datetime(2024, 1, 1, 8, 0, 0)
+    for i in range(10):
+        writer.submit(_row(base + dt.timedelta(seconds=i)))
+    assert writer.queue_depth() == 10
+
+    writer.submit(_row(base + dt.timedelta(seconds=10), "EMERGENCY"), flush=True)
+    assert writer.queue_depth() == 0
+    assert Reading.query.count() == 11
+
+    writer.submit(_row(base + dt.timedelta(seconds=11)))
+    writer.stop()
+    assert not writer.running
+    assert Reading.query.count() == 12
+    assert writer.metrics()["flushed_rows"] == 12
+    db.session.expire_all()
+    assert Worker.query.filter_by(worker_id="W-001").first().last_seen == base + dt.timedelta(seconds=11)
+
+
+def test_bad_row_is_set_aside_and_the_queue_is_bounded():
+    writer = ReadingWriter(flush_interval_ms=60_000, max_rows=1000, max_queue=5, max_retries=1)
+    writer.start(db.engine)
+    base = dt.datetime(2024, 1, 2, 8, 0, 0)
+    before = Reading.query.count()
+    bad = dict(_row(base), worker_id=None)  # violates readings.worker_id NOT NULL
+    writer.submit(bad)
+    writer.submit(_row(base + dt.timedelta(seconds=1)))
+
+    # the emergency reading is stored on its own although its batch fails
+    writer.submit(_row(base + dt.timedelta(seconds=2), "EMERGENCY"), flush=True)
+    assert Reading.query.count() == before + 1
+    assert writer.queue_depth() == 2
+
+    for i in range(3):
+        writer.submit(_row(base + dt.timedelta(seconds=3 + i)))
+    with pytest.raises(WriteBehindError):
+        writer.submit(_row(base + dt.timedelta(seconds=9)))
+
+    assert writer.flush() == 4  # retries exhausted: row by row, the bad row goes to dead_letter
+    assert list(writer.dead_letter) == [bad]
+    assert writer.queue_depth() == 0
+    assert Reading.query.count() == before + 5
+    writer.submit(_row(base + dt.timedelta(seconds=10)))
+    writer.stop()
+    metrics = writer.metrics()
+    assert Reading.query.count() == before + 6
+    assert (metrics["dead_letter"], metrics["rejected_rows"], metrics["failed_flushes"]) == (1, 1, 2)
+
+
+def test_emergency_submit_raises_when_the_reading_is_not_stored():
+    writer = ReadingWriter(flush_interval_ms=60_000, max_rows=1000)
+    writer.start(db.engine)
+    with pytest.raises(WriteBehindError):
+        writer.submit(dict(_row(dt.datetime(2024, 1, 3)), worker_id=None, status="EMERGENCY"), flush=True)
+    assert writer.queue_depth() == 0
+    writer.stop()
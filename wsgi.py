@@ -0,0 +1,9 @@
+"""
+Server entry point: builds the app and starts its background threads.
+    flask --app wsgi run            # or any WSGI server: wsgi:app
+"""
+
+from backend import create_app, start_background
+
+app = create_app()
+start_background(app)